@@ -0,0 +1,69 @@
+"""
+Load comparison of the sync and the ASGI-native async member endpoints.
+
+Both variants are served by the same uvicorn process so the only difference
+is whether the view runs on the event loop or in a worker thread:
+
+    $ python -m benchmarks.async_views --requests 5000 --concurrency 200
+
+The database in settings is migrated and topped up to `--members` members.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+
+import django
+
+from benchmarks.http import free_port, print_table, run_load, serve
+
+HOST = '127.0.0.1'
+SCENARIOS = {
+    'list': ('/members/api/', '/members/async/'),
+    'detail': ('/members/api/{pk}/', '/members/async/{pk}/'),
+}
+
+
+def seed(count):
+    from django.core.management import call_command
+    from members.models import Member
+
+    missing = count - Member.objects.count_team_members()
+    if missing > 0:
+        call_command('seed_members', count=missing, verbosity=0)
+    return list(Member.objects.exclude(is_superuser=True).values_list('pk', flat=True))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per scenario and variant.')
+    parser.add_argument('--concurrency', type=int, default=200, help='Concurrent clients.')
+    parser.add_argument('--members', type=int, default=1000, help='Members in the database.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'instawork.settings')
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    pks = seed(options.members)
+
+    port = free_port()
+    results = []
+    with serve(['-m', 'uvicorn', 'instawork.asgi:application', '--host', HOST, '--port', str(port),
+                '--log-level', 'warning', '--no-access-log'], HOST, port):
+        for scenario, paths in SCENARIOS.items():
+            for variant, path in zip(('sync', 'async'), paths):
+                requests = [('GET', path.format(pk=random.choice(pks)), {}) for _ in range(options.requests)]
+                result = asyncio.run(run_load(HOST, port, requests, options.concurrency))
+                results.append({'scenario': f'{scenario}/{variant}', **result})
+    print_table(results)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
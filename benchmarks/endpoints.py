@@ -0,0 +1,334 @@
+"""
+End-to-end benchmark of the member list, create, edit and delete endpoints.
+
+Seeds a benchmark database up to each of `--sizes` members with
+`seed_members`, then replays every scenario in-process against the WSGI
+application and over HTTP against waitress, recording latency percentiles,
+queries per request and the peak memory allocated per request:
+
+    $ python -m benchmarks.endpoints --sizes 1000 10000 100000 --output results.json
+    $ python -m benchmarks.endpoints --sizes 1000 10000 100000 --baseline results.json
+
+The database is kept between runs (see `--database`) so that large tables are
+only seeded once. Writes are balanced: every member created is deleted again.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from io import BytesIO
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.http import run_load, summarize, print_table
+
+HOST = '127.0.0.1'
+SERVERS = ('wsgi', 'waitress')
+SCENARIOS = ('list', 'list-uncached', 'create', 'edit', 'delete')
+COLUMNS = ['size', 'server', 'scenario', 'requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms',
+           'queries', 'peak_kb']
+ADMIN_EMAIL = 'benchmark-admin@example.com'
+
+
+class QueryCounter:
+    """execute_wrapper counting the queries of every connection it is installed on."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        # Connections can be opened within a connection.execute_wrapper()
+        # block, e.g. MetricsMiddleware's, which pops the last wrapper on exit.
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, self)
+
+
+def call_wsgi(application, method, path, headers, body=b''):
+    """Make one request to a WSGI application in-process and return its status code."""
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+    }
+    for name, value in headers.items():
+        key = name.upper().replace('-', '_')
+        environ[key if key == 'CONTENT_TYPE' else f'HTTP_{key}'] = value
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(environ, lambda status, response_headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+def run_in_process(application, requests):
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for method, path, headers, body in requests:
+        request_start = time.perf_counter()
+        status = call_wsgi(application, method, path, headers, body)
+        latencies.append(time.perf_counter() - request_start)
+        errors += status >= 400
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def peak_memory(application, requests):
+    """The most memory allocated at once while serving any one of `requests`, in KiB."""
+    peak = 0
+    tracemalloc.start()
+    try:
+        for request in requests:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            call_wsgi(application, *request)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+@contextmanager
+def waitress_server(application, threads):
+    from waitress import create_server
+
+    # Queueing is expected under load, don't warn about it.
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+    server = create_server(application, host=HOST, port=0, threads=threads)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        yield server.effective_port
+    finally:
+        server.close()
+
+
+def reverse(*args, **kwargs):
+    from django.urls import reverse
+
+    return reverse(*args, **kwargs)
+
+
+class Scenarios:
+    """Builds the requests of every scenario for an authenticated admin."""
+
+    def __init__(self, seed=None):
+        from importlib import import_module
+
+        from django.conf import settings
+        from django.contrib.auth import SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY
+        from django.utils.crypto import get_random_string
+        from members.models import Member
+        from members.seeding import format_phone, next_number
+
+        # A superuser, so that it's not counted or listed as a team member.
+        admin = Member.objects.filter(email=ADMIN_EMAIL).first()
+        if admin is None:
+            admin = Member.objects.create_superuser(ADMIN_EMAIL, None, phone=format_phone(next_number()),
+                                                    role=Member.RoleChoices.admin)
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session.update({SESSION_KEY: str(admin.pk), HASH_SESSION_KEY: admin.get_session_auth_hash(),
+                        BACKEND_SESSION_KEY: settings.AUTHENTICATION_BACKENDS[0]})
+        session.create()
+        csrf_token = get_random_string(32)
+        self.headers = {'Cookie': f'sessionid={session.session_key}; csrftoken={csrf_token}',
+                        'X-CSRFToken': csrf_token}
+        self.rng = random.Random(seed)
+        self.created = []
+
+    def build(self, scenario, count):
+        return getattr(self, scenario.replace('-', '_'))(count)
+
+    def form(self, data):
+        return dict(self.headers, **{'Content-Type': 'application/x-www-form-urlencoded'}), urlencode(data).encode()
+
+    def list(self, count):
+        return [('GET', reverse('members:list'), self.headers, b'')] * count
+
+    def list_uncached(self, count):
+        # The list cache is keyed by query string, which `nocache` makes unique.
+        run = time.time_ns()
+        return [('GET', f"{reverse('members:list')}?nocache={run}-{n}", self.headers, b'') for n in range(count)]
+
+    def create(self, count):
+        from members.seeding import format_phone, next_number
+
+        start = next_number()
+        requests = []
+        for n in range(start, start + count):
+            email = f'benchmark{n}@example.com'
+            self.created.append(email)
+            headers, body = self.form({'first_name': 'Bench', 'last_name': str(n), 'email': email,
+                                       'phone': format_phone(n), 'role': 'Regular'})
+            requests.append(('POST', reverse('members:new'), headers, body))
+        return requests
+
+    def edit(self, count):
+        from members.models import Member
+
+        # A run of consecutive members from a random start, wrapping around.
+        members = Member.objects.exclude(is_superuser=True).order_by('pk')
+        last_pk = members.values_list('pk', flat=True).last() or 0
+        start = self.rng.randint(1, max(last_pk, 1))
+        fields = ('pk', 'last_name', 'email', 'phone', 'role')
+        rows = list(members.filter(pk__gte=start).values_list(*fields)[:count])
+        rows += members.filter(pk__lt=start).values_list(*fields)[:count - len(rows)]
+        requests = []
+        for pk, last_name, email, phone, role in rows:
+            headers, body = self.form({'first_name': f'Edited{self.rng.randrange(1000)}', 'last_name': last_name,
+                                       'email': email, 'phone': phone, 'role': role})
+            requests.append(('POST', reverse('members:edit', args=[pk]), headers, body))
+        return requests
+
+    def delete(self, count):
+        from members.models import Member
+
+        emails, self.created = self.created[:count], self.created[count:]
+        pks = Member.objects.filter(email__in=emails).values_list('pk', flat=True)
+        return [('DELETE', reverse('members:delete', args=[pk]), self.headers, b'') for pk in pks]
+
+
+def seed_to(size):
+    from django.core.management import call_command
+    from members.models import Member
+
+    missing = size - Member.objects.count_team_members()
+    if missing > 0:
+        call_command('seed_members', count=missing, verbosity=0)
+    elif missing < 0:
+        sys.stderr.write(f'The database already has {size - missing} members, more than {size}.\n')
+
+
+def benchmark(application, size, options):
+    """Run every scenario on both servers and return a result row per scenario and server."""
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    counter = QueryCounter()
+    connection_created.connect(counter.install)
+    for connection in connections.all():
+        counter.install(connection=connection)
+
+    scenarios = Scenarios(options.seed)
+    rows = []
+    try:
+        for server in options.servers:
+            for scenario in options.scenarios:
+                requests = scenarios.build(scenario, options.requests + options.memory_requests)
+                requests, memory_requests = requests[:options.requests], requests[options.requests:]
+                counter.count = 0
+                if server == 'wsgi':
+                    result = run_in_process(application, requests)
+                else:
+                    with waitress_server(application, options.concurrency) as port:
+                        result = asyncio.run(run_load(HOST, port, requests, options.concurrency))
+                queries = counter.count / len(requests) if requests else None
+                peak_kb = peak_memory(application, memory_requests) if memory_requests else None
+                rows.append({'size': size, 'server': server, 'scenario': scenario, **result,
+                             'queries': queries, 'peak_kb': peak_kb})
+    finally:
+        connection_created.disconnect(counter.install)
+    return rows
+
+
+def compare(baseline, rows, stream=sys.stdout):
+    """Print how p95 latency and queries per request moved since `baseline`."""
+    previous = {(row['size'], row['server'], row['scenario']): row for row in baseline['results']}
+    stream.write(f"\nCompared with {baseline['meta'].get('commit') or 'the baseline'}:\n")
+    for row in rows:
+        before = previous.get((row['size'], row['server'], row['scenario']))
+        if before is None:
+            continue
+        p95 = (row['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0.0
+        queries = (row['queries'] or 0) - (before['queries'] or 0)
+        stream.write(f"{row['size']:>10} {row['server']:>9} {row['scenario']:>14}  "
+                     f"p95 {p95:+6.1f}%  queries {queries:+.1f}\n")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Table sizes to benchmark at, in increasing order.')
+    parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario and server.')
+    parser.add_argument('--memory-requests', type=int, default=10,
+                        help='Extra requests per scenario replayed in-process under tracemalloc.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients and waitress threads.')
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'instawork-benchmark.sqlite3'),
+                        help='SQLite file to seed and benchmark against.')
+    parser.add_argument('--seed', type=int, help='Random seed for the requests.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--baseline', help='Results of a previous run to compare with.')
+    options = parser.parse_args(argv)
+
+    os.environ['INSTAWORK_DB_NAME'] = options.database
+    # The benchmark writes far faster than any client is allowed to.
+    os.environ.setdefault('INSTAWORK_THROTTLING', '0')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'instawork.settings')
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    # Measure what production runs: no query log and no debug pages.
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = [HOST, 'localhost']
+    call_command('migrate', verbosity=0)
+
+    rows = []
+    for size in sorted(options.sizes):
+        seed_to(size)
+        rows += benchmark(application, size, options)
+    print_table(rows, columns=COLUMNS)
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'options': {name: value for name, value in vars(options).items() if name not in ('output', 'baseline')},
+        },
+        'results': rows,
+    }
+    if options.baseline:
+        with open(options.baseline) as f:
+            compare(json.load(f), rows)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
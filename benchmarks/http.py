@@ -0,0 +1,102 @@
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+
+async def fetch(host, port, method, path, headers=None, body=b''):
+    """Send one HTTP/1.1 request on a fresh connection and return its status code."""
+    reader, writer = await asyncio.open_connection(host, port)
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {host}:{port}', 'Connection: close',
+             f'Content-Length: {len(body)}']
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(status_line.split()[1])
+
+
+def summarize(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentiles[49] * 1000,
+        'p95_ms': percentiles[94] * 1000,
+        'p99_ms': percentiles[98] * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+async def run_load(host, port, requests, concurrency):
+    """
+    Replay `requests`, an iterable of `(method, path, headers)` or
+    `(method, path, headers, body)`, against the server from `concurrency`
+    concurrent clients and summarize the latencies.
+    """
+    requests = iter(requests)
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        for method, path, headers, *body in requests:
+            start = time.perf_counter()
+            try:
+                status = await fetch(host, port, method, path, headers, *body)
+            except OSError:
+                status = None
+            latencies.append(time.perf_counter() - start)
+            if status is None or status >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server on {host}:{port} did not start within {timeout}s.')
+
+
+@contextmanager
+def serve(args, host, port, env=None):
+    """Run a server command in a subprocess for the duration of the block."""
+    process = subprocess.Popen([sys.executable, *args], env=env)
+    try:
+        wait_for_port(host, port)
+        yield
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+COLUMNS = ['scenario', 'requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+
+
+def print_table(rows, stream=sys.stdout, columns=COLUMNS):
+    stream.write(' '.join(f'{column:>14}' for column in columns) + '\n')
+    for row in rows:
+        cells = ['-' if row.get(column) is None else row[column] for column in columns]
+        stream.write(' '.join(f'{cell:>14.1f}' if isinstance(cell, float) else f'{cell:>14}' for cell in cells) + '\n')
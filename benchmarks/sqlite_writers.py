@@ -0,0 +1,142 @@
+"""
+Concurrency stress test for SQLite writers.
+
+Starts `--writers` processes that each create, edit and delete members
+through CreateMemberView, UpdateMemberView and DeleteMemberAPIView against a
+fresh database file, all at once, and counts "database is locked" errors:
+
+    $ python -m benchmarks.sqlite_writers --writers 8 --operations 50
+    $ INSTAWORK_SQLITE_TUNING=0 python -m benchmarks.sqlite_writers  # stock settings
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+
+def _setup_django(db_name):
+    os.environ['INSTAWORK_DB_NAME'] = db_name
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'instawork.settings')
+    import django
+
+    django.setup()
+
+
+def _phone(n):
+    return f'{800 + n // 10 ** 7 % 100}-{n // 10 ** 4 % 1000:03}-{n % 10 ** 4:04}'
+
+
+def _prepare(db_name, writers):
+    _setup_django(db_name)
+    from django.core.management import call_command
+    from members.models import Member
+
+    call_command('migrate', verbosity=0)
+    for index in range(writers):
+        Member.objects.create_user(f'writer{index}@example.com', 'password', phone=_phone(10 ** 6 + index),
+                                   role=Member.RoleChoices.admin)
+
+
+def _write(db_name, index, operations, ready, start, results):
+    _setup_django(db_name)
+    from django.db import OperationalError
+    from django.test import Client
+    from django.urls import reverse
+    from members.models import Member
+
+    completed = failed = locked = 0
+    try:
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(Member.objects.get(email=f'writer{index}@example.com'))
+    finally:
+        ready.release()
+    start.wait()
+
+    for operation in range(operations):
+        n = index * operations + operation
+        data = {'first_name': 'writer', 'last_name': str(index), 'email': f'member{n}@example.com',
+                'phone': _phone(n), 'role': Member.RoleChoices.regular}
+        try:
+            statuses = [client.post(reverse('members:new'), data).status_code]
+            pk = Member.objects.values_list('pk', flat=True).get(email=data['email'])
+            edited = dict(data, first_name='edited')
+            statuses.append(client.post(reverse('members:edit', args=[pk]), edited).status_code)
+            statuses.append(client.delete(reverse('members:delete', args=[pk])).status_code)
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+            continue
+        if statuses == [302, 302, 204]:
+            completed += 1
+        else:
+            failed += 1
+    results.put({'completed': completed, 'failed': failed, 'locked': locked})
+
+
+def run(writers=8, operations=50, tuned=None):
+    """
+    Run the stress test on a temporary database and return a summary.
+    `tuned` overrides INSTAWORK_SQLITE_TUNING for the writer processes.
+    """
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, 'writers.sqlite3')
+    previous = os.environ.get('INSTAWORK_SQLITE_TUNING')
+    if tuned is not None:
+        os.environ['INSTAWORK_SQLITE_TUNING'] = '1' if tuned else '0'
+    context = multiprocessing.get_context('spawn')
+    try:
+        process = context.Process(target=_prepare, args=(db_name, writers))
+        process.start()
+        process.join()
+        if process.exitcode:
+            raise RuntimeError('Preparing the database failed.')
+
+        ready, start, results = context.Semaphore(0), context.Event(), context.Queue()
+        processes = [context.Process(target=_write, args=(db_name, index, operations, ready, start, results))
+                     for index in range(writers)]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            ready.acquire()
+        started = time.perf_counter()
+        start.set()
+        totals = [results.get(timeout=600) for _ in processes]
+        elapsed = time.perf_counter() - started
+        for process in processes:
+            process.join()
+    finally:
+        if tuned is not None:
+            if previous is None:
+                os.environ.pop('INSTAWORK_SQLITE_TUNING', None)
+            else:
+                os.environ['INSTAWORK_SQLITE_TUNING'] = previous
+        shutil.rmtree(directory, ignore_errors=True)
+    return {
+        'tuned': os.environ.get('INSTAWORK_SQLITE_TUNING', '1') != '0' if tuned is None else tuned,
+        'writers': writers,
+        'completed': sum(total['completed'] for total in totals),
+        'failed': sum(total['failed'] for total in totals),
+        'locked': sum(total['locked'] for total in totals),
+        'seconds': elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8, help='Concurrent writer processes.')
+    parser.add_argument('--operations', type=int, default=50,
+                        help='Create/edit/delete rounds per writer.')
+    options = parser.parse_args(argv)
+    summary = run(options.writers, options.operations)
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 1 if summary['locked'] or summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
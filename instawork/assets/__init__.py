@@ -0,0 +1,8 @@
+"""
+Production static files.
+
+`instawork.assets.storage.CompressedManifestStaticFilesStorage` makes
+`collectstatic` write content-hashed copies of the static files along with
+their precompressed variants, and `instawork.assets.server.StaticFilesApplication`
+serves them in front of Django, picking the variant the client accepts.
+"""
@@ -0,0 +1,107 @@
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from pathlib import Path
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+
+from instawork.assets.storage import ENCODINGS
+
+# Hashed names change with their content, so clients never need to revalidate them.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CACHE_CONTROL = 'public, max-age=60'
+# Variants are listed with their file, whether brotli is installed or not.
+COMPRESSED_SUFFIXES = ('.br', '.gz')
+
+
+class StaticFile:
+
+    def __init__(self, path, headers):
+        self.path = path
+        stat = os.stat(path)
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.headers = [
+            *headers,
+            ('Content-Length', str(stat.st_size)),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+            ('ETag', self.etag),
+        ]
+
+
+class StaticFilesApplication:
+    """
+    WSGI middleware serving the files collected into STATIC_ROOT under
+    STATIC_URL, e.g. under waitress, and passing every other request on to
+    `application`.
+
+    The files are listed once at startup. Hashed files are cached by clients
+    for a year without revalidation, and the `.br` or `.gz` variant written by
+    collectstatic is sent to clients accepting it.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.prefix = '/' + (prefix or settings.STATIC_URL).strip('/') + '/'
+        self.files = self.scan(Path(root or settings.STATIC_ROOT))
+
+    def scan(self, root):
+        """Map the URL path of every file under `root` to its variants, by Content-Encoding."""
+        try:
+            with open(root / 'staticfiles.json') as manifest:
+                hashed = set(json.load(manifest)['paths'].values())
+        except FileNotFoundError:
+            hashed = set()
+
+        files = {}
+        for path in root.rglob('*'):
+            name = path.relative_to(root).as_posix()
+            if not path.is_file() or name.endswith(COMPRESSED_SUFFIXES):
+                continue
+            content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            cache_control = IMMUTABLE_CACHE_CONTROL if name in hashed else CACHE_CONTROL
+            headers = [('Content-Type', content_type), ('Cache-Control', cache_control)]
+            variants = {
+                encoding: StaticFile(path.with_name(path.name + suffix),
+                                     headers + [('Content-Encoding', encoding), ('Vary', 'Accept-Encoding')])
+                for encoding, suffix, _ in ENCODINGS if path.with_name(path.name + suffix).is_file()
+            }
+            variants[None] = StaticFile(path, headers + ([('Vary', 'Accept-Encoding')] if variants else []))
+            files[self.prefix + name] = variants
+        return files
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.prefix) or environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self.application(environ, start_response)
+
+        variants = self.files.get(path)
+        if variants is None:
+            start_response('404 Not Found', [('Content-Type', 'text/plain'), ('Content-Length', '9')])
+            return [b'Not Found']
+        file = variants[self.choose_encoding(variants, environ.get('HTTP_ACCEPT_ENCODING', ''))]
+
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH', '')
+        if file.etag in (etag.strip().removeprefix('W/') for etag in if_none_match.split(',')):
+            start_response('304 Not Modified', [header for header in file.headers if header[0] != 'Content-Length'])
+            return []
+        start_response('200 OK', file.headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        return environ.get('wsgi.file_wrapper', FileWrapper)(open(file.path, 'rb'))
+
+    @staticmethod
+    def choose_encoding(variants, accept_encoding):
+        """The preferred encoding in `variants` that `accept_encoding` allows, or None."""
+        accepted = set()
+        for coding in accept_encoding.split(','):
+            name, _, params = coding.strip().partition(';')
+            quality = params.strip().removeprefix('q=')
+            try:
+                if params and float(quality) <= 0:
+                    continue
+            except ValueError:
+                continue
+            accepted.add(name.strip().lower())
+        return next((encoding for encoding, _, _ in ENCODINGS if encoding in variants and encoding in accepted), None)
@@ -0,0 +1,56 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.html', '.xml', '.ico')
+# Don't keep variants saving less than this, the client would decompress for nothing.
+MIN_COMPRESSION_RATIO = 0.95
+
+
+def _gzip(content):
+    # mtime=0 so that collecting the same file twice gives the same bytes.
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+# (Content-Encoding, file suffix, compress), in order of preference.
+ENCODINGS = [('gzip', '.gz', _gzip)]
+if brotli is not None:
+    ENCODINGS.insert(0, ('br', '.br', brotli.compress))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage also writing a `.br` (with the brotli package)
+    and a `.gz` variant next to every compressible hashed file, so that they
+    are compressed once at collectstatic time rather than on every request.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                for compressed_name in self.compress(name):
+                    yield name, compressed_name, True
+
+    def compress(self, name):
+        """Write the variants of the file `name` worth keeping and return their names."""
+        with self.open(name) as file:
+            content = file.read()
+        names = []
+        for _, suffix, compress in ENCODINGS:
+            compressed = compress(content)
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            if len(compressed) < len(content) * MIN_COMPRESSION_RATIO:
+                self._save(compressed_name, ContentFile(compressed))
+                names.append(compressed_name)
+        return names
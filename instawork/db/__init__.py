@@ -0,0 +1,98 @@
+"""
+Database tuning.
+
+`instawork.db.sqlite3` is the stock SQLite backend plus support for
+`BEGIN IMMEDIATE` transactions, and `apply_sqlite_pragmas` applies
+`settings.SQLITE_PRAGMAS` to every new SQLite connection.
+
+`instawork.db.routers.ReplicaRouter` spreads reads over the read replicas
+and `instawork.db.middleware.ReplicaMiddleware` keeps writers on the primary.
+`instawork.db.routers.ShardRouter` sends the reads and writes inside
+use_shard() blocks to a shard, see `instawork.db.sharding`.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+from instawork.db.routers import current_shard, use_primary
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """`connection_created` receiver applying `settings.SQLITE_PRAGMAS`."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def immediate_atomic(using=None):
+    """
+    transaction.atomic() whose outermost transaction starts with
+    `BEGIN IMMEDIATE` on the instawork.db.sqlite3 backend.
+
+    A deferred SQLite transaction that reads before it writes has to upgrade
+    its lock, and that upgrade fails with "database is locked" right away,
+    without waiting for busy_timeout, when another connection is writing.
+    Taking the write lock up front makes writers queue on busy_timeout instead.
+    """
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block or not hasattr(connection, 'begin_immediate'):
+        with transaction.atomic(using=using):
+            yield
+        return
+    connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            connection.begin_immediate = False
+            yield
+    finally:
+        connection.begin_immediate = False
+
+
+def lock_for_write(model, using=None):
+    """
+    Take the write lock of the database `using` in the current transaction,
+    with a write to `model`'s table that changes nothing, unless it is held
+    already.
+
+    A deferred SQLite transaction only takes the lock at its first write, so
+    a timestamp taken before then may be committed after later ones. Taken
+    under the lock, timestamps sort in commit order, since no other writer
+    can commit until this transaction ends.
+    """
+    connection = transaction.get_connection(using)
+    if connection.vendor != 'sqlite' or not connection.in_atomic_block:
+        return
+    if getattr(connection, 'holds_write_lock', False):
+        return
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(f'UPDATE {table} SET {pk} = {pk} WHERE 0')
+    if hasattr(connection, 'holds_write_lock'):
+        connection.holds_write_lock = True
+
+
+class ImmediateTransactionMixin:
+    """
+    Run the unsafe methods of a view in an immediate_atomic() transaction on
+    the current shard.
+    """
+    immediate_methods = ('post', 'put', 'patch', 'delete')
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in self.immediate_methods:
+            return super().dispatch(request, *args, **kwargs)
+        with immediate_atomic(using=current_shard()):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class PrimaryDatabaseMixin:
+    """Read from the primary database, not a replica, for every method of a view."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with use_primary():
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,46 @@
+import asyncio
+
+from django.conf import settings
+
+from instawork.db.routers import use_primary
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReplicaMiddleware:
+    """
+    Read from the primary database during unsafe requests, and during any
+    request by a client that wrote within the last REPLICA_STICKY_SECONDS so
+    that it reads its own writes while the replicas catch up.
+    """
+    cookie_name = 'use_primary'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks the instance as a coroutine function, like MiddlewareMixin,
+            # so that Django doesn't run the chain under ASGI in a thread.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with use_primary(self.reads_primary(request)) as state:
+            response = self.get_response(request)
+        return self.stick(response, state)
+
+    async def __acall__(self, request):
+        with use_primary(self.reads_primary(request)) as state:
+            response = await self.get_response(request)
+        return self.stick(response, state)
+
+    def reads_primary(self, request):
+        return request.method not in SAFE_METHODS or self.cookie_name in request.COOKIES
+
+    def stick(self, response, state):
+        if state['wrote'] and settings.DATABASE_REPLICAS:
+            response.set_cookie(self.cookie_name, '1', max_age=settings.REPLICA_STICKY_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,127 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+
+_routing = ContextVar('instawork_db_routing', default=None)
+_shard = ContextVar('instawork_db_shard', default=None)
+
+
+@contextmanager
+def use_primary(enabled=True):
+    """
+    Read from the primary inside the block if `enabled`, or else from the
+    moment something is written. Yields a dict whose `wrote` item tells if
+    anything was.
+    """
+    outer = _routing.get()
+    state = {'primary': enabled or bool(outer and outer['primary']), 'wrote': False}
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+        if outer is not None and state['wrote']:
+            outer['primary'] = outer['wrote'] = True
+
+
+@contextmanager
+def use_shard(alias):
+    """Read and write the sharded models from the database `alias` inside the block."""
+    token = _shard.set(alias)
+    try:
+        yield
+    finally:
+        _shard.reset(token)
+
+
+def current_shard():
+    """The alias selected by the innermost use_shard() block, or None."""
+    return _shard.get()
+
+
+def read_databases(model):
+    """
+    The database every shard's reads of `model` go to, e.g. a replica for
+    `default`, to read the rows of all shards from.
+    """
+    databases = []
+    for shard in settings.DATABASE_SHARDS:
+        with use_shard(shard):
+            databases.append(router.db_for_read(model))
+    return databases
+
+
+class ShardRouter:
+    """
+    Send the reads and writes of the project apps to the shard selected by
+    use_shard(), and the writes of an instance to the shard it was loaded
+    from. Teams, the directory of which shard holds which team, stay on the
+    `default` database, and so does everything outside use_shard() blocks,
+    which ReplicaRouter routes then.
+    """
+    route_app_labels = {'members'}
+    unsharded_models = {'team'}
+
+    def _is_sharded(self, model):
+        return (model._meta.app_label in self.route_app_labels
+                and model._meta.model_name not in self.unsharded_models)
+
+    def _shard_for(self, model, hints):
+        if not self._is_sharded(model):
+            return None
+        instance = hints.get('instance')
+        db = instance._state.db if instance is not None else None
+        if db != DEFAULT_DB_ALIAS and db in settings.DATABASE_SHARDS and self._is_sharded(type(instance)):
+            return db
+        shard = _shard.get()
+        if shard is None or shard == DEFAULT_DB_ALIAS:
+            return None
+        return shard
+
+    def db_for_read(self, model, **hints):
+        return self._shard_for(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard_for(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Members point to their team on `default` from any shard.
+        if not (self._is_sharded(type(obj1)) and self._is_sharded(type(obj2))):
+            if {obj1._meta.app_label, obj2._meta.app_label} <= self.route_app_labels:
+                return True
+        return None
+
+
+class ReplicaRouter:
+    """
+    Send writes of the project apps to the primary (`default`) database and
+    their reads to a random one of `settings.DATABASE_REPLICAS`, except
+    within use_primary() blocks.
+    """
+    route_app_labels = {'members'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels or not settings.DATABASE_REPLICAS:
+            return None
+        state = _routing.get()
+        if state is not None and state['primary']:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        state = _routing.get()
+        if state is not None:
+            state['primary'] = state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,40 @@
+import bisect
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Consistent hashing of keys onto `nodes`: every node owns `replicas`
+    points of a ring, and a key goes to the node owning the first point at or
+    after the key's hash. Adding a node only moves the keys that land on its
+    points, about 1/N of them, instead of reshuffling every key as
+    `hash % N` would.
+    """
+
+    def __init__(self, nodes, replicas=100):
+        if not nodes:
+            raise ValueError('A hash ring needs at least one node.')
+        points = sorted((_hash(f'{node}:{index}'), node) for node in nodes for index in range(replicas))
+        self.hashes = [point for point, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def get_node(self, key):
+        index = bisect.bisect(self.hashes, _hash(str(key))) % len(self.hashes)
+        return self.nodes[index]
+
+
+@lru_cache(maxsize=None)
+def _get_ring(shards):
+    return HashRing(shards)
+
+
+def get_shard(key):
+    """The alias in `settings.DATABASE_SHARDS` that `key` hashes to."""
+    return _get_ring(tuple(settings.DATABASE_SHARDS)).get_node(key)
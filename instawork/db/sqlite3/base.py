@@ -0,0 +1,30 @@
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3 import base
+
+from instawork.db import apply_sqlite_pragmas
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # Set by instawork.db.immediate_atomic() for the next BEGIN only.
+    begin_immediate = False
+    # Whether the current transaction holds the write lock, see instawork.db.lock_for_write().
+    holds_write_lock = False
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE' if self.begin_immediate else 'BEGIN')
+        self.holds_write_lock = self.begin_immediate
+
+    def _commit(self):
+        self.holds_write_lock = False
+        super()._commit()
+
+    def _rollback(self):
+        self.holds_write_lock = False
+        super()._rollback()
+
+    def _close(self):
+        self.holds_write_lock = False
+        super()._close()
+
+
+connection_created.connect(apply_sqlite_pragmas, dispatch_uid='instawork.db.apply_sqlite_pragmas')
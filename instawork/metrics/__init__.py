@@ -0,0 +1,222 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+
+`instawork.metrics.middleware.MetricsMiddleware` times every request and
+breaks it down into database time, measured by an execute wrapper on every
+database connection, and template time, measured by the
+`instawork.metrics.templates.DjangoTemplates` backend. Metrics are kept per
+process, so every worker process is scraped separately.
+"""
+import bisect
+import re
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db.backends.signals import connection_created
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# `IN (%s, %s, %s)` and multi-row `VALUES (%s, %s), (%s, %s)` vary in length
+# with the number of parameters, not with the shape of the query.
+PLACEHOLDER_LIST_RE = re.compile(r'%s(?:, %s)+')
+ROW_LIST_RE = re.compile(r'(\(%s(?:, \.\.\.)?\))(?:, \1)+')
+
+_current = ContextVar('instawork_request_metrics', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, **extra):
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        with self._lock:
+            series = sorted((labels, self._copy(value)) for labels, value in self._series.items())
+        for labels, value in series:
+            lines += self.samples(labels, value)
+        return lines
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def get(self, *labels):
+        return self._series.get(labels, 0)
+
+    def samples(self, labels, value):
+        return [f'{self.name}_total{_labels(self.labelnames, labels)} {value}']
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def get_count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def get_sum(self, *labels):
+        series = self._series.get(labels)
+        return series[1] if series else 0
+
+    def _copy(self, value):
+        return [list(value[0]), value[1]]
+
+    def samples(self, labels, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le=bound)} {cumulative}')
+        lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {total}')
+        lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, *args, **kwargs):
+        return self._register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self._register(Histogram(*args, **kwargs))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+    def render(self):
+        return ''.join(f'{line}\n' for metric in self.metrics for line in metric.render())
+
+
+registry = Registry()
+REQUESTS = registry.counter(
+    'http_requests', 'Requests served.', ['view', 'method', 'status'])
+REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'Time spent serving a request.', ['view', 'method'])
+DB_DURATION = registry.histogram(
+    'http_request_db_duration_seconds', 'Time a request spent in database queries.', ['view'])
+TEMPLATE_DURATION = registry.histogram(
+    'http_request_template_duration_seconds',
+    'Time a request spent rendering templates, including the queries run while rendering.', ['view'])
+QUERIES = registry.histogram(
+    'http_request_queries', 'Database queries run by a request.', ['view'], buckets=QUERY_BUCKETS)
+N_PLUS_ONE = registry.counter(
+    'http_request_n_plus_one', 'Requests that ran the same query METRICS_N_PLUS_ONE_THRESHOLD times or more.',
+    ['view'])
+SLOW_REQUESTS = registry.counter(
+    'http_slow_requests', 'Requests slower than METRICS_SLOW_REQUEST_SECONDS.', ['view'])
+
+
+def normalize_sql(sql):
+    return ROW_LIST_RE.sub(r'\1, ...', PLACEHOLDER_LIST_RE.sub('%s, ...', sql))
+
+
+class RequestMetrics:
+    """
+    What a request spent its time on, fed the queries of the request by
+    record_query().
+    """
+
+    def __init__(self, record_sql=False):
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.queries = 0
+        self.statements = {}
+        self.sql = [] if record_sql else None
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            self.db_time += duration
+            self.queries += 1
+            statement = normalize_sql(sql)
+            self.statements[statement] = self.statements.get(statement, 0) + 1
+            if self.sql is not None:
+                # Without the parameters, which hold emails, phone numbers and password hashes.
+                self.sql.append((duration, sql))
+
+    def most_repeated(self):
+        """The statement run the most times and how many times it ran."""
+        if not self.statements:
+            return None, 0
+        return max(self.statements.items(), key=lambda item: item[1])
+
+
+def get_request_metrics():
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    An execute wrapper passing the queries to the RequestMetrics of the
+    current request, if any. It is looked up in the context rather than
+    installed per request, since under ASGI the queries run on the threads of
+    sync_to_async, with connections of their own, which copy the context.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        # First, out of the way of the wrappers that execute_wrapper() pops off the end.
+        connection.execute_wrappers.insert(0, record_query)
+
+
+connection_created.connect(install_query_recorder, dispatch_uid='instawork.metrics.install_query_recorder')
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from instawork.metrics import (DB_DURATION, N_PLUS_ONE, QUERIES, REQUESTS, REQUEST_DURATION, SLOW_REQUESTS,
+                               TEMPLATE_DURATION, RequestMetrics, _current, install_query_recorder)
+
+logger = logging.getLogger('instawork.metrics')
+slow_logger = logging.getLogger('instawork.metrics.slow')
+
+UNRESOLVED = '<unresolved>'
+
+
+class MetricsMiddleware:
+    """
+    Record the total, database and template time and the queries of every
+    request per URL name, flag views that repeat a query
+    METRICS_N_PLUS_ONE_THRESHOLD times or more, and log the SQL of requests
+    slower than METRICS_SLOW_REQUEST_SECONDS, if set.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._n_plus_one_seen = set()
+        if asyncio.iscoroutinefunction(get_response):
+            # See instawork.db.middleware.ReplicaMiddleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        start = perf_counter()
+        with self.collect() as metrics:
+            response = self.get_response(request)
+        self.record(request, response, metrics, perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = perf_counter()
+        with self.collect() as metrics:
+            response = await self.get_response(request)
+        self.record(request, response, metrics, perf_counter() - start)
+        return response
+
+    @contextmanager
+    def collect(self):
+        """Yield the RequestMetrics of the queries and templates run inside the block."""
+        metrics = RequestMetrics(record_sql=settings.METRICS_SLOW_REQUEST_SECONDS is not None)
+        token = _current.set(metrics)
+        # Connections opened before this module was imported missed connection_created.
+        for connection in connections.all():
+            install_query_recorder(connection)
+        try:
+            yield metrics
+        finally:
+            _current.reset(token)
+
+    def record(self, request, response, metrics, duration):
+        slow_seconds = settings.METRICS_SLOW_REQUEST_SECONDS
+        view = request.resolver_match.view_name if request.resolver_match else UNRESOLVED
+        REQUESTS.inc(view, request.method, str(response.status_code))
+        REQUEST_DURATION.observe(duration, view, request.method)
+        DB_DURATION.observe(metrics.db_time, view)
+        TEMPLATE_DURATION.observe(metrics.template_time, view)
+        QUERIES.observe(metrics.queries, view)
+
+        statement, repeats = metrics.most_repeated()
+        if repeats >= settings.METRICS_N_PLUS_ONE_THRESHOLD:
+            N_PLUS_ONE.inc(view)
+            if (view, statement) not in self._n_plus_one_seen:
+                self._n_plus_one_seen.add((view, statement))
+                logger.warning('Possible N+1 queries in %s: %d x %s', view, repeats, statement)
+        if slow_seconds is not None and duration >= slow_seconds:
+            SLOW_REQUESTS.inc(view)
+            self.log_slow_request(request, view, duration, metrics)
+
+    def log_slow_request(self, request, view, duration, metrics):
+        lines = [f'Slow request {request.method} {request.path} ({view}): {duration * 1000:.1f} ms, '
+                 f'{metrics.db_time * 1000:.1f} ms in {metrics.queries} queries, '
+                 f'{metrics.template_time * 1000:.1f} ms rendering templates']
+        lines += [f'  {query_duration * 1000:8.1f} ms  {sql}' for query_duration, sql in metrics.sql]
+        slow_logger.warning('\n'.join(lines))
@@ -0,0 +1,30 @@
+from time import perf_counter
+
+from django.template.backends import django as backend
+
+from instawork.metrics import get_request_metrics
+
+
+class Template(backend.Template):
+
+    def render(self, context=None, request=None):
+        metrics = get_request_metrics()
+        if metrics is None or metrics.rendering:
+            return super().render(context, request)
+        metrics.rendering = True
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.rendering = False
+            metrics.template_time += perf_counter() - start
+
+
+class DjangoTemplates(backend.DjangoTemplates):
+    """The Django template backend, timing renders for the request metrics."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name).template, self)
@@ -0,0 +1,7 @@
+from django.http import HttpResponse
+
+from instawork.metrics import CONTENT_TYPE, registry
+
+
+def metrics(request):
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,25 +38,34 @@ REQUIRED_APPS = [
 ]
 PROJECT_APPS = [
     'members',
+    'jobs',
 ]
 
 INSTALLED_APPS = REQUIRED_APPS + PROJECT_APPS
 
+# Write rate limits and load shedding, see instawork/throttling/__init__.py,
+# unless INSTAWORK_THROTTLING=0.
+THROTTLING = os.environ.get('INSTAWORK_THROTTLING', '1') != '0'
+
 MIDDLEWARE = [
+    'instawork.metrics.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    *(['instawork.throttling.middleware.WriteConcurrencyMiddleware'] if THROTTLING else []),
+    'instawork.db.middleware.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    *(['instawork.throttling.middleware.ThrottleMiddleware'] if THROTTLING else []),
 ]
 
 ROOT_URLCONF = 'instawork.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'instawork.metrics.templates.DjangoTemplates',
         # 'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,13 +84,164 @@ WSGI_APPLICATION = 'instawork.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+# SQLite is tuned for concurrent writers (see instawork/db/__init__.py) unless
+# INSTAWORK_SQLITE_TUNING=0, which runs on the stock backend for comparison.
+SQLITE_TUNING = os.environ.get('INSTAWORK_SQLITE_TUNING', '1') != '0'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': 'instawork.db.sqlite3' if SQLITE_TUNING else 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('INSTAWORK_DB_NAME', BASE_DIR / 'db.sqlite3'),
+        # Keep connections, and so their pragmas and page cache, across requests.
+        'CONN_MAX_AGE': 600 if SQLITE_TUNING else 0,
     }
 }
 
+# Read replicas: INSTAWORK_DB_REPLICAS is a comma-separated list of database
+# files, added as the `replica1`, `replica2`, ... aliases that member reads are
+# spread over by ReplicaRouter. Tests read the replicas through `default`.
+DATABASE_REPLICAS = []
+for index, name in enumerate(filter(None, os.environ.get('INSTAWORK_DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{index}'] = dict(DATABASES['default'], NAME=name, TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+# Shards: INSTAWORK_DB_SHARDS is a comma-separated list of database files,
+# added as the `shard1`, `shard2`, ... aliases that new teams are spread over
+# by consistent hashing, along with `default`. Only ever append to the list:
+# a shard's position is part of the ids of the members created on it.
+DATABASE_SHARDS = ['default']
+for index, name in enumerate(filter(None, os.environ.get('INSTAWORK_DB_SHARDS', '').split(',')), 1):
+    DATABASES[f'shard{index}'] = dict(DATABASES['default'], NAME=name)
+    DATABASE_SHARDS.append(f'shard{index}')
+
+DATABASE_ROUTERS = ['instawork.db.routers.ShardRouter', 'instawork.db.routers.ReplicaRouter']
+
+# How long a client reads from the primary after writing, to read its own writes.
+REPLICA_STICKY_SECONDS = 10
+
+# Applied to every new SQLite connection by instawork.db.apply_sqlite_pragmas.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -64 * 1024,  # KiB
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 20 * 1000,  # ms
+    'temp_store': 'memory',
+} if SQLITE_TUNING else {}
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+# Set INSTAWORK_CACHE_REDIS_URL, e.g. redis://localhost:6379/0, to share the
+# caches between processes. Otherwise a write only invalidates the entries of
+# the process that made it, and the others serve theirs until they expire.
+CACHE_REDIS_URL = os.environ.get('INSTAWORK_CACHE_REDIS_URL')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+        'KEY_PREFIX': 'members',
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'members.cache.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+        'KEY_PREFIX': 'sessions',
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+}
+
+# Token buckets of the write throttles. Set INSTAWORK_THROTTLE_REDIS_URL,
+# e.g. redis://localhost:6379/1, to share them between processes.
+THROTTLE_CACHE_ALIAS = 'throttle'
+if os.environ.get('INSTAWORK_THROTTLE_REDIS_URL'):
+    CACHES[THROTTLE_CACHE_ALIAS] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['INSTAWORK_THROTTLE_REDIS_URL'],
+    }
+else:
+    CACHES[THROTTLE_CACHE_ALIAS] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttle',
+    }
+
+# Load shedding by WriteConcurrencyMiddleware, per process: writes beyond
+# WRITE_CONCURRENCY wait up to WRITE_QUEUE_TIMEOUT seconds for their turn, and
+# beyond WRITE_QUEUE_SIZE waiting ones are refused with 503 right away.
+WRITE_CONCURRENCY = 4
+WRITE_QUEUE_SIZE = 16
+WRITE_QUEUE_TIMEOUT = 2
+WRITE_RETRY_AFTER = 1
+
+# Rendered member cards and list pages
+MEMBERS_CACHE_ALIAS = 'default'
+MEMBERS_CACHE_TIMEOUT = 60 * 60 * 24 if CACHE_REDIS_URL else 60
+
+# Sessions are read from the cache and written through to the database, and
+# the members of authenticated requests are cached along with them. A change
+# to a member, e.g. its role, only drops it from the cache of the process that
+# made it unless the cache is shared, so it is kept for seconds otherwise.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+AUTHENTICATION_BACKENDS = ['members.backends.CachedModelBackend']
+MEMBERS_USER_CACHE_TIMEOUT = 60 * 60 if CACHE_REDIS_URL else 10
+
+# Member change webhooks, delivered from the outbox by run_outbox_worker.
+# INSTAWORK_WEBHOOKS is a comma-separated list of URLs.
+OUTBOX_WEBHOOKS = [url for url in os.environ.get('INSTAWORK_WEBHOOKS', '').split(',') if url]
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_TIMEOUT_SECONDS = 10
+# Failed batches are retried after 1, 2, 4, ... seconds, at most 5 minutes
+# apart, and moved to the dead letters after the last attempt.
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_BACKOFF_SECONDS = 1
+OUTBOX_MAX_BACKOFF_SECONDS = 5 * 60
+# How long delivered events are kept.
+OUTBOX_RETENTION = timedelta(days=7)
+
+# Background jobs, run by run_workers. A claimed job that isn't done within
+# the visibility timeout is run again by another worker. Failed jobs are
+# retried after 10, 20, 40, ... seconds, at most an hour apart.
+JOBS_BATCH_SIZE = 100
+JOBS_VISIBILITY_TIMEOUT = 5 * 60
+JOBS_MAX_ATTEMPTS = 5
+JOBS_BACKOFF_SECONDS = 10
+JOBS_MAX_BACKOFF_SECONDS = 60 * 60
+# Emails sent per batch over one connection by jobs.email.send_messages.
+JOBS_EMAIL_BATCH_SIZE = 50
+
+# Printed to the worker's console unless INSTAWORK_EMAIL_BACKEND is e.g.
+# django.core.mail.backends.smtp.EmailBackend.
+EMAIL_BACKEND = os.environ.get('INSTAWORK_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('INSTAWORK_EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('INSTAWORK_EMAIL_PORT', 25))
+DEFAULT_FROM_EMAIL = os.environ.get('INSTAWORK_FROM_EMAIL', 'team@instawork.local')
+
+# How long deleted members are reported by /members/changes/. Clients that
+# haven't synced for longer must start over.
+MEMBER_TOMBSTONE_RETENTION = timedelta(days=30)
+
+# Deleting a member only marks it deleted, and purge_deleted_members deletes
+# the marked rows later.
+MEMBERS_SOFT_DELETE = True
+
+# Request metrics, served at /metrics
+# Flag requests that run the same query this many times or more.
+METRICS_N_PLUS_ONE_THRESHOLD = 10
+# Log the SQL of requests slower than this many seconds, if set.
+METRICS_SLOW_REQUEST_SECONDS = os.environ.get('INSTAWORK_SLOW_REQUEST_SECONDS')
+METRICS_SLOW_REQUEST_SECONDS = float(METRICS_SLOW_REQUEST_SECONDS) if METRICS_SLOW_REQUEST_SECONDS else None
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -116,10 +277,31 @@ USE_TZ = True
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'
-    ]
+    ],
+    # Writes only, and the other views too through ThrottleMiddleware. A rate
+    # of N/period is a token bucket: bursts of N, then one write per period/N.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'instawork.throttling.WriteRateThrottle',
+        'instawork.throttling.IPWriteRateThrottle',
+    ] if THROTTLING else [],
+    'DEFAULT_THROTTLE_RATES': {
+        'writes': '60/min',
+        'ip_writes': '300/min',
+    },
 }
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Production static files: collectstatic writes content-hashed copies and their
+# precompressed variants, served by instawork.wsgi with far-future caching.
+STATIC_MANIFEST = os.environ.get('INSTAWORK_STATIC_MANIFEST', '0') != '0'
+if STATIC_MANIFEST:
+    STATICFILES_STORAGE = 'instawork.assets.storage.CompressedManifestStaticFilesStorage'
+
+# Profile pictures and their thumbnails, served by /members/pictures/.
+MEDIA_ROOT = os.environ.get('INSTAWORK_MEDIA_ROOT', BASE_DIR / 'media')
+MEDIA_URL = 'media/'
+MEMBERS_PICTURE_MAX_SIZE = 5 * 1024 * 1024
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
@@ -0,0 +1,90 @@
+"""
+Rate limits and load shedding for writes.
+
+The throttles here are DRF throttles, applied to the API through
+`REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES']` and to the other views by
+`instawork.throttling.middleware.ThrottleMiddleware`, so that a client has
+one budget of writes across both. Their token buckets live in the
+`THROTTLE_CACHE_ALIAS` cache, which has to be shared by every process, e.g.
+Redis, for the limits to hold across them.
+
+`instawork.throttling.middleware.WriteConcurrencyMiddleware` sheds the
+writes that would queue on the database's single writer.
+
+Every unsafe request counts as a write, except those to views setting
+`write_throttled = False`, e.g. a read POSTed for the size of its query.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def is_write_throttled(view_func):
+    """Whether the unsafe requests to the view `view_func` count as writes."""
+    view = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None) or view_func
+    return getattr(view, 'write_throttled', True)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle as a token bucket over unsafe requests: a rate of
+    `N/period` lets a client write N times in a burst, and then once every
+    period/N seconds, instead of N times in any sliding period.
+
+    The bucket is stored as the time at which it will be full again (GCRA),
+    a single number per client instead of DRF's list of request times.
+    Concurrent requests of a client may race on it and let a write or two
+    more through, as with DRF's throttles.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        super().__init__()
+
+    def get_rate(self):
+        # SimpleRateThrottle reads the rates at import, out of reach of settings overrides.
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS or not getattr(view, 'write_throttled', True) or self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        interval = self.duration / self.num_requests
+        full_at = max(self.cache.get(self.key, self.now), self.now) + interval
+        # The bucket holds `duration` seconds worth of tokens.
+        self.wait_seconds = full_at - self.now - self.duration
+        if self.wait_seconds > 0:
+            return False
+        self.cache.set(self.key, full_at, math.ceil(full_at - self.now))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class WriteRateThrottle(TokenBucketThrottle):
+    """Writes per user, or per IP address for anonymous clients."""
+    scope = 'writes'
+
+    def get_cache_key(self, request, view):
+        user = getattr(request, 'user', None)
+        ident = user.pk if user is not None and user.is_authenticated else self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class IPWriteRateThrottle(TokenBucketThrottle):
+    """Writes per IP address, whatever the users, e.g. a script cycling through accounts."""
+    scope = 'ip_writes'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
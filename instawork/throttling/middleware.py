@@ -0,0 +1,146 @@
+import asyncio
+import math
+import threading
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from instawork.throttling import SAFE_METHODS, is_write_throttled
+
+
+def _retry_response(status, message, retry_after):
+    response = HttpResponse(message, status=status, content_type='text/plain')
+    response['Retry-After'] = str(max(math.ceil(retry_after), 1))
+    return response
+
+
+class ThrottleMiddleware:
+    """
+    Apply the API's throttles, `REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES']`,
+    to the views outside the API too, e.g. the add and edit pages, and answer
+    the requests they refuse with 429 Too Many Requests and Retry-After.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # See instawork.db.middleware.ReplicaMiddleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        # A coroutine under ASGI, awaited by the handler.
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if request.method in SAFE_METHODS or (view_class is not None and issubclass(view_class, APIView)):
+            # DRF throttles its own views.
+            return None
+        if not is_write_throttled(view_func):
+            return None
+        waits = []
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, None):
+                waits.append(throttle.wait() or 1)
+        if waits:
+            return _retry_response(HTTPStatus.TOO_MANY_REQUESTS, 'Too many requests, slow down.', max(waits))
+        return None
+
+
+class WriteConcurrencyMiddleware:
+    """
+    Shed writes rather than let them pile up on the database's single writer,
+    where they would hold connections and threads that reads need: at most
+    WRITE_CONCURRENCY unsafe requests run at once per process, up to
+    WRITE_QUEUE_SIZE more wait up to WRITE_QUEUE_TIMEOUT seconds for their
+    turn, and the rest are answered 503 Service Unavailable with Retry-After
+    right away. Reads never wait here, nor do the views that opt out with
+    `write_throttled = False`.
+    """
+    sync_capable = True
+    async_capable = True
+    # How often a waiting write checks for a free slot under ASGI, where it
+    # can't block the event loop on the semaphore.
+    poll_interval = 0.01
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slots = threading.BoundedSemaphore(settings.WRITE_CONCURRENCY)
+        self.lock = threading.Lock()
+        self.waiting = 0
+        if asyncio.iscoroutinefunction(get_response):
+            # See instawork.db.middleware.ReplicaMiddleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not self.is_write(request):
+            return self.get_response(request)
+        if not self.slots.acquire(blocking=False):
+            if not self.join_queue():
+                return self.overloaded()
+            try:
+                acquired = self.slots.acquire(timeout=settings.WRITE_QUEUE_TIMEOUT)
+            finally:
+                self.leave_queue()
+            if not acquired:
+                return self.overloaded()
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release()
+
+    async def __acall__(self, request):
+        if not self.is_write(request):
+            return await self.get_response(request)
+        if not self.slots.acquire(blocking=False):
+            if not self.join_queue():
+                return self.overloaded()
+            try:
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + settings.WRITE_QUEUE_TIMEOUT
+                while not (acquired := self.slots.acquire(blocking=False)) and loop.time() < deadline:
+                    await asyncio.sleep(self.poll_interval)
+            finally:
+                self.leave_queue()
+            if not acquired:
+                return self.overloaded()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.slots.release()
+
+    @staticmethod
+    def is_write(request):
+        if request.method in SAFE_METHODS:
+            return False
+        # The view isn't resolved yet this early in the chain.
+        try:
+            match = resolve(request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return True
+        return is_write_throttled(match.func)
+
+    def join_queue(self):
+        with self.lock:
+            if self.waiting >= settings.WRITE_QUEUE_SIZE:
+                return False
+            self.waiting += 1
+            return True
+
+    def leave_queue(self):
+        with self.lock:
+            self.waiting -= 1
+
+    @staticmethod
+    def overloaded():
+        return _retry_response(HTTPStatus.SERVICE_UNAVAILABLE, 'Too many writes in progress, try again shortly.',
+                               settings.WRITE_RETRY_AFTER)
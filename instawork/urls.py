@@ -17,8 +17,11 @@ from django.contrib import admin
 from django.urls import path, include, reverse_lazy
 from django.views.generic.base import RedirectView
 
+from instawork.metrics.views import metrics
+
 urlpatterns = [
     path('', RedirectView.as_view(url=reverse_lazy('members:list')), name="main"),
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('members/', include('members.urls', namespace="members"))
 ]
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'instawork.settings')
 
 application = get_wsgi_application()
+
+if settings.STATIC_MANIFEST:
+    from instawork.assets.server import StaticFilesApplication
+
+    application = StaticFilesApplication(application)
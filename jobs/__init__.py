@@ -0,0 +1,9 @@
+"""
+A durable background job queue in the database.
+
+Views queue side effects, e.g. emails, with `Job.objects.enqueue()` in the
+transaction of the change that calls for them, and `run_workers` runs them
+in a thread or process pool, retrying failed jobs with exponential backoff.
+Tasks are functions registered with `jobs.registry.task` in a `tasks`
+module of any installed app.
+"""
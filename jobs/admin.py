@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from jobs.models import Job
+
+
+@admin.action(description='Retry the selected jobs')
+def retry(modeladmin, request, queryset):
+    queryset.update(status=Job.Statuses.queued, run_at=timezone.now(), attempts=0, locked_by='')
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'status', 'attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'task')
+    readonly_fields = ('locked_by', 'attempts', 'last_error', 'created_at')
+    actions = [retry]
+
+
+admin.site.register(Job, JobAdmin)
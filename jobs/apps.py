@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = settings.DEFAULT_AUTO_FIELD
+    name = 'jobs'
+
+    def ready(self):
+        # Register the tasks of every app, in the web processes and the workers alike.
+        autodiscover_modules('tasks')
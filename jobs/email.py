@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.mail import get_connection
+
+
+def send_messages(messages, batch_size=None):
+    """
+    Send the EmailMessages over one connection to the email backend, e.g.
+    one SMTP session, `batch_size` messages at a time, and return how many
+    were sent. Raises on the first batch that fails.
+    """
+    batch_size = batch_size or settings.JOBS_EMAIL_BATCH_SIZE
+    sent = 0
+    with get_connection(fail_silently=False) as connection:
+        for start in range(0, len(messages), batch_size):
+            sent += connection.send_messages(messages[start:start + batch_size]) or 0
+    return sent
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.worker import POOLS, Worker
+
+
+class Command(BaseCommand):
+    help = 'Run the queued background jobs, e.g. the member emails, in a pool of threads or processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Jobs run at once (default: 4).')
+        parser.add_argument('--pool', choices=POOLS, default='thread',
+                            help='Run the jobs on threads, fine for I/O like email, or on processes (default: thread).')
+        parser.add_argument('--once', action='store_true', help='Run one batch of due jobs and exit.')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to wait when there is nothing to do (default: 1).')
+        parser.add_argument('--batch-size', type=int, help='Jobs claimed at a time (default: JOBS_BATCH_SIZE).')
+        parser.add_argument('--database', choices=settings.DATABASE_SHARDS,
+                            help='Run the jobs of this shard only (default: every shard).')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1.')
+        worker = Worker(concurrency=options['concurrency'], pool=options['pool'], batch_size=options['batch_size'],
+                        using=options['database'])
+        if options['once']:
+            claimed = worker.run_once()
+            worker.executor.shutdown()
+            self.stdout.write(f'Ran {claimed} jobs.')
+            return
+        self.stdout.write(f'Running jobs on {options["concurrency"]} {options["pool"]}s as {worker.name}.')
+        try:
+            worker.run(interval=options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import F, Q, TextChoices
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from instawork.db import immediate_atomic
+from jobs.registry import tasks
+
+
+class JobManager(models.Manager):
+
+    def enqueue(self, task, payloads, delay=0, max_attempts=None):
+        """
+        Queue a `task` job per payload on the manager's database, in its
+        current transaction, so that the jobs are run if and only if it
+        commits, and return them.
+        """
+        if task not in tasks:
+            raise LookupError(f'No task is registered as "{task}".')
+        run_at = timezone.now() + timedelta(seconds=delay)
+        max_attempts = max_attempts or settings.JOBS_MAX_ATTEMPTS
+        return self.bulk_create([self.model(task=task, payload=payload, run_at=run_at, max_attempts=max_attempts)
+                                 for payload in payloads])
+
+    def claim(self, worker, limit, visibility_timeout):
+        """
+        Claim up to `limit` due jobs for `worker` and return them. A claim
+        pushes the jobs' run_at `visibility_timeout` seconds ahead, so that
+        they are claimed again if the worker doesn't finish them by then.
+
+        Concurrent workers never claim the same job: the rows are locked with
+        SELECT ... FOR UPDATE SKIP LOCKED where the database supports it,
+        while on SQLite the BEGIN IMMEDIATE transaction serializes the claims.
+        """
+        now = timezone.now()
+        with immediate_atomic(using=self.db):
+            due = (self.filter(status=self.model.Statuses.queued, run_at__lte=now).order_by('run_at', 'pk')
+                   .select_for_update(skip_locked=True))
+            pks = list(due.values_list('pk', flat=True)[:limit])
+            self.filter(pk__in=pks).update(locked_by=worker, attempts=F('attempts') + 1,
+                                           run_at=now + timedelta(seconds=visibility_timeout))
+        return list(self.filter(pk__in=pks, locked_by=worker).order_by('pk'))
+
+    def complete(self, worker, pks):
+        """Delete the done jobs, unless another worker claimed them after `worker`'s claim expired."""
+        self.filter(pk__in=pks, locked_by=worker).delete()
+
+
+class Job(models.Model):
+    """
+    A task to run in the background on a JSON payload. Done jobs are deleted
+    and jobs still failing after `max_attempts` are kept as failed.
+    """
+    class Statuses(TextChoices):
+        queued = 'queued'
+        failed = 'failed'
+
+    task = models.CharField(_('task'), max_length=100)
+    payload = models.JSONField(_('payload'), encoder=DjangoJSONEncoder)
+    status = models.CharField(_('status'), max_length=10, choices=Statuses.choices, default=Statuses.queued)
+    # When the job is due: when queued, when to retry it, or when its claim expires.
+    run_at = models.DateTimeField(_('run at'), default=timezone.now)
+    locked_by = models.CharField(_('locked by'), max_length=100, blank=True)
+    attempts = models.PositiveIntegerField(_('attempts'), default=0)
+    max_attempts = models.PositiveIntegerField(_('max attempts'))
+    last_error = models.TextField(_('last error'), blank=True)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+
+    objects = JobManager()
+
+    class Meta:
+        indexes = [
+            # Partial, so that the failed jobs stay out of the way of the claims.
+            models.Index(fields=['run_at', 'id'], condition=Q(status='queued'), name='job_queued_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
@@ -0,0 +1,26 @@
+from collections import namedtuple
+
+Task = namedtuple('Task', ['name', 'function', 'batch_size'])
+
+tasks = {}
+
+
+def task(name, batch_size=None):
+    """
+    Register the decorated function as the task `name`. It's called with the
+    payload of one job, or, given a `batch_size`, with the payloads of up to
+    that many jobs at a time, which then succeed or fail together.
+    """
+    def register(function):
+        tasks[name] = Task(name, function, batch_size)
+        return function
+    return register
+
+
+def run_task(name, payloads):
+    """Run the task `name` on the payloads of a batch of its jobs. Runs in the pool."""
+    task = tasks[name]
+    if task.batch_size is None:
+        task.function(*payloads)
+    else:
+        task.function(payloads)
@@ -0,0 +1,118 @@
+from concurrent.futures import Executor, Future
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends import locmem
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.email import send_messages
+from jobs.models import Job
+from jobs.registry import task
+from jobs.worker import Worker
+
+calls = []
+
+
+@task('tests.record')
+def record(payload):
+    calls.append([payload])
+
+
+@task('tests.record_batch', batch_size=2)
+def record_batch(payloads):
+    calls.append(payloads)
+
+
+@task('tests.fail')
+def fail(payload):
+    raise ValueError('nope')
+
+
+class InlineExecutor(Executor):
+    """Runs the jobs in the test's thread, and so in its transaction."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class CountingBackend(locmem.EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class JobTest(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def worker(self, **kwargs):
+        return Worker(executor=InlineExecutor(), backoff=10, **kwargs)
+
+    def test_run(self):
+        Job.objects.enqueue('tests.record', [{'n': n} for n in range(3)])
+        Job.objects.enqueue('tests.record_batch', [{'n': n} for n in range(3)])
+        self.assertEqual(self.worker().run_once(), 6)
+        self.assertCountEqual(calls, [[{'n': 0}], [{'n': 1}], [{'n': 2}], [{'n': 0}, {'n': 1}], [{'n': 2}]])
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(self.worker().run_once(), 0)
+
+    def test_thread_pool(self):
+        Job.objects.enqueue('tests.record', [{'n': n} for n in range(10)])
+        worker = Worker(concurrency=4)
+        self.addCleanup(worker.executor.shutdown)
+        self.assertEqual(worker.run_once(), 10)
+        self.assertEqual(sorted(payload['n'] for payload, in calls), list(range(10)))
+
+    def test_unknown_task(self):
+        with self.assertRaises(LookupError):
+            Job.objects.enqueue('tests.nope', [{}])
+
+    def test_retries(self):
+        job, = Job.objects.enqueue('tests.fail', [{}], max_attempts=2)
+        worker = self.worker()
+        with self.assertLogs('jobs.worker', 'WARNING'):
+            self.assertEqual(worker.run_once(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), (Job.Statuses.queued, 1, 'nope'))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=9))
+        self.assertEqual(worker.run_once(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.assertEqual(worker.run_once(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Statuses.failed, 2))
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(worker.run_once(), 0)
+
+    def test_visibility_timeout(self):
+        job, = Job.objects.enqueue('tests.record', [{}])
+        claimed = Job.objects.claim('worker 1', 10, visibility_timeout=60)
+        self.assertEqual(claimed, [job])
+        self.assertEqual(Job.objects.claim('worker 2', 10, visibility_timeout=60), [])
+
+        # Worker 1 died: the job is due again once its claim expires.
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(Job.objects.claim('worker 2', 10, visibility_timeout=60), [job])
+        Job.objects.complete('worker 1', [job.pk])
+        self.assertTrue(Job.objects.filter(pk=job.pk).exists())
+        Job.objects.complete('worker 2', [job.pk])
+        self.assertFalse(Job.objects.filter(pk=job.pk).exists())
+
+    @override_settings(EMAIL_BACKEND='jobs.tests.test_jobs.CountingBackend')
+    def test_send_messages(self):
+        CountingBackend.opened = 0
+        messages = [EmailMessage('Hi', 'Hello', to=[f'{n}@example.com']) for n in range(5)]
+        self.assertEqual(send_messages(messages, batch_size=2), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 1)
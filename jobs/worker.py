@@ -0,0 +1,110 @@
+import logging
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import run_task, tasks
+
+logger = logging.getLogger(__name__)
+
+POOLS = ('thread', 'process')
+
+
+class Worker:
+    """
+    Claim due jobs in batches of up to `batch_size` and run them on
+    `concurrency` threads or processes, the jobs of a task registered with a
+    batch size a batch at a time.
+
+    A failed job is retried with exponential backoff and marked failed after
+    its `max_attempts`. A job whose worker died is run again once its
+    visibility timeout expires, so tasks should tolerate running twice.
+
+    Jobs are queued on the database they are about, e.g. the shard of a
+    member, so the worker claims from every shard, or from `using` only.
+    """
+
+    def __init__(self, concurrency=1, pool='thread', executor=None, batch_size=None, visibility_timeout=None,
+                 backoff=None, max_backoff=None, using=None):
+        if executor is not None:
+            self.executor = executor
+        elif pool == 'process':
+            # Spawned, not forked: a child must not share the parent's database connections.
+            self.executor = ProcessPoolExecutor(max_workers=concurrency, initializer=django.setup,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.batch_size = batch_size or settings.JOBS_BATCH_SIZE
+        self.visibility_timeout = visibility_timeout or settings.JOBS_VISIBILITY_TIMEOUT
+        self.backoff = settings.JOBS_BACKOFF_SECONDS if backoff is None else backoff
+        self.max_backoff = settings.JOBS_MAX_BACKOFF_SECONDS if max_backoff is None else max_backoff
+        self.databases = settings.DATABASE_SHARDS if using is None else [using]
+        self.name = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+    def run(self, interval=1.0, iterations=None):
+        """Run jobs until interrupted, waiting `interval` seconds whenever idle."""
+        try:
+            while iterations is None or iterations > 0:
+                if not self.run_once():
+                    time.sleep(interval)
+                if iterations is not None:
+                    iterations -= 1
+        finally:
+            self.executor.shutdown()
+
+    def run_once(self):
+        """Claim and run a batch of due jobs per shard and return how many were claimed."""
+        return sum(self.run_jobs(using) for using in self.databases)
+
+    def run_jobs(self, using=DEFAULT_DB_ALIAS):
+        jobs = Job.objects.db_manager(using).claim(self.name, self.batch_size, self.visibility_timeout)
+        futures = {}
+        for batch in self.split(jobs):
+            task = batch[0].task
+            if task not in tasks:
+                self.fail(batch, LookupError(f'No task is registered as "{task}".'), using, permanent=True)
+                continue
+            futures[self.executor.submit(run_task, task, [job.payload for job in batch])] = batch
+
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                self.fail(batch, e, using)
+            else:
+                Job.objects.db_manager(using).complete(self.name, [job.pk for job in batch])
+        return len(jobs)
+
+    @staticmethod
+    def split(jobs):
+        """The claimed jobs in the batches they run in: one per call of their task."""
+        by_task = {}
+        for job in jobs:
+            by_task.setdefault(job.task, []).append(job)
+        for task, task_jobs in by_task.items():
+            size = tasks[task].batch_size if task in tasks and tasks[task].batch_size else 1
+            for start in range(0, len(task_jobs), size):
+                yield task_jobs[start:start + size]
+
+    def fail(self, batch, error, using=DEFAULT_DB_ALIAS, permanent=False):
+        message = str(error) or error.__class__.__name__
+        for job in batch:
+            jobs = Job.objects.db_manager(using).filter(pk=job.pk, locked_by=self.name)
+            if permanent or job.attempts >= job.max_attempts:
+                logger.error('Job %s failed for good after %d attempts: %s', job, job.attempts, message)
+                jobs.update(status=Job.Statuses.failed, last_error=message)
+                continue
+            delay = min(self.backoff * 2 ** (job.attempts - 1), self.max_backoff)
+            logger.warning('Job %s failed (attempt %d), retrying in %ss: %s', job, job.attempts, delay, message)
+            jobs.update(run_at=timezone.now() + timedelta(seconds=delay), last_error=message)
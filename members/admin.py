@@ -1,11 +1,101 @@
 from django.contrib import admin
 
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.forms import UserChangeForm
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
 from django.forms import EmailField
 from django.utils.translation import gettext_lazy as _
 
-from members.models import Member
+from members.models import Member, Team
+from members.pagination import EstimatedCountPaginator, InvalidCursor, decode_cursor, encode_cursor
+from members.search import search_members
+
+AFTER_VAR = 'after'
+
+
+class KeysetChangeList(ChangeList):
+    """
+    A changelist for large tables. It loads only the displayed columns, and
+    when sorted on non-null columns it links to the next page by keyset
+    (`?after=<cursor>`), so that deep pages are an index range scan instead
+    of an ever larger OFFSET.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.after = request.GET.get(AFTER_VAR)
+        self.keys = None
+        self.next_page_url = None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Sorting, filtering and searching start over from the first page.
+        return super().get_query_string({AFTER_VAR: None, **(new_params or {})}, remove)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        self.keys = self.get_keys(queryset.query.order_by)
+        if self.after and self.keys:
+            queryset = queryset.filter(self.seek(self.decode_cursor(self.after)))
+        return queryset
+
+    def get_results(self, request):
+        displayed = [name for name in self.list_display if self.get_field(name) is not None]
+        self.queryset = self.queryset.only(*displayed, *(name for name, _ in self.keys or ()))
+        super().get_results(request)
+        if not self.keys or (self.show_all and self.can_show_all):
+            return
+        results = list(self.result_list)
+        if len(results) == self.list_per_page:
+            self.next_page_url = self.get_query_string({AFTER_VAR: self.encode_cursor(results[-1])})
+
+    def get_field(self, name):
+        try:
+            return self.opts.pk if name == 'pk' else self.opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def get_keys(self, ordering):
+        """The `(field name, descending)` keyset of `ordering`, or None if it can't be one."""
+        keys = []
+        for key in ordering:
+            if not isinstance(key, str):
+                return None
+            name = key.lstrip('-')
+            field = self.get_field(name)
+            if field is None or not field.concrete or field.null:
+                return None
+            if name not in dict(keys):
+                keys.append((name, key.startswith('-')))
+        return keys or None
+
+    def seek(self, values):
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.keys, values):
+            condition |= Q(**equal, **{f'{name}__{"lt" if descending else "gt"}': value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name) for name, _ in self.keys]
+        return encode_cursor([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+
+    def decode_cursor(self, cursor):
+        try:
+            values = decode_cursor(cursor)
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError(cursor)
+            return [self.get_field(name).to_python(value) for (name, _), value in zip(self.keys, values)]
+        except (InvalidCursor, ValueError, TypeError, ValidationError) as e:
+            raise IncorrectLookupParameters(e)
 
 
 class MemberChangeForm(UserChangeForm):
@@ -35,6 +125,30 @@ class MemberAdmin(UserAdmin):
     list_display = ('email', 'first_name', 'last_name', 'is_staff')
     search_fields = ('email', 'first_name', 'last_name')
     ordering = ('email',)
+    # Neither the filtered nor the total count is a COUNT(*) over the table.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(queryset, per_page, estimate=Member.objects.estimate_count, orphans=orphans,
+                              allow_empty_first_page=allow_empty_first_page)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_members(queryset, search_term, ranked=False), False
 
 
 admin.site.register(Member, MemberAdmin)
+
+
+class TeamAdmin(admin.ModelAdmin):
+    list_display = ('name', 'shard', 'moving', 'created_at')
+    # Changed by rebalance_team only.
+    readonly_fields = ('shard', 'moving')
+
+
+admin.site.register(Team, TeamAdmin)
@@ -0,0 +1,20 @@
+"""
+Async ORM helpers.
+
+Django 4.0 has no async queryset API yet (`aget()` and `async for` arrived
+in 4.1), so these use the native methods when they exist and otherwise run
+the blocking call in the request's worker thread.
+"""
+from asgiref.sync import sync_to_async
+
+
+async def aget(queryset, *args, **kwargs):
+    if hasattr(queryset, 'aget'):
+        return await queryset.aget(*args, **kwargs)
+    return await sync_to_async(queryset.get)(*args, **kwargs)
+
+
+async def alist(queryset):
+    if hasattr(queryset, '__aiter__'):
+        return [obj async for obj in queryset]
+    return await sync_to_async(list)(queryset)
@@ -1,17 +1,27 @@
 from django.apps import AppConfig
 from django.conf import settings
-from django.db.models.signals import post_migrate
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import post_migrate, post_init, post_save, post_delete
+
+from members.search import ensure_search_triggers
 
 EMAIL = settings.ADMIN_EMAIL
 PASSWORD = settings.ADMIN_PASSWORD
 
 
-def create_admin(sender, **kwargs):
+def create_admin(sender, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS and using in settings.DATABASE_SHARDS:
+        # Members log in on `default`.
+        return
     member = sender.get_model('Member')
     try:
-        member.objects.get(email=EMAIL)
+        member.objects.db_manager(using).get(email=EMAIL)
     except member.DoesNotExist:
-        member.objects.create_superuser(EMAIL, PASSWORD)
+        member.objects.db_manager(using).create_superuser(EMAIL, PASSWORD)
+
+
+def ensure_search_index(sender, using, **kwargs):
+    ensure_search_triggers(connections[using])
 
 
 class MemberConfig(AppConfig):
@@ -19,4 +29,16 @@ class MemberConfig(AppConfig):
     name = 'members'
 
     def ready(self):
+        from members import signals
+
         post_migrate.connect(create_admin, sender=self)
+        post_migrate.connect(ensure_search_index, sender=self)
+        member = self.get_model('Member')
+        post_init.connect(signals.remember_team_membership, sender=member)
+        post_save.connect(signals.count_saved_member, sender=member)
+        post_delete.connect(signals.count_deleted_member, sender=member)
+        post_save.connect(signals.invalidate_member_cache, sender=member)
+        post_delete.connect(signals.invalidate_member_cache, sender=member)
+        post_save.connect(signals.record_saved_member, sender=member)
+        post_delete.connect(signals.record_deleted_member, sender=member)
+        post_delete.connect(signals.record_member_tombstone, sender=member)
@@ -0,0 +1,71 @@
+"""
+ASGI-native variants of the member list, detail and delete endpoints.
+
+Django 4.0 only runs function views natively under ASGI, and these must not
+be wrapped in sync decorators, which would make Django run them in a thread.
+"""
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse
+from rest_framework.utils.urls import replace_query_param
+
+from instawork.db.routers import read_databases
+from members.aio import aget
+from members.models import Member, TeamMoving
+from members.pagination import InvalidCursor, KeysetPaginator
+from members.permissions import DeleteMemberPermission
+from members.serializers import MemberSerializer
+
+PAGE_SIZE = 50
+RETRY_AFTER = 5
+
+
+def _link(request, cursor):
+    if cursor is None:
+        return None
+    return replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
+
+
+async def member_list(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    paginator = KeysetPaginator(Member.objects.exclude(is_superuser=True), PAGE_SIZE,
+                                databases=read_databases(Member))
+    try:
+        page = await paginator.apage(request.GET.get('cursor'))
+    except InvalidCursor as e:
+        raise Http404(str(e))
+    return JsonResponse({
+        'next': _link(request, page.next_cursor),
+        'previous': _link(request, page.previous_cursor),
+        'results': MemberSerializer(page.object_list, many=True).data,
+    })
+
+
+async def member_detail(request, pk):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        member = await aget(Member.objects.exclude(is_superuser=True), pk=pk)
+    except Member.DoesNotExist:
+        raise Http404('No member matches the given query.')
+    return JsonResponse(MemberSerializer(member).data)
+
+
+async def member_delete(request, pk):
+    if request.method != 'DELETE':
+        return HttpResponseNotAllowed(['DELETE'])
+    # Resolving the session user hits the database.
+    if not await sync_to_async(DeleteMemberPermission().has_permission)(request, None):
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'},
+                            status=HTTPStatus.FORBIDDEN)
+    try:
+        deleted = await sync_to_async(Member.objects.delete_members)([pk])
+    except TeamMoving as e:
+        response = HttpResponse(str(e), status=HTTPStatus.SERVICE_UNAVAILABLE, content_type='text/plain')
+        response['Retry-After'] = RETRY_AFTER
+        return response
+    if not deleted:
+        raise Http404('No member matches the given query.')
+    return HttpResponse(status=HTTPStatus.NO_CONTENT)
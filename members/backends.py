@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from members import cache as member_cache
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend keeping the members it loads for authenticated requests in
+    the session cache, so that with cache-backed sessions an authenticated
+    request needs no query before the view runs. Cached members are dropped
+    whenever they are written, see members.cache.invalidate_members, from
+    the cache of the writing process only unless the session cache is
+    shared, hence the short MEMBERS_USER_CACHE_TIMEOUT without one.
+    """
+
+    def get_user(self, user_id):
+        cache = member_cache.get_user_cache()
+        key = member_cache.USER_KEY % user_id
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout=settings.MEMBERS_USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,153 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends import locmem
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+LIST_VERSION_KEY = 'members:list-version'
+MEMBER_VERSION_KEY = 'members:version:%s'
+LIST_KEY = 'members:list:%s:%s'
+CARD_KEY = 'members:card:%s:%s'
+CARD_TEMPLATE = 'members/_member_card.html'
+USER_KEY = 'members:user:%s'
+
+_evictions = {}
+
+
+class LocMemCache(locmem.LocMemCache):
+    """A LocMemCache that counts the entries it culls to stay under MAX_ENTRIES."""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._name = name
+
+    def _cull(self):
+        size = len(self._cache)
+        super()._cull()
+        _evictions[self._name] = _evictions.get(self._name, 0) + size - len(self._cache)
+
+    @property
+    def evictions(self):
+        return _evictions.get(self._name, 0)
+
+
+class CacheStats:
+    """Process-wide hit/miss counters for the member fragment cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, hits=0, misses=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else None,
+            'evictions': getattr(get_cache(), 'evictions', None),
+        }
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[settings.MEMBERS_CACHE_ALIAS]
+
+
+def get_user_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def _new_version():
+    # A version that is missing from the cache (never set, or evicted) restarts
+    # from the clock instead of 1, so it can't collide with an older version
+    # whose fragments are still cached.
+    return time.time_ns()
+
+
+def _get_versions(keys):
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+    return {**versions, **missing}
+
+
+def _bump(keys):
+    cache = get_cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+
+
+def invalidate_members(pks, using=None):
+    """
+    Invalidate the cards and the cached users (see members.backends) of the
+    given members and every cached list page.
+
+    Versions are bumped right away, so the writing request reads its own
+    writes, and once more after commit, so fragments rendered by concurrent
+    requests from the pre-commit data are not kept under the new version.
+    """
+    pks = [pk for pk in pks if pk is not None]
+    keys = [MEMBER_VERSION_KEY % pk for pk in pks] + [LIST_VERSION_KEY]
+    user_keys = [USER_KEY % pk for pk in pks]
+
+    def invalidate():
+        _bump(keys)
+        if user_keys:
+            get_user_cache().delete_many(user_keys)
+    invalidate()
+    transaction.on_commit(invalidate, using=using)
+
+
+def list_key(cursor):
+    version = _get_versions([LIST_VERSION_KEY])[LIST_VERSION_KEY]
+    return LIST_KEY % (version, hashlib.md5(cursor.encode()).hexdigest())
+
+
+def get_fragment(key):
+    value = get_cache().get(key)
+    stats.record(hits=value is not None, misses=value is None)
+    return None if value is None else mark_safe(value)
+
+
+def set_fragment(key, value):
+    get_cache().set(key, str(value), timeout=settings.MEMBERS_CACHE_TIMEOUT)
+
+
+def render_cards(members):
+    """Render a card per member, reusing the cached card of every unchanged member."""
+    versions = _get_versions([MEMBER_VERSION_KEY % member.pk for member in members])
+    keys = {member.pk: CARD_KEY % (member.pk, versions[MEMBER_VERSION_KEY % member.pk]) for member in members}
+    cache = get_cache()
+    cards = cache.get_many(keys.values())
+    stats.record(hits=len(cards), misses=len(keys) - len(cards))
+
+    rendered = {}
+    for member in members:
+        if keys[member.pk] not in cards:
+            rendered[keys[member.pk]] = render_to_string(CARD_TEMPLATE, {'member': member})
+    if rendered:
+        cache.set_many({key: str(card) for key, card in rendered.items()}, timeout=settings.MEMBERS_CACHE_TIMEOUT)
+    cards.update(rendered)
+    return [mark_safe(cards[keys[member.pk]]) for member in members]
@@ -0,0 +1,110 @@
+import heapq
+from datetime import datetime
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.utils import timezone
+
+from members.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+class CursorExpired(InvalidCursor):
+    pass
+
+
+class ChangesPage:
+    def __init__(self, changed, deleted, cursor, has_more):
+        self.changed = changed
+        self.deleted = deleted
+        self.cursor = cursor
+        self.has_more = has_more
+
+
+class ChangeFeed:
+    """
+    Page through the members saved and deleted after a cursor, oldest change
+    first, merging the members on (updated_at, id) with their tombstones on
+    (deleted_at, member_id), across all of `databases`, e.g. the shards.
+
+    Each cursor holds the key of the last change returned from every
+    database, so a page is a bounded range scan of both indexes of each,
+    however large the tables are. Members are stamped once their write holds
+    the database's write lock, see instawork.db.lock_for_write(), and
+    tombstones after the member rows are deleted, so a change committed
+    later never sorts before a cursor already handed out. That only holds
+    within a database, hence a key per database.
+
+    Cursors also hold when they were issued, or for the pages of a pass that
+    has more, when the pass started, and are refused once that is older than
+    the tombstone retention, since deletions not returned yet may be gone.
+    How old the changes themselves are doesn't matter.
+    """
+
+    def __init__(self, members, tombstones, per_page, databases=(DEFAULT_DB_ALIAS,)):
+        self.members = members
+        self.tombstones = tombstones
+        self.per_page = int(per_page)
+        self.databases = list(databases)
+
+    def page(self, cursor=None):
+        now = timezone.now()
+        positions, issued_at = self.decode_cursor(cursor) if cursor else ({}, now)
+        sources = []
+        for db in self.databases:
+            members, tombstones = self.members.using(db), self.tombstones.using(db)
+            if db in positions:
+                at, pk = positions[db]
+                members = members.filter(Q(updated_at__gt=at) | Q(updated_at=at, id__gt=pk))
+                tombstones = tombstones.filter(Q(deleted_at__gt=at) | Q(deleted_at=at, member_id__gt=pk))
+            members = members.order_by('updated_at', 'id')[:self.per_page + 1]
+            tombstones = tombstones.order_by('deleted_at', 'member_id')[:self.per_page + 1]
+            sources.append([(member.updated_at, member.pk, db, member, False) for member in members])
+            sources.append([(tombstone.deleted_at, tombstone.member_id, db, tombstone, True)
+                            for tombstone in tombstones])
+
+        changes = list(heapq.merge(*sources, key=lambda change: change[:2]))
+        has_more = len(changes) > self.per_page
+        changes = changes[:self.per_page]
+        for at, pk, db, _, _ in changes:
+            positions[db] = (at, pk)
+        return ChangesPage(
+            changed=[obj for _, _, _, obj, deleted in changes if not deleted],
+            deleted=[pk for _, pk, _, _, deleted in changes if deleted],
+            # Deletions past a page with more may be as old as the pass.
+            cursor=self.encode_cursor(positions, issued_at if has_more else now) if positions else None,
+            has_more=has_more,
+        )
+
+    def encode_cursor(self, positions, issued_at):
+        """
+        A cursor from the `{database: (at, pk)}` of the last change returned
+        from each database and the time it counts as issued.
+        """
+        return encode_cursor(['c', {db: [at.isoformat(), pk] for db, (at, pk) in sorted(positions.items())},
+                              issued_at.isoformat()])
+
+    def decode_cursor(self, cursor):
+        payload = decode_cursor(cursor)
+        try:
+            kind, *keys = payload
+            if kind != 'c':
+                raise ValueError(cursor)
+            if not isinstance(keys[0], dict):
+                # Cursors from before sharding hold the key of `default` only.
+                keys = [{DEFAULT_DB_ALIAS: keys}]
+            positions, issued_at = keys if len(keys) == 2 else (keys[0], None)
+            if issued_at is not None:
+                issued_at = datetime.fromisoformat(issued_at)
+            positions = {db: (datetime.fromisoformat(at), pk) for db, (at, pk) in positions.items()}
+            if (any(not isinstance(pk, int) or timezone.is_naive(at) for at, pk in positions.values())
+                    or issued_at is not None and timezone.is_naive(issued_at)):
+                raise ValueError(cursor)
+        except (ValueError, TypeError, AttributeError, IndexError):
+            raise InvalidCursor('Invalid cursor.')
+        if issued_at is None:
+            # Those didn't say when they were issued, but not before their last change.
+            issued_at = max(at for at, _ in positions.values())
+        if issued_at < timezone.now() - settings.MEMBER_TOMBSTONE_RETENTION:
+            raise CursorExpired('Cursor expired, sync from the start.')
+        return positions, issued_at
@@ -0,0 +1,57 @@
+import csv
+import heapq
+import json
+from operator import itemgetter
+
+from instawork.db.routers import read_databases
+from members.models import Member
+
+EXPORT_FIELDS = ('id', 'first_name', 'last_name', 'email', 'phone', 'role', 'date_joined')
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """A file-like object that returns what is written instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(chunk_size=2000, using=None):
+    """
+    Yield team members as tuples of EXPORT_FIELDS, fetched `chunk_size` rows
+    at a time from a database cursor without building model instances.
+    Reads every shard, `default` from a replica if any, merged by id, unless
+    `using` is given.
+    """
+    databases = read_databases(Member) if using is None else [using]
+    return heapq.merge(*(Member.objects.using(db)
+                         .exclude(is_superuser=True)
+                         .order_by('id')
+                         .values_list(*EXPORT_FIELDS)
+                         .iterator(chunk_size=chunk_size) for db in databases), key=itemgetter(0))
+
+
+def _serializable(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([_serializable(value) for value in row])
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, map(_serializable, row)))) + '\n'
+
+
+SERIALIZERS = {
+    'csv': csv_lines,
+    'jsonl': jsonl_lines,
+}
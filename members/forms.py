@@ -1,4 +1,6 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 
 from members.models import Member
 
@@ -6,10 +8,19 @@ from members.models import Member
 class AddMemberForm(forms.ModelForm):
     class Meta:
         model = Member
-        fields = ['first_name', 'last_name', 'email', 'phone', 'role']
+        fields = ['first_name', 'last_name', 'email', 'phone', 'picture', 'role']
+        field_classes = {'picture': forms.ImageField}
         widgets = {
             'first_name': forms.TextInput(attrs={'placeholder': 'First name'}),
             'last_name': forms.TextInput(attrs={'placeholder': 'Last name'}),
             'phone': forms.TextInput(attrs={'placeholder': 'Phone (###-###-####)'}),
-            'email': forms.EmailInput(attrs={'placeholder': 'Email'})
+            'email': forms.EmailInput(attrs={'placeholder': 'Email'}),
+            'picture': forms.FileInput(attrs={'accept': 'image/*'}),
         }
+
+    def clean_picture(self):
+        picture = self.cleaned_data['picture']
+        if picture and picture.size > settings.MEMBERS_PICTURE_MAX_SIZE:
+            raise forms.ValidationError(
+                f'The picture must be at most {filesizeformat(settings.MEMBERS_PICTURE_MAX_SIZE)}.')
+        return picture
@@ -0,0 +1,163 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F, Q
+from django.utils.text import capfirst
+
+from members.forms import AddMemberForm
+from members.models import ImportCheckpoint, Member
+
+IMPORT_FIELDS = AddMemberForm.Meta.fields
+FORMATS = ('csv', 'jsonl')
+
+
+def guess_format(path):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return 'jsonl' if extension in ('jsonl', 'ndjson', 'json') else 'csv'
+
+
+def read_csv(stream):
+    """Yield `(line number, row)` pairs from a CSV stream with a header row."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(stream):
+    """Yield `(line number, row)` pairs from a JSON Lines stream, skipping blank lines."""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            row = {'__line__': line.rstrip('\n')}
+        yield line_number, row
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class MemberImporter:
+    """
+    Validate and insert members in batches.
+
+    Every batch costs one query per shard to find email/phone collisions
+    with existing members plus one INSERT per `chunk_size` valid rows, all
+    in a single transaction, instead of a full form validation and INSERT
+    per row.
+    """
+
+    def __init__(self, chunk_size=500, using=DEFAULT_DB_ALIAS):
+        self.chunk_size = chunk_size
+        self.using = using
+        self.opts = Member._meta
+
+    def import_batch(self, batch, checkpoint=None):
+        """
+        Import a batch of `(line number, row)` pairs and return the number of
+        members created along with the rejected `(line number, row, errors)`.
+        The `checkpoint`, if any, is advanced past the batch in its transaction.
+        """
+        members, rejected = self.validate_batch(batch)
+        with transaction.atomic(using=self.using):
+            Member.objects.db_manager(self.using).bulk_create(members, batch_size=self.chunk_size)
+            if checkpoint is not None:
+                checkpoint.advance(batch[-1][0], len(members), len(rejected))
+        return len(members), rejected
+
+    def validate_batch(self, batch):
+        cleaned, rejected = [], []
+        for line_number, row in batch:
+            values, errors = self.clean_row(row)
+            if errors:
+                rejected.append((line_number, row, errors))
+            else:
+                cleaned.append((line_number, row, values))
+
+        emails = {values['email'] for _, _, values in cleaned}
+        phones = {values['phone'] for _, _, values in cleaned}
+        taken_emails, taken_phones = set(), set()
+        # Emails and phone numbers are unique across the shards.
+        for using in dict.fromkeys([self.using, *settings.DATABASE_SHARDS]) if cleaned else ():
+            existing = Member.all_objects.using(using).filter(Q(email__in=emails) | Q(phone__in=phones))
+            for email, phone in existing.values_list('email', 'phone'):
+                taken_emails.add(email)
+                taken_phones.add(phone)
+
+        members = []
+        for line_number, row, values in cleaned:
+            errors = {}
+            if values['email'] in taken_emails:
+                errors['email'] = [self.unique_error_message('email')]
+            if values['phone'] in taken_phones:
+                errors['phone'] = [self.unique_error_message('phone')]
+            if errors:
+                rejected.append((line_number, row, errors))
+                continue
+            taken_emails.add(values['email'])
+            taken_phones.add(values['phone'])
+            members.append(Member(**values))
+        return members, rejected
+
+    def clean_row(self, row):
+        values, errors = {}, {}
+        if '__line__' in row:
+            return values, {'__all__': ['Line is not a JSON object.']}
+        for name in IMPORT_FIELDS:
+            field = self.opts.get_field(name)
+            raw = row.get(name)
+            raw = '' if raw is None else str(raw).strip()
+            if not raw and field.has_default():
+                values[name] = field.get_default()
+                continue
+            try:
+                values[name] = field.clean(raw, None)
+            except ValidationError as e:
+                errors[name] = e.messages
+        if 'email' in values:
+            values['email'] = Member.objects.normalize_email(values['email'])
+        return values, errors
+
+    def unique_error_message(self, field_name):
+        field = self.opts.get_field(field_name)
+        return field.error_messages['unique'] % {
+            'model_name': capfirst(self.opts.verbose_name),
+            'field_label': capfirst(field.verbose_name),
+        }
+
+
+class Checkpoint:
+    """
+    Progress of an import, stored in the database it imports into and
+    advanced in the transaction of every batch, so that a crashed import
+    resumes right after the last committed batch, never before or after it.
+    """
+
+    def __init__(self, name, using=DEFAULT_DB_ALIAS):
+        self.name = name
+        self.checkpoints = ImportCheckpoint.objects.db_manager(using)
+
+    def load(self):
+        return self.checkpoints.filter(name=self.name).values('line', 'imported', 'rejected').first() or {}
+
+    def advance(self, line, imported, rejected):
+        if not self.checkpoints.filter(name=self.name).update(
+                line=line, imported=F('imported') + imported, rejected=F('rejected') + rejected):
+            self.checkpoints.create(name=self.name, line=line, imported=imported, rejected=rejected)
+
+    def clear(self):
+        self.checkpoints.filter(name=self.name).delete()
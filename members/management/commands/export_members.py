@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from members.exporter import SERIALIZERS, export_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream all team members to a CSV or JSON Lines file (or stdout) in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=SERIALIZERS, default='csv', help='Output format (default: csv).')
+        parser.add_argument('-o', '--output', help='File to write to. Defaults to stdout.')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Rows fetched from the database at a time (default: 2000).')
+        parser.add_argument('--database',
+                            help='Database to export from. Defaults to every shard, "default" from a '
+                                 'read replica, if any.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+        rows = export_rows(chunk_size=options['chunk_size'], using=options['database'])
+        lines = SERIALIZERS[options['format']](rows)
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+                f.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,65 @@
+import json
+import os
+from itertools import dropwhile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from members.importer import FORMATS, READERS, Checkpoint, MemberImporter, batched, guess_format
+
+
+class Command(BaseCommand):
+    help = ('Stream members from a CSV (with a header row) or JSON Lines file into the database. '
+            'Rejected rows are written to an errors file and progress to a checkpoint file, '
+            'so that an interrupted import can be resumed with --resume.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON Lines file to import.')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Input format. Guessed from the file extension by default.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows validated and committed together (default: 1000).')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Rows per INSERT statement (default: 500).')
+        parser.add_argument('--errors', help='Where to write rejected rows. Defaults to <path>.errors.jsonl.')
+        parser.add_argument('--checkpoint',
+                            help='Name of the checkpoint, kept in the database. Defaults to the absolute <path>.')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip the rows committed by a previous run of the same import.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database to import into. Defaults to the "default" database.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['batch_size'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--batch-size and --chunk-size must be positive.')
+        read_rows = READERS[options['format'] or guess_format(path)]
+        checkpoint = Checkpoint(options['checkpoint'] or os.path.abspath(path), using=options['database'])
+        importer = MemberImporter(chunk_size=options['chunk_size'], using=options['database'])
+
+        state = {'line': 0, 'imported': 0, 'rejected': 0}
+        if options['resume']:
+            state.update(checkpoint.load())
+        else:
+            checkpoint.clear()
+        resumed_from = state['line']
+
+        try:
+            stream = open(path, newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(e)
+        with stream, open(options['errors'] or f'{path}.errors.jsonl', 'a' if resumed_from else 'w') as errors:
+            rows = dropwhile(lambda item: item[0] <= resumed_from, read_rows(stream))
+            for batch in batched(rows, options['batch_size']):
+                imported, rejected = importer.import_batch(batch, checkpoint)
+                for line_number, row, row_errors in rejected:
+                    errors.write(json.dumps({'line': line_number, 'row': row, 'errors': row_errors}) + '\n')
+                errors.flush()
+                state['line'] = batch[-1][0]
+                state['imported'] += imported
+                state['rejected'] += len(rejected)
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f"Line {state['line']}: {state['imported']} imported, "
+                                      f"{state['rejected']} rejected.")
+        checkpoint.clear()
+        self.stdout.write(f"Imported {state['imported']} members, rejected {state['rejected']} rows.")
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from members.models import MemberTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete the member tombstones older than MEMBER_TOMBSTONE_RETENTION.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', choices=settings.DATABASE_SHARDS,
+                            help='Shard to prune. Defaults to every shard.')
+
+    def handle(self, *args, **options):
+        count = sum(MemberTombstone.objects.db_manager(using).prune(settings.MEMBER_TOMBSTONE_RETENTION)
+                    for using in ([options['database']] if options['database'] else settings.DATABASE_SHARDS))
+        self.stdout.write(f'Deleted {count} tombstones.')
@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from members.models import Member
+
+
+class Command(BaseCommand):
+    help = 'Delete the soft-deleted members for good, in batches. Meant to run off-peak, e.g. from cron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Members to delete per transaction. Defaults to 1000.')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches, to leave room for other writers.')
+        parser.add_argument('--database', choices=settings.DATABASE_SHARDS,
+                            help='Shard to purge. Defaults to every shard.')
+
+    def handle(self, *args, **options):
+        count = 0
+        for using in [options['database']] if options['database'] else settings.DATABASE_SHARDS:
+            for deleted in Member.all_objects.db_manager(using).purge_deleted(options['batch_size']):
+                count += deleted
+                time.sleep(options['sleep'])
+        self.stdout.write(f'Purged {count} members.')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from instawork.db.sharding import get_shard
+from members.models import Team
+from members.sharding import TeamMover, TeamMoveError
+
+
+class Command(BaseCommand):
+    help = ('Move a team\'s members to another shard while the team stays online; '
+            'writes to the team are refused with 503 for the final pass only.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('team', type=int, help='Id of the team to move.')
+        parser.add_argument('--to', dest='target',
+                            help='Shard to move the team to. Defaults to the one the team hashes to '
+                                 'with the current DATABASE_SHARDS.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Members per batch (default: 1000).')
+
+    def handle(self, *args, **options):
+        try:
+            team = Team.objects.using(DEFAULT_DB_ALIAS).get(pk=options['team'])
+        except Team.DoesNotExist:
+            raise CommandError(f'No team with id {options["team"]}.')
+        target = options['target'] or get_shard(team.name)
+        source = team.shard
+        try:
+            moved = TeamMover(team, target, batch_size=options['batch_size']).move()
+        except TeamMoveError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f'Moved {moved} members of {team} from "{source}" to "{target}".')
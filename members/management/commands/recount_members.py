@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from members.models import Member
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized team member counter from the Member table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database to repair. Defaults to the "default" database.')
+
+    def handle(self, *args, **options):
+        manager = Member.objects.db_manager(options['database'])
+        previous = manager.count_team_members()
+        count = manager.recount_team_members()
+        self.stdout.write(f'Team member counter: {previous} -> {count}.')
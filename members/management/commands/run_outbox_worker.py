@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from members.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = ('Deliver member change events from the outbox to the webhooks in OUTBOX_WEBHOOKS, '
+            'in batches and in order per webhook.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Deliver one batch per webhook and exit.')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to wait when there is nothing to deliver (default: 1).')
+        parser.add_argument('--batch-size', type=int, help='Events per request (default: OUTBOX_BATCH_SIZE).')
+        parser.add_argument('--database', choices=settings.DATABASE_SHARDS,
+                            help='Deliver the events of this shard only (default: every shard).')
+
+    def handle(self, *args, **options):
+        if not settings.OUTBOX_WEBHOOKS:
+            raise CommandError('No webhooks are configured, see INSTAWORK_WEBHOOKS.')
+        worker = OutboxWorker(batch_size=options['batch_size'], using=options['database'])
+        if options['once']:
+            delivered = worker.run_once()
+            worker.session.close()
+            self.stdout.write(f'Delivered {delivered} events.')
+            return
+        self.stdout.write(f"Delivering to {', '.join(worker.endpoints)}.")
+        try:
+            worker.run(interval=options['interval'])
+        except KeyboardInterrupt:
+            pass
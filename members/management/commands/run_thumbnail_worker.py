@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from members.thumbnails import ThumbnailWorker
+
+
+class Command(BaseCommand):
+    help = 'Make the thumbnails of the uploaded profile pictures in a pool of processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Make the thumbnails of one batch and exit.')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to wait when there is nothing to do (default: 1).')
+        parser.add_argument('--processes', type=int, help='Size of the process pool (default: one per CPU).')
+        parser.add_argument('--batch-size', type=int, default=100, help='Members per batch (default: 100).')
+        parser.add_argument('--database', choices=settings.DATABASE_SHARDS,
+                            help='Make the thumbnails of this shard only (default: every shard).')
+
+    def handle(self, *args, **options):
+        worker = ThumbnailWorker(processes=options['processes'], batch_size=options['batch_size'],
+                                 using=options['database'])
+        if options['once']:
+            updated = worker.run_once()
+            worker.executor.shutdown()
+            self.stdout.write(f'Made thumbnails for {updated} members.')
+            return
+        try:
+            worker.run(interval=options['interval'])
+        except KeyboardInterrupt:
+            pass
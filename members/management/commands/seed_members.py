@@ -0,0 +1,40 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from members.importer import batched
+from members.models import Member
+from members.seeding import PHONE_NUMBERS, next_number, synthetic_member
+
+
+class Command(BaseCommand):
+    help = ('Insert synthetic team members with unique emails and phone numbers, '
+            'e.g. to benchmark the member pages at a given table size.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, required=True, help='Members to insert.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Members inserted per transaction (default: 5000).')
+        parser.add_argument('--seed', type=int, help='Random seed for names and roles.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database to seed. Defaults to the "default" database.')
+
+    def handle(self, *args, **options):
+        if options['count'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--count must not be negative and --batch-size must be positive.')
+        manager = Member.objects.db_manager(options['database'])
+        # Phone numbers are unique across the shards.
+        start = next_number()
+        if start + options['count'] > PHONE_NUMBERS:
+            raise CommandError('Not enough phone numbers left above the existing ones.')
+        rng = random.Random(options['seed'])
+
+        seeded = 0
+        for numbers in batched(range(start, start + options['count']), options['batch_size']):
+            manager.bulk_create([synthetic_member(n, rng) for n in numbers])
+            seeded += len(numbers)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'{seeded} members seeded.')
+        if options['verbosity']:
+            self.stdout.write(f'Seeded {seeded} members.')
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Copy the primary SQLite database onto every read replica. Stands in for replication '
+            'when the replicas are local SQLite files, e.g. in development.')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No read replicas are configured, see INSTAWORK_DB_REPLICAS.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+                raise CommandError('Only SQLite replicas can be copied, use database replication otherwise.')
+            primary.ensure_connection()
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write(f'Copied the primary database to {alias}.')
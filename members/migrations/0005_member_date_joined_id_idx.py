@@ -0,0 +1,17 @@
+# Generated by Django 4.0.6 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0004_alter_member_phone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['date_joined', 'id'], name='member_date_joined_id_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.6 on 2026-10-18 15:31
+
+from django.db import migrations, models
+
+
+def count_team_members(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    member = apps.get_model('members', 'Member')
+    counter = apps.get_model('members', 'MemberCounter')
+    counter.objects.using(db_alias).update_or_create(
+        key='team_members', defaults={'value': member.objects.using(db_alias).filter(is_superuser=False).count()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0005_member_date_joined_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberCounter',
+            fields=[
+                ('key', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='key')),
+                ('value', models.BigIntegerField(default=0, verbose_name='value')),
+            ],
+        ),
+        migrations.RunPython(count_team_members, migrations.RunPython.noop),
+    ]
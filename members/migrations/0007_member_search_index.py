@@ -0,0 +1,49 @@
+from django.db import migrations
+
+FIELDS = ('first_name', 'last_name', 'email', 'phone')
+COLUMNS = ', '.join(FIELDS)
+NEW_VALUES = ', '.join(f'new.{field}' for field in FIELDS)
+OLD_VALUES = ', '.join(f'old.{field}' for field in FIELDS)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f"""
+        CREATE VIRTUAL TABLE members_member_fts USING fts5(
+            {COLUMNS}, content='members_member', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""")
+    schema_editor.execute(f"""
+        CREATE TRIGGER members_member_fts_insert AFTER INSERT ON members_member BEGIN
+            INSERT INTO members_member_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END""")
+    schema_editor.execute(f"""
+        CREATE TRIGGER members_member_fts_delete AFTER DELETE ON members_member BEGIN
+            INSERT INTO members_member_fts(members_member_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+        END""")
+    schema_editor.execute(f"""
+        CREATE TRIGGER members_member_fts_update AFTER UPDATE OF {COLUMNS} ON members_member BEGIN
+            INSERT INTO members_member_fts(members_member_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO members_member_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END""")
+    schema_editor.execute("INSERT INTO members_member_fts(members_member_fts) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for action in ('insert', 'delete', 'update'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS members_member_fts_{action}')
+    schema_editor.execute('DROP TABLE IF EXISTS members_member_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0006_membercounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
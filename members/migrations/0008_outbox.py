@@ -0,0 +1,48 @@
+# Generated by Django 4.0.6 on 2026-10-18 16:04
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0007_member_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadLetter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(db_index=True, max_length=500, verbose_name='endpoint')),
+                ('event_id', models.BigIntegerField(verbose_name='event id')),
+                ('type', models.CharField(choices=[('member.created', 'Created'), ('member.updated', 'Updated'), ('member.deleted', 'Deleted')], max_length=30, verbose_name='type')),
+                ('member_id', models.BigIntegerField(verbose_name='member id')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='payload')),
+                ('error', models.TextField(verbose_name='error')),
+                ('attempts', models.PositiveIntegerField(verbose_name='attempts')),
+                ('failed_at', models.DateTimeField(auto_now_add=True, verbose_name='failed at')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('member.created', 'Created'), ('member.updated', 'Updated'), ('member.deleted', 'Deleted')], max_length=30, verbose_name='type')),
+                ('member_id', models.BigIntegerField(verbose_name='member id')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='payload')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='created at')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WebhookCursor',
+            fields=[
+                ('endpoint', models.CharField(max_length=500, primary_key=True, serialize=False, verbose_name='endpoint')),
+                ('last_event_id', models.BigIntegerField(default=0, verbose_name='last event id')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='failed attempts')),
+                ('next_attempt_at', models.DateTimeField(blank=True, null=True, verbose_name='next attempt at')),
+                ('last_error', models.TextField(blank=True, verbose_name='last error')),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.0.6 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0008_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberTombstone',
+            fields=[
+                ('member_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='member id')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='deleted at')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='updated at'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['updated_at', 'id'], name='member_updated_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membertombstone',
+            index=models.Index(fields=['deleted_at', 'member_id'], name='tombstone_deleted_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations, models, transaction
+
+from utils import normalize_phone
+
+CHUNK_SIZE = 1000
+
+
+def backfill_phone_normalized(apps, schema_editor):
+    """
+    Fill phone_normalized chunk by chunk, each in its own short transaction,
+    so that writers only ever wait for one chunk instead of the whole table.
+    """
+    db_alias = schema_editor.connection.alias
+    member = apps.get_model('members', 'Member')
+    last_pk = 0
+    while True:
+        with transaction.atomic(using=db_alias):
+            chunk = list(member.objects.using(db_alias).filter(pk__gt=last_pk, phone_normalized__isnull=True)
+                         .order_by('pk').only('pk', 'phone')[:CHUNK_SIZE])
+            if not chunk:
+                return
+            for row in chunk:
+                row.phone_normalized = normalize_phone(row.phone)
+            member.objects.using(db_alias).bulk_update(chunk, ['phone_normalized'])
+        last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('members', '0009_member_changes'),
+    ]
+
+    operations = [
+        # AddField rebuilds the whole table on SQLite, while adding a nullable
+        # column is a change to the schema only.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='member',
+                    name='phone_normalized',
+                    field=models.CharField(editable=False, max_length=16, null=True, verbose_name='normalized phone'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE "members_member" ADD COLUMN "phone_normalized" varchar(16) NULL',
+                    'ALTER TABLE "members_member" DROP COLUMN "phone_normalized"',
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_phone_normalized, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='member',
+            constraint=models.UniqueConstraint(condition=models.Q(('phone_normalized__isnull', False)),
+                                               fields=('phone_normalized',), name='member_phone_normalized_uniq'),
+        ),
+    ]
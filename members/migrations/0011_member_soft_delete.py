@@ -0,0 +1,62 @@
+import django.db.models.manager
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0010_member_phone_normalized'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='member',
+            options={'default_manager_name': 'all_objects', 'verbose_name': 'user', 'verbose_name_plural': 'users'},
+        ),
+        migrations.AlterModelManagers(
+            name='member',
+            managers=[
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='member',
+            name='member_date_joined_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='member',
+            name='member_updated_at_id_idx',
+        ),
+        # AddField rebuilds the whole table on SQLite, while adding a nullable
+        # column is a change to the schema only.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='member',
+                    name='deleted_at',
+                    field=models.DateTimeField(editable=False, null=True, verbose_name='deleted at'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE "members_member" ADD COLUMN "deleted_at" datetime NULL',
+                    'ALTER TABLE "members_member" DROP COLUMN "deleted_at"',
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['date_joined', 'id'],
+                               name='member_live_date_joined_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['updated_at', 'id'],
+                               name='member_live_updated_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'],
+                               name='member_deleted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+import members.pictures
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0011_member_soft_delete'),
+    ]
+
+    operations = [
+        # AddField rebuilds the whole table on SQLite, while adding a column
+        # with a constant default is a change to the schema only.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='member',
+                    name='picture',
+                    field=models.FileField(blank=True, storage=members.pictures.ContentAddressedStorage(),
+                                           upload_to='pictures', verbose_name='profile picture'),
+                ),
+                migrations.AddField(
+                    model_name='member',
+                    name='thumbnails_at',
+                    field=models.DateTimeField(editable=False, null=True, verbose_name='thumbnails made at'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE "members_member" ADD COLUMN "picture" varchar(100) NOT NULL DEFAULT \'\'',
+                    'ALTER TABLE "members_member" DROP COLUMN "picture"',
+                ),
+                migrations.RunSQL(
+                    'ALTER TABLE "members_member" ADD COLUMN "thumbnails_at" datetime NULL',
+                    'ALTER TABLE "members_member" DROP COLUMN "thumbnails_at"',
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('thumbnails_at__isnull', True),
+                                                  models.Q(('picture', ''), _negated=True)),
+                               fields=['id'], name='member_thumbnails_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def add_default_team(apps, schema_editor):
+    """Put the existing members in a team on `default`, where they are."""
+    using = schema_editor.connection.alias
+    Member = apps.get_model('members', 'Member')
+    members = Member._base_manager.using(using).filter(is_superuser=False, team__isnull=True)
+    if members.exists():
+        team = apps.get_model('members', 'Team').objects.using(using).create(name='Default', shard=using)
+        members.update(team=team)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0012_member_picture'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='name')),
+                ('shard', models.CharField(editable=False, max_length=50, verbose_name='shard')),
+                ('moving', models.BooleanField(default=False, editable=False, verbose_name='moving')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+            ],
+        ),
+        # AddField rebuilds the whole table on SQLite, while adding a nullable
+        # column is a change to the schema only.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='member',
+                    name='team',
+                    field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True,
+                                            on_delete=django.db.models.deletion.DO_NOTHING,
+                                            related_name='members', to='members.team', verbose_name='team'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE "members_member" ADD COLUMN "team_id" bigint NULL',
+                    'ALTER TABLE "members_member" DROP COLUMN "team_id"',
+                ),
+            ],
+        ),
+        migrations.RunPython(add_default_team, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['team', 'date_joined', 'id'],
+                               name='member_live_team_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['team', 'updated_at', 'id'],
+                               name='member_live_team_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0013_team'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=500, primary_key=True, serialize=False, verbose_name='name')),
+                ('line', models.PositiveBigIntegerField(default=0, verbose_name='last line')),
+                ('imported', models.PositiveBigIntegerField(default=0, verbose_name='imported')),
+                ('rejected', models.PositiveBigIntegerField(default=0, verbose_name='rejected')),
+            ],
+        ),
+    ]
@@ -1,10 +1,72 @@
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.db.models import TextChoices
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, models, router, transaction
+from django.db.models.fields.files import FieldFile
+from django.db.models import CASCADE, DO_NOTHING, SET_NULL, Count, F, Max, Q, Subquery, TextChoices
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from utils import phone_number_regex
+from instawork.db import lock_for_write
+from instawork.db.sharding import get_shard
+from members import cache as member_cache
+from members.pictures import picture_storage, thumbnail_urls
+from utils import normalize_phone, phone_number_regex
+
+# Members created on the shard at index i of settings.DATABASE_SHARDS get ids
+# equal to i modulo this, so that ids stay unique when rebalance_team moves
+# members between shards.
+MAX_SHARDS = 64
+
+
+class TeamMoving(Exception):
+    """A write to members of a team that rebalance_team is moving, or has moved off the database written."""
+
+
+class TeamManager(models.Manager):
+
+    def check_writable(self, pks, using):
+        """
+        Take the write lock of `using` in the current transaction, then raise
+        TeamMoving unless the teams `pks` all live on `using` and none of
+        them is being moved. rebalance_team takes the lock of the team's shard
+        once the team is marked moving, to wait for the writers that checked
+        before that.
+        """
+        pks = set(pks) - {None}
+        if not pks:
+            return
+        lock_for_write(self.model, using)
+        # From the primary: a replica may lag behind a move.
+        teams = self.using(DEFAULT_DB_ALIAS).filter(pk__in=pks)
+        if teams.filter(Q(moving=True) | ~Q(shard=using)).exists():
+            raise TeamMoving('The team is being moved, try again shortly.')
+
+
+class Team(models.Model):
+    """
+    A client team. Its members live on the database `shard`, picked by
+    consistent hashing when the team is created and changed only by
+    rebalance_team. Teams themselves always live on `default`.
+    """
+    name = models.CharField(_('name'), max_length=100)
+    shard = models.CharField(_('shard'), max_length=50, editable=False)
+    # Set while rebalance_team moves the members, who can't be changed meanwhile.
+    moving = models.BooleanField(_('moving'), default=False, editable=False)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+
+    objects = TeamManager()
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.shard:
+            # Kept from then on, so that adding shards doesn't move existing teams.
+            self.shard = get_shard(self.name)
+        super().save(*args, **kwargs)
 
 
 class MemberManager(BaseUserManager):
@@ -22,7 +84,7 @@ class MemberManager(BaseUserManager):
         email = self.normalize_email(email)
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
-        user.save()
+        user.save(using=self._db)
         return user
 
     def create_superuser(self, email, password, **extra_fields):
@@ -39,6 +101,232 @@ class MemberManager(BaseUserManager):
             raise ValueError(_('Superuser must have is_superuser=True.'))
         return self.create_user(email, password, **extra_fields)
 
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Insert the members, bump the team member counter in the same
+        transaction and invalidate the cached list, since bulk_create doesn't
+        send post_save.
+        """
+        objs = list(objs)
+        for member in objs:
+            member.phone_normalized = normalize_phone(member.phone)
+        with transaction.atomic(using=self.db, savepoint=False):
+            Team.objects.check_writable({member.team_id for member in objs}, self.db)
+            new = [member for member in objs if member.pk is None]
+            if new and len(settings.DATABASE_SHARDS) > 1:
+                for member, pk in zip(new, self.allocate_ids(len(new))):
+                    member.pk = pk
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get('ignore_conflicts'):
+                # Skipped rows can't be told apart from inserted ones.
+                self.recount_team_members()
+            else:
+                MemberCounter.objects.db_manager(self.db).increment(
+                    MemberCounter.TEAM_MEMBERS, sum(not member.is_superuser for member in objs))
+            # New members have no cached cards yet, only the list pages are stale.
+            member_cache.invalidate_members([], using=self.db)
+            OutboxEvent.objects.db_manager(self.db).record(
+                OutboxEvent.Types.created, [member for member in objs if member.pk is not None])
+        return objs
+
+    def allocate_ids(self, count):
+        """
+        Reserve `count` ids for new members on this shard, unique across
+        shards, in the transaction of the insert, see MAX_SHARDS.
+        """
+        shard = settings.DATABASE_SHARDS.index(self.db)
+        counters = MemberCounter.objects.db_manager(self.db)
+        if not counters.filter(key=MemberCounter.MEMBER_IDS).update(value=F('value') + count):
+            # Start above the ids handed out before sharding was enabled.
+            highest = self.model._base_manager.using(self.db).aggregate(highest=Max('pk'))['highest'] or 0
+            counters.create(key=MemberCounter.MEMBER_IDS, value=highest // MAX_SHARDS + count)
+        last = counters.get_value(MemberCounter.MEMBER_IDS)
+        return [value * MAX_SHARDS + shard for value in range(last - count + 1, last + 1)]
+
+    def get_queryset(self):
+        # Soft-deleted members are gone as far as the app is concerned, see
+        # soft_delete() and AllMemberManager.
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+    def delete_members(self, pks):
+        """
+        Delete the members with the given primary keys the way the views do:
+        soft_delete() them when settings.MEMBERS_SOFT_DELETE, or else
+        bulk_delete() them. Return the primary keys that were found.
+        """
+        if settings.MEMBERS_SOFT_DELETE:
+            return self.soft_delete(pks)
+        return self.bulk_delete(pks)
+
+    def bulk_delete(self, pks):
+        """
+        Delete the members with the given primary keys in one transaction and
+        return the primary keys that were found and deleted.
+
+        Unlike QuerySet.delete(), which fetches every member to send
+        post_delete and then clears their relations batch by batch, this
+        issues one DELETE per related table regardless of the number of
+        members, and applies the counter and cache updates of the signal
+        handlers once for the whole set.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = self.filter(pk__in=pks).values_list('pk', 'is_superuser', 'team')
+            members = {pk: is_superuser for pk, is_superuser, team in rows}
+            Team.objects.check_writable({team for pk, is_superuser, team in rows}, self.db)
+            if members and self._delete_rows(members):
+                self._deleted(members)
+        return set(members)
+
+    def soft_delete(self, pks):
+        """
+        Mark the members with the given primary keys deleted with a single
+        UPDATE and return the primary keys that were found.
+
+        They disappear from this manager, can't log in and are reported
+        deleted right away, whatever the number of their related rows, which
+        are left for purge_deleted() to delete with them later.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = self.filter(pk__in=pks).values_list('pk', 'is_superuser', 'team')
+            members = {pk: is_superuser for pk, is_superuser, team in rows}
+            if members:
+                Team.objects.check_writable({team for pk, is_superuser, team in rows}, self.db)
+                lock_for_write(self.model, self.db)
+                now = timezone.now()
+                self.model._base_manager.using(self.db).filter(pk__in=members).update(
+                    deleted_at=now, updated_at=now, is_active=False)
+                self._deleted(members)
+        return set(members)
+
+    def purge_deleted(self, batch_size=1000):
+        """
+        Delete the soft-deleted members for good, oldest first, in
+        transactions of `batch_size` members, yielding the size of every
+        batch so that the caller can pace them.
+        """
+        deleted = self.model._base_manager.using(self.db).filter(deleted_at__isnull=False).order_by('deleted_at')
+        while True:
+            with transaction.atomic(using=self.db, savepoint=False):
+                pks = list(deleted.values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    return
+                self._delete_rows(pks)
+            yield len(pks)
+
+    def _delete_rows(self, pks):
+        """
+        Delete the member rows `pks` and clear their relations with one
+        statement per related table, and return True, or delete them with
+        QuerySet.delete(), which sends the delete signals, and return False
+        when a relation needs the collector's checks (PROTECT, RESTRICT and
+        SET_DEFAULT).
+        """
+        opts = self.model._meta
+        members = self.model._base_manager.using(self.db).filter(pk__in=pks)
+        relations = [relation for relation in opts.related_objects if not relation.many_to_many]
+        if any(relation.on_delete not in (CASCADE, SET_NULL, DO_NOTHING) for relation in relations):
+            members.delete()
+            return False
+
+        for field in opts.many_to_many:
+            field.remote_field.through._base_manager.using(self.db).filter(
+                **{f'{field.m2m_field_name()}__in': pks}).delete()
+        for relation in opts.related_objects:
+            if relation.many_to_many:
+                related = relation.through._base_manager.using(self.db).filter(
+                    **{f'{relation.field.m2m_reverse_field_name()}__in': pks})
+                related.delete()
+                continue
+            related = relation.related_model._base_manager.using(self.db).filter(
+                **{f'{relation.field.name}__in': pks})
+            if relation.on_delete is CASCADE:
+                related.delete()
+            elif relation.on_delete is SET_NULL:
+                related.update(**{relation.field.name: None})
+        members._raw_delete(self.db)
+        return True
+
+    def _deleted(self, members):
+        """Do the work of the post_delete handlers for the `{pk: is_superuser}` members."""
+        MemberCounter.objects.db_manager(self.db).increment(
+            MemberCounter.TEAM_MEMBERS, -sum(not is_superuser for is_superuser in members.values()))
+        member_cache.invalidate_members(members, using=self.db)
+        OutboxEvent.objects.db_manager(self.db).record_deleted(members)
+        MemberTombstone.objects.db_manager(self.db).record(members)
+
+    def bulk_update_role(self, pks, role):
+        """
+        Set the role of the members with the given primary keys with a single
+        UPDATE and return the primary keys that were found.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = self.filter(pk__in=pks).values_list('pk', 'team')
+            found = {pk for pk, team in rows}
+            Team.objects.check_writable({team for pk, team in rows}, self.db)
+            lock_for_write(self.model, self.db)
+            self.filter(pk__in=found).update(role=role, updated_at=timezone.now())
+            member_cache.invalidate_members(found, using=self.db)
+            OutboxEvent.objects.db_manager(self.db).record(
+                OutboxEvent.Types.updated, self.filter(pk__in=found).order_by('pk'))
+        return found
+
+    def get_team_summary(self, team=None):
+        """
+        Return the team member count and when a member was last saved or
+        deleted, in one query that reads the counter row and the ends of the
+        (updated_at, id) and (deleted_at, member_id) indexes.
+
+        For a `team`, the count comes from its range of the (team,
+        date_joined) index instead of the counter of the whole database, and
+        the last deletion is the last one on the team's shard.
+        """
+        using = self.db
+        members = self.using(using)
+        if team is None:
+            count = MemberCounter.objects.using(using).filter(key=MemberCounter.TEAM_MEMBERS).values('value')[:1]
+        else:
+            members = members.filter(team=team)
+            count = (members.filter(is_superuser=False).order_by().values('team')
+                     .annotate(count=Count('pk')).values('count'))
+        last_deleted = MemberTombstone.objects.using(using).order_by('-deleted_at').values('deleted_at')[:1]
+        row = (members.order_by('-updated_at')
+               .annotate(count=Subquery(count), last_deleted=Subquery(last_deleted))
+               .values_list('count', 'updated_at', 'last_deleted').first())
+        if row is None:
+            return 0, None
+        count, updated, deleted = row
+        return count or 0, max(filter(None, (updated, deleted)))
+
+    def estimate_count(self):
+        """
+        The number of members as a primary key lookup of the team member
+        counter instead of a COUNT(*), short by the handful of superusers.
+        """
+        return self.count_team_members()
+
+    def count_team_members(self):
+        return MemberCounter.objects.db_manager(self.db).get_value(MemberCounter.TEAM_MEMBERS)
+
+    def recount_team_members(self):
+        """
+        Recompute the team member counter from the table, repairing any drift.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            count = self.filter(is_superuser=False).count()
+            MemberCounter.objects.db_manager(self.db).set_value(MemberCounter.TEAM_MEMBERS, count)
+        return count
+
+
+class AllMemberManager(MemberManager):
+    """
+    The default manager, used for authentication, unique checks and the
+    admin: MemberManager including the soft-deleted members, whose email and
+    phone number stay taken until they are purged.
+    """
+
+    def get_queryset(self):
+        return super(MemberManager, self).get_queryset()
+
 
 class Member(AbstractUser):
     class RoleChoices(TextChoices):
@@ -49,11 +337,279 @@ class Member(AbstractUser):
     email = models.EmailField(_('email address'), unique=True)
     phone = models.CharField(_('phone'), max_length=12, validators=[phone_number_regex], unique=True)
     role = models.CharField(_('role'), max_length=20, choices=RoleChoices.choices, default=RoleChoices.regular)
+    # `phone` in E.164 form, the form lookups by phone number arrive in.
+    phone_normalized = models.CharField(_('normalized phone'), max_length=16, null=True, editable=False)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+    # Not a database constraint: teams live on `default` and members on their
+    # team's shard. The (team, ...) indexes below cover lookups by team.
+    team = models.ForeignKey(Team, verbose_name=_('team'), null=True, blank=True, on_delete=DO_NOTHING,
+                             db_constraint=False, db_index=False, related_name='members')
+    picture = models.FileField(_('profile picture'), upload_to='pictures', storage=picture_storage, blank=True)
+    # When members.thumbnails made the thumbnails of `picture`; until then cards show the default picture.
+    thumbnails_at = models.DateTimeField(_('thumbnails made at'), null=True, editable=False)
+    # Set by MemberManager.soft_delete() until purge_deleted() deletes the row.
+    deleted_at = models.DateTimeField(_('deleted at'), null=True, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
+    all_objects = AllMemberManager()
     objects = MemberManager()
 
+    class Meta(AbstractUser.Meta):
+        default_manager_name = 'all_objects'
+        indexes = [
+            # Partial, so that they only hold the members MemberManager returns.
+            models.Index(fields=['date_joined', 'id'], condition=Q(deleted_at__isnull=True),
+                         name='member_live_date_joined_id_idx'),
+            models.Index(fields=['updated_at', 'id'], condition=Q(deleted_at__isnull=True),
+                         name='member_live_updated_at_id_idx'),
+            models.Index(fields=['team', 'date_joined', 'id'], condition=Q(deleted_at__isnull=True),
+                         name='member_live_team_joined_idx'),
+            models.Index(fields=['team', 'updated_at', 'id'], condition=Q(deleted_at__isnull=True),
+                         name='member_live_team_updated_idx'),
+            models.Index(fields=['deleted_at'], condition=Q(deleted_at__isnull=False),
+                         name='member_deleted_at_idx'),
+            models.Index(fields=['id'], condition=Q(thumbnails_at__isnull=True) & ~Q(picture=''),
+                         name='member_thumbnails_pending_idx'),
+        ]
+        constraints = [
+            # Partial, so that SQLite adds it as an index instead of rebuilding the table.
+            models.UniqueConstraint(fields=['phone_normalized'], condition=Q(phone_normalized__isnull=False),
+                                    name='member_phone_normalized_uniq'),
+        ]
+
+    # The field values as last loaded or saved, see get_dirty_fields().
+    _loaded_values = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_loaded_values()
+
+    def _remember_loaded_values(self, attnames=None):
+        """Remember the current values of the `attnames` fields, or of all of them, as saved."""
+        values = {field.attname: self._comparable(self.__dict__[field.attname])
+                  for field in self._meta.concrete_fields
+                  if field.attname in self.__dict__ and (attnames is None or field.attname in attnames)}
+        self._loaded_values = values if attnames is None else {**(self._loaded_values or {}), **values}
+
+    @staticmethod
+    def _comparable(value):
+        # Files are saved in place, keep their name.
+        return value.name if isinstance(value, FieldFile) else value
+
+    def get_dirty_fields(self):
+        """
+        The names of the fields set to another value since the member was
+        loaded or last saved, deferred fields that were assigned included.
+        """
+        loaded = self._loaded_values or {}
+        return {
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname in self.__dict__
+            and (field.attname not in loaded or loaded[field.attname] != self._comparable(self.__dict__[field.attname]))
+        }
+
+    def validate_unique(self, exclude=None):
+        """
+        Check the unique fields that changed with one query for all of them,
+        instead of one query per unique field, changed or not.
+        """
+        exclude = set(exclude or ())
+        dirty = None if self._state.adding or self._loaded_values is None else self.get_dirty_fields()
+        names = [
+            field.name for field in self._meta.concrete_fields
+            if field.unique and not field.primary_key and field.name not in exclude
+            and getattr(self, field.attname) is not None and (dirty is None or field.name in dirty)
+        ]
+        if not names:
+            return
+
+        lookups = Q()
+        for name in names:
+            lookups |= Q(**{name: getattr(self, name)})
+        others = self.__class__._default_manager.filter(lookups)
+        if not self._state.adding and self.pk is not None:
+            others = others.exclude(pk=self.pk)
+        errors = {}
+        for row in others.values(*names):
+            for name, value in row.items():
+                if value == getattr(self, name) and name not in errors:
+                    errors[name] = [self.unique_error_message(self.__class__, (name,))]
+        if errors:
+            raise ValidationError(errors)
+
+    def save(self, *args, **kwargs):
+        self.phone_normalized = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None and not kwargs.get('force_insert') and not self._state.adding
+                and self._loaded_values is not None):
+            # Write only the columns that changed, and nothing if none did.
+            update_fields = self.get_dirty_fields()
+            if not update_fields:
+                return
+            kwargs['update_fields'] = update_fields
+        if update_fields is not None and 'picture' in update_fields:
+            # members.thumbnails makes the thumbnails of the new picture.
+            self.thumbnails_at = None
+            update_fields = kwargs['update_fields'] = {*update_fields, 'thumbnails_at'}
+        if update_fields is not None and set(update_fields) & set(OutboxEvent.MEMBER_FIELDS):
+            update_fields = {*update_fields, 'updated_at'}
+            if 'phone' in update_fields:
+                update_fields.add('phone_normalized')
+            kwargs['update_fields'] = update_fields
+        # Keep the post_save counter update in the same transaction as the write,
+        # and stamp updated_at under the write lock, see members.changes.
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            lock_for_write(self.__class__, using)
+            Team.objects.check_writable([self.team_id], using)
+            if self.pk is None and len(settings.DATABASE_SHARDS) > 1:
+                self.pk = self.__class__._default_manager.db_manager(using).allocate_ids(1)[0]
+                kwargs['force_insert'] = True
+            super().save(*args, **kwargs)
+        saved = kwargs.get('update_fields')
+        self._remember_loaded_values(None if saved is None else {self._meta.get_field(name).attname for name in saved})
+
+    @property
+    def thumbnail_urls(self):
+        """The URLs of the thumbnails of the picture, or None until they are made."""
+        if not self.picture or self.thumbnails_at is None:
+            return None
+        return thumbnail_urls(self.picture.name)
+
     @property
     def is_admin(self):
         return self.role == self.RoleChoices.admin
+
+
+class MemberTombstoneManager(models.Manager):
+
+    def record(self, pks):
+        self.bulk_create([self.model(member_id=pk) for pk in sorted(pks)])
+
+    def prune(self, retention):
+        """Delete the tombstones older than `retention` and return how many were deleted."""
+        return self.filter(deleted_at__lt=timezone.now() - retention).delete()[0]
+
+
+class MemberTombstone(models.Model):
+    """
+    A deleted member, kept for MEMBER_TOMBSTONE_RETENTION so that the
+    changes feed can tell clients to drop it.
+    """
+    member_id = models.BigIntegerField(_('member id'), primary_key=True)
+    deleted_at = models.DateTimeField(_('deleted at'), auto_now_add=True)
+
+    objects = MemberTombstoneManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'member_id'], name='tombstone_deleted_at_id_idx'),
+        ]
+
+
+class MemberCounterManager(models.Manager):
+
+    def get_value(self, key):
+        return self.filter(key=key).values_list('value', flat=True).first() or 0
+
+    def increment(self, key, delta=1):
+        if delta and not self.filter(key=key).update(value=F('value') + delta):
+            self.create(key=key, value=delta)
+
+    def set_value(self, key, value):
+        self.update_or_create(key=key, defaults={'value': value})
+
+
+class MemberCounter(models.Model):
+    """
+    Denormalized counters over the Member table, kept up to date by the
+    Member signal handlers so that reading them is a primary key lookup.
+    """
+    TEAM_MEMBERS = 'team_members'
+    # The last id handed out by MemberManager.allocate_ids().
+    MEMBER_IDS = 'member_ids'
+
+    key = models.CharField(_('key'), max_length=50, primary_key=True)
+    value = models.BigIntegerField(_('value'), default=0)
+
+    objects = MemberCounterManager()
+
+
+class OutboxEventManager(models.Manager):
+
+    def record(self, event_type, members):
+        """Queue an `event_type` event for each of the members."""
+        self.bulk_create([
+            self.model(type=event_type, member_id=member.pk,
+                       payload={field: getattr(member, field) for field in self.model.MEMBER_FIELDS})
+            for member in members
+        ])
+
+    def record_deleted(self, pks):
+        self.bulk_create([self.model(type=self.model.Types.deleted, member_id=pk, payload={'id': pk})
+                          for pk in sorted(pks)])
+
+
+class OutboxEvent(models.Model):
+    """
+    A change to a member, written in the transaction of the change and
+    delivered to the webhooks in OUTBOX_WEBHOOKS by run_outbox_worker.
+    """
+    class Types(TextChoices):
+        created = 'member.created'
+        updated = 'member.updated'
+        deleted = 'member.deleted'
+
+    MEMBER_FIELDS = ('id', 'first_name', 'last_name', 'email', 'phone', 'role', 'date_joined')
+
+    id = models.BigAutoField(primary_key=True)
+    type = models.CharField(_('type'), max_length=30, choices=Types.choices)
+    # Not a foreign key: the events of a deleted member outlive it.
+    member_id = models.BigIntegerField(_('member id'))
+    payload = models.JSONField(_('payload'), encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True, db_index=True)
+
+    objects = OutboxEventManager()
+
+    def as_message(self):
+        return {'id': self.id, 'type': self.type, 'member_id': self.member_id, 'data': self.payload,
+                'created_at': self.created_at.isoformat()}
+
+
+class WebhookCursor(models.Model):
+    """How far a webhook endpoint got through the outbox."""
+    endpoint = models.CharField(_('endpoint'), max_length=500, primary_key=True)
+    last_event_id = models.BigIntegerField(_('last event id'), default=0)
+    attempts = models.PositiveIntegerField(_('failed attempts'), default=0)
+    next_attempt_at = models.DateTimeField(_('next attempt at'), null=True, blank=True)
+    last_error = models.TextField(_('last error'), blank=True)
+
+
+class DeadLetter(models.Model):
+    """An outbox event that a webhook endpoint failed to accept."""
+    endpoint = models.CharField(_('endpoint'), max_length=500, db_index=True)
+    event_id = models.BigIntegerField(_('event id'))
+    type = models.CharField(_('type'), max_length=30, choices=OutboxEvent.Types.choices)
+    member_id = models.BigIntegerField(_('member id'))
+    payload = models.JSONField(_('payload'), encoder=DjangoJSONEncoder)
+    error = models.TextField(_('error'))
+    attempts = models.PositiveIntegerField(_('attempts'))
+    failed_at = models.DateTimeField(_('failed at'), auto_now_add=True)
+
+
+class ImportCheckpoint(models.Model):
+    """
+    How far import_members got through an input, saved in the transaction
+    of every batch so that --resume continues right after the last committed one.
+    """
+    name = models.CharField(_('name'), max_length=500, primary_key=True)
+    line = models.PositiveBigIntegerField(_('last line'), default=0)
+    imported = models.PositiveBigIntegerField(_('imported'), default=0)
+    rejected = models.PositiveBigIntegerField(_('rejected'), default=0)
@@ -0,0 +1,189 @@
+import http.client
+import json
+import logging
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from instawork.db.routers import use_primary
+from members.models import DeadLetter, OutboxEvent, WebhookCursor
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying; any other 4xx means the batch itself is rejected.
+RETRY_STATUSES = {408, 425, 429}
+
+
+class DeliveryError(Exception):
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class HTTPSession:
+    """
+    A pool of keep-alive HTTP(S) connections, one per host, reused across
+    deliveries instead of connecting for every batch.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self._connections = {}
+
+    def post(self, url, body, headers):
+        """POST `body` to `url` and return the response status."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        reused = key in self._connections
+        while True:
+            connection = self._connections.get(key) or self._connect(key)
+            try:
+                connection.request('POST', path, body, headers)
+                response = connection.getresponse()
+                response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self._discard(key)
+                if not reused:
+                    raise
+                # The server closed the idle connection, try once on a fresh one.
+                reused = False
+                continue
+            except (OSError, http.client.HTTPException):
+                self._discard(key)
+                raise
+            if response.will_close:
+                self._discard(key)
+            return response.status
+
+    def _connect(self, key):
+        scheme, netloc = key
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        connection = self._connections[key] = connection_class(netloc, timeout=self.timeout)
+        return connection
+
+    def _discard(self, key):
+        connection = self._connections.pop(key, None)
+        if connection is not None:
+            connection.close()
+
+    def close(self):
+        for key in list(self._connections):
+            self._discard(key)
+
+
+class OutboxWorker:
+    """
+    Deliver outbox events to webhook endpoints in batches of up to
+    `batch_size`, in event order per endpoint.
+
+    Events are written to the shard of their member, so every shard, or only
+    `using`, has its own events and a cursor per endpoint: the order holds
+    per shard, and a shard that is down only holds back its own events.
+
+    A failed batch is retried with exponential backoff, holding back the
+    later events of its endpoint only, and moved to the dead letters after
+    `max_attempts`, or right away when the endpoint rejects it with a 4xx.
+    Deliveries are at least once: endpoints should ignore event ids they
+    have already seen.
+    """
+
+    def __init__(self, endpoints=None, batch_size=None, max_attempts=None, backoff=None, max_backoff=None,
+                 retention=None, session=None, using=None):
+        self.endpoints = settings.OUTBOX_WEBHOOKS if endpoints is None else endpoints
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+        self.backoff = settings.OUTBOX_BACKOFF_SECONDS if backoff is None else backoff
+        self.max_backoff = settings.OUTBOX_MAX_BACKOFF_SECONDS if max_backoff is None else max_backoff
+        self.retention = settings.OUTBOX_RETENTION if retention is None else retention
+        self.session = session or HTTPSession(timeout=settings.OUTBOX_TIMEOUT_SECONDS)
+        self.databases = settings.DATABASE_SHARDS if using is None else [using]
+
+    def run(self, interval=1.0, iterations=None):
+        """Deliver until interrupted, waiting `interval` seconds whenever idle."""
+        try:
+            while iterations is None or iterations > 0:
+                if not self.run_once():
+                    time.sleep(interval)
+                if iterations is not None:
+                    iterations -= 1
+        finally:
+            self.session.close()
+
+    def run_once(self):
+        """Deliver a batch to every endpoint that is due and return the number of events delivered."""
+        delivered = 0
+        with use_primary():
+            for using in self.databases:
+                delivered += sum(self.deliver(endpoint, using) for endpoint in self.endpoints)
+                self.prune(using)
+        return delivered
+
+    def deliver(self, endpoint, using=DEFAULT_DB_ALIAS):
+        cursor, _ = WebhookCursor.objects.using(using).get_or_create(endpoint=endpoint)
+        if cursor.next_attempt_at and cursor.next_attempt_at > timezone.now():
+            return 0
+        events = list(OutboxEvent.objects.using(using)
+                      .filter(id__gt=cursor.last_event_id).order_by('id')[:self.batch_size])
+        if not events:
+            return 0
+
+        try:
+            self.post(endpoint, events)
+        except (DeliveryError, OSError, http.client.HTTPException) as e:
+            self.fail(cursor, events, e, using)
+            return 0
+        cursor.last_event_id = events[-1].id
+        cursor.attempts = 0
+        cursor.next_attempt_at = None
+        cursor.last_error = ''
+        cursor.save(using=using)
+        return len(events)
+
+    def post(self, endpoint, events):
+        body = json.dumps({'events': [event.as_message() for event in events]}).encode()
+        headers = {'Content-Type': 'application/json', 'Content-Length': str(len(body))}
+        status = self.session.post(endpoint, body, headers)
+        if not 200 <= status < 300:
+            raise DeliveryError(f'HTTP {status}', permanent=400 <= status < 500 and status not in RETRY_STATUSES)
+
+    def fail(self, cursor, events, error, using=DEFAULT_DB_ALIAS):
+        cursor.attempts += 1
+        cursor.last_error = str(error) or error.__class__.__name__
+        if cursor.attempts < self.max_attempts and not getattr(error, 'permanent', False):
+            delay = min(self.backoff * 2 ** (cursor.attempts - 1), self.max_backoff)
+            cursor.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+            logger.warning('Delivering %d events to %s failed (attempt %d), retrying in %ss: %s',
+                           len(events), cursor.endpoint, cursor.attempts, delay, cursor.last_error)
+            cursor.save(using=using)
+            return
+
+        logger.error('Moving %d events for %s to the dead letters after %d attempts: %s',
+                     len(events), cursor.endpoint, cursor.attempts, cursor.last_error)
+        with transaction.atomic(using=using):
+            DeadLetter.objects.using(using).bulk_create([
+                DeadLetter(endpoint=cursor.endpoint, event_id=event.id, type=event.type, member_id=event.member_id,
+                           payload=event.payload, error=cursor.last_error, attempts=cursor.attempts)
+                for event in events
+            ])
+            cursor.last_event_id = events[-1].id
+            cursor.attempts = 0
+            cursor.next_attempt_at = None
+            cursor.save(using=using)
+
+    def prune(self, using=DEFAULT_DB_ALIAS):
+        """Delete the events older than `retention` that every endpoint has been sent."""
+        events = OutboxEvent.objects.using(using).filter(created_at__lt=timezone.now() - self.retention)
+        if self.endpoints:
+            delivered = WebhookCursor.objects.using(using).filter(endpoint__in=self.endpoints)
+            if delivered.count() < len(set(self.endpoints)):
+                return
+            events = events.filter(id__lte=delivered.aggregate(last=Min('last_event_id'))['last'])
+        events.delete()
@@ -0,0 +1,259 @@
+import base64
+import binascii
+import heapq
+import json
+from functools import cmp_to_key
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from members.aio import alist
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise InvalidCursor('Invalid cursor.')
+
+
+def merge_ordered(row_lists, ordering):
+    """
+    Merge lists of model instances each sorted by the `ordering` of
+    order_by() (field names, `-` for descending) into one sorted list.
+    """
+    def compare(a, b):
+        for field in ordering:
+            name = field.lstrip('-')
+            x, y = getattr(a, name), getattr(b, name)
+            if x != y:
+                return (1 if x > y else -1) * (-1 if field.startswith('-') else 1)
+        return 0
+    return list(heapq.merge(*row_lists, key=cmp_to_key(compare)))
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset on a descending keyset (newest first by default).
+
+    Pages are addressed by opaque cursors holding the key of the row at the
+    edge of the current page, so fetching any page is a bounded index range
+    scan no matter how deep into the table it is. With `databases`, e.g. the
+    shards, a page is fetched from each of them and merged.
+    """
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, keys=('date_joined', 'id'), databases=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = tuple(keys)
+        self.databases = databases
+
+    def page(self, cursor=None):
+        queryset, backwards, seeking = self._page_queryset(cursor)
+        if self.databases is None:
+            return self._build_page(list(queryset), backwards, seeking)
+        rows = [list(queryset.using(db)) for db in self.databases]
+        return self._build_page(merge_ordered(rows, queryset.query.order_by), backwards, seeking)
+
+    async def apage(self, cursor=None):
+        queryset, backwards, seeking = self._page_queryset(cursor)
+        if self.databases is None:
+            return self._build_page(await alist(queryset), backwards, seeking)
+        rows = [await alist(queryset.using(db)) for db in self.databases]
+        return self._build_page(merge_ordered(rows, queryset.query.order_by), backwards, seeking)
+
+    def _page_queryset(self, cursor):
+        direction, values = self.decode_cursor(cursor) if cursor else (self.NEXT, None)
+        backwards = direction == self.PREVIOUS
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, after=backwards))
+        ordering = self.keys if backwards else tuple('-' + key for key in self.keys)
+        return queryset.order_by(*ordering)[:self.per_page + 1], backwards, values is not None
+
+    def _build_page(self, rows, backwards, seeking):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows and (backwards or has_more):
+            next_cursor = self.encode_cursor(self.NEXT, rows[-1])
+        if rows and (has_more if backwards else seeking):
+            previous_cursor = self.encode_cursor(self.PREVIOUS, rows[0])
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def _seek(self, values, after):
+        """Build `(k1, k2, ...) < values` (or `>` when `after`) as a Q object."""
+        lookup = 'gt' if after else 'lt'
+        condition = Q()
+        equal = {}
+        for key, value in zip(self.keys, values):
+            condition |= Q(**equal, **{f'{key}__{lookup}': value})
+            equal[key] = value
+        return condition
+
+    def encode_cursor(self, direction, obj):
+        # isoformat() keeps microseconds, which DjangoJSONEncoder would truncate
+        # and so make rows sharing a millisecond fall between two pages.
+        values = [getattr(obj, key) for key in self.keys]
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        return encode_cursor([direction, values])
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, values = decode_cursor(cursor)
+            if direction not in (self.NEXT, self.PREVIOUS) or len(values) != len(self.keys):
+                raise ValueError(cursor)
+            opts = self.queryset.model._meta
+            values = [opts.get_field(key).to_python(value) for key, value in zip(self.keys, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidCursor('Invalid cursor.')
+        return direction, values
+
+
+class OffsetPaginator:
+    """
+    Offset pagination behind the same opaque cursors, for orderings that
+    can't be used as a keyset (e.g. search rank). Like KeysetPaginator it
+    never counts the whole result set, it fetches one extra row instead.
+    With `databases` the rows up to the end of the page are fetched from each
+    of them, merged on the queryset's ordering and sliced.
+    """
+
+    def __init__(self, queryset, per_page, databases=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.databases = databases
+
+    def page(self, cursor=None):
+        offset = self.decode_cursor(cursor) if cursor else 0
+        if self.databases is None:
+            rows = list(self.queryset[offset:offset + self.per_page + 1])
+        else:
+            rows = merge_ordered([list(self.queryset.using(db)[:offset + self.per_page + 1])
+                                  for db in self.databases], self.queryset.query.order_by)
+            rows = rows[offset:offset + self.per_page + 1]
+        next_cursor = previous_cursor = None
+        if len(rows) > self.per_page:
+            next_cursor = encode_cursor(['o', offset + self.per_page])
+        if offset:
+            previous_cursor = encode_cursor(['o', max(offset - self.per_page, 0)])
+        return KeysetPage(rows[:self.per_page], next_cursor, previous_cursor)
+
+    def decode_cursor(self, cursor):
+        payload = decode_cursor(cursor)
+        if not (isinstance(payload, list) and len(payload) == 2 and payload[0] == 'o'
+                and isinstance(payload[1], int) and payload[1] >= 0):
+            raise InvalidCursor('Invalid cursor.')
+        return payload[1]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A Paginator that never counts a whole table: an unfiltered queryset is
+    counted with `estimate()` and a filtered one up to `max_count` rows.
+
+    Pages are sliced without clamping them to the count, so a count that is
+    off only makes the last page shorter or longer; `is_estimate` tells if it
+    may be.
+    """
+
+    def __init__(self, object_list, per_page, estimate=None, max_count=10000, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.estimate = estimate
+        self.max_count = max_count
+        self.is_estimate = False
+
+    @cached_property
+    def count(self):
+        if self.estimate is not None and not self.object_list.query.where:
+            self.is_estimate = True
+            return self.estimate()
+        count = self.object_list[:self.max_count].count()
+        self.is_estimate = count == self.max_count
+        return count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class CursorPagination(BasePagination):
+    """
+    DRF pagination over cursor pages:
+    `{"next": <url>, "previous": <url>, "results": [...]}`.
+    """
+    paginator_class = OffsetPaginator
+    page_size = 50
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = self.get_paginator(queryset, view).page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+        return list(self.page)
+
+    def get_paginator(self, queryset, view=None):
+        """A paginator over the databases of the view's get_databases(), if it has one."""
+        get_databases = getattr(view, 'get_databases', None)
+        return self.paginator_class(queryset, self.page_size, databases=get_databases and get_databases())
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        })
+
+
+class KeysetCursorPagination(CursorPagination):
+    paginator_class = KeysetPaginator
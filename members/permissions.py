@@ -7,3 +7,7 @@ class DeleteMemberPermission(IsAuthenticated):
         if super().has_permission(request, view):
             return request.user.is_admin
         return False
+
+
+class ChangeMemberRolePermission(DeleteMemberPermission):
+    pass
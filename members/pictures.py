@@ -0,0 +1,63 @@
+"""
+Content-addressed storage of profile pictures and their thumbnails.
+
+Pictures are stored under the SHA-256 of their content, so a picture
+uploaded for several members is stored once, and a name always refers to the
+same bytes, so clients can cache pictures and thumbnails forever.
+"""
+import hashlib
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.urls import reverse
+from django.utils.deconstruct import deconstructible
+
+PICTURE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+# .card-thumbnail is at most 70px tall; the larger one is for 2x screens.
+THUMBNAIL_SIZES = (70, 140)
+# File extension and Pillow format, the card offers them in this order.
+THUMBNAIL_FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+NAME_RE = re.compile(r'(pictures|thumbnails)/[0-9a-f]{2}/[0-9a-f]{64}(-\d+)?\.[a-z]+')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage naming files `<directory>/<hash[:2]>/<hash><extension>`."""
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, extension = posixpath.dirname(name), posixpath.splitext(name)[1].lower()
+        if extension not in PICTURE_EXTENSIONS:
+            extension = ''
+        name = posixpath.join(directory, digest.hexdigest()[:2], digest.hexdigest() + extension)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+picture_storage = ContentAddressedStorage()
+
+
+def thumbnail_name(picture, size, extension):
+    digest = posixpath.splitext(posixpath.basename(picture))[0]
+    return f'thumbnails/{digest[:2]}/{digest}-{size}.{extension}'
+
+
+def thumbnail_names(picture):
+    """The `(name, size, Pillow format)` of every thumbnail of the picture named `picture`."""
+    return [(thumbnail_name(picture, size, extension), size, image_format)
+            for extension, image_format in THUMBNAIL_FORMATS for size in THUMBNAIL_SIZES]
+
+
+def thumbnail_urls(picture):
+    """The thumbnail URLs of the picture named `picture`, by `<extension>` (1x) and `<extension>_2x`."""
+    small, large = THUMBNAIL_SIZES
+    urls = {}
+    for extension, _ in THUMBNAIL_FORMATS:
+        urls[extension] = reverse('members:picture', args=[thumbnail_name(picture, small, extension)])
+        urls[f'{extension}_2x'] = reverse('members:picture', args=[thumbnail_name(picture, large, extension)])
+    return urls
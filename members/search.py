@@ -0,0 +1,101 @@
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = 'members_member_fts'
+SEARCH_FIELDS = ('first_name', 'last_name', 'email', 'phone')
+TERM_RE = re.compile(r'\w+')
+
+_columns = ', '.join(SEARCH_FIELDS)
+_new_values = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+_old_values = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+
+# The index is an external content FTS5 table over members_member, kept in
+# sync by these triggers, which migration 0007 creates with its own copy of
+# them. SQLite drops a table's triggers along with the table, which is how
+# the schema editor alters columns, so `ensure_search_triggers` recreates
+# them after every migrate.
+TRIGGERS = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON members_member BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+        END""",
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON members_member BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        END""",
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF {_columns} ON members_member BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+            INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+        END""",
+}
+
+
+_has_search_index = {}
+
+
+def has_search_index(connection):
+    name = connection.settings_dict['NAME']
+    if name not in _has_search_index:
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _has_search_index[name] = cursor.fetchone() is not None
+    return _has_search_index[name]
+
+
+def ensure_search_triggers(connection):
+    """
+    Recreate any missing sync trigger and, if one was missing, rebuild the
+    index since the rows written in the meantime were not indexed.
+    """
+    _has_search_index.pop(connection.settings_dict['NAME'], None)
+    if not has_search_index(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'members_member'")
+        missing = TRIGGERS.keys() - {name for name, in cursor.fetchall()}
+        for name in missing:
+            cursor.execute(TRIGGERS[name])
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 query matching every word as a prefix,
+    e.g. `stacy ba` -> `"stacy"* "ba"*`.
+    """
+    return ' '.join(f'"{term}"*' for term in TERM_RE.findall(query))
+
+
+def search_members(queryset, query, ranked=True):
+    """
+    Filter `queryset` down to the members matching every word of `query` as a
+    prefix of their name, email or phone, best matches first when `ranked`.
+
+    Uses the FTS5 index when the database has one and falls back to
+    `icontains` lookups, newest first, otherwise. The rank is selected as
+    `search_rank`, so that results from several shards can be merged.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not has_search_index(connections[queryset.db]):
+        terms = TERM_RE.findall(query)
+        queryset = queryset.filter(reduce(and_, (
+            reduce(or_, (Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS)) for term in terms)))
+        return queryset.order_by('-id') if ranked else queryset
+    table = queryset.model._meta.db_table
+    queryset = queryset.extra(
+        select={'search_rank': f'{FTS_TABLE}.rank'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[expression],
+    )
+    return queryset.order_by('search_rank', '-id') if ranked else queryset
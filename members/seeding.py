@@ -0,0 +1,41 @@
+import random
+
+from django.conf import settings
+from django.db.models import Max
+
+from members.models import Member
+
+FIRST_NAMES = ('Ada', 'Alan', 'Barbara', 'Claude', 'Donald', 'Edsger', 'Frances', 'Grace', 'Jean', 'John',
+               'Katherine', 'Ken', 'Linus', 'Margaret', 'Radia', 'Shafi', 'Sophie', 'Tim', 'Whitfield', 'Yukihiro')
+LAST_NAMES = ('Allen', 'Bartik', 'Berners-Lee', 'Diffie', 'Dijkstra', 'Goldwasser', 'Hamilton', 'Hopper',
+              'Johnson', 'Knuth', 'Liskov', 'Lovelace', 'Matsumoto', 'McCarthy', 'Perlman', 'Ritchie',
+              'Shannon', 'Thompson', 'Torvalds', 'Turing', 'Wilson')
+PHONE_NUMBERS = 10 ** 10
+
+
+def format_phone(n):
+    """Format `n` as a `###-###-####` phone number, e.g. 1234 -> `000-000-1234`."""
+    return f'{n // 10 ** 7:03}-{n // 10 ** 4 % 1000:03}-{n % 10 ** 4:04}'
+
+
+def next_number(using=None):
+    """
+    The first number after every phone number in the database `using`, or
+    on every shard by default. Zero-padded phone numbers sort like the
+    numbers themselves, so members numbered from here on can't collide with
+    existing ones.
+    """
+    phones = (Member.all_objects.using(db).aggregate(last=Max('phone'))['last']
+              for db in ([using] if using else settings.DATABASE_SHARDS))
+    last_phone = max(filter(None, phones), default=None)
+    return int(last_phone.replace('-', '')) + 1 if last_phone else 0
+
+
+def synthetic_member(n, rng=random, admin_ratio=0.1):
+    return Member(
+        first_name=rng.choice(FIRST_NAMES),
+        last_name=rng.choice(LAST_NAMES),
+        email=f'member{n}@seed.example.com',
+        phone=format_phone(n),
+        role=Member.RoleChoices.admin if rng.random() < admin_ratio else Member.RoleChoices.regular,
+    )
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+
+from members.models import Member
+
+
+class MemberSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Member
+        fields = ['id', 'first_name', 'last_name', 'email', 'phone', 'role']
+
+
+class MemberChangeSerializer(MemberSerializer):
+    class Meta(MemberSerializer.Meta):
+        fields = MemberSerializer.Meta.fields + ['updated_at']
+
+
+class BulkMemberSerializer(serializers.Serializer):
+    MAX_IDS = 1000
+
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_IDS)
+
+
+class PhoneLookupSerializer(serializers.Serializer):
+    MAX_NUMBERS = 5000
+
+    numbers = serializers.ListField(child=serializers.CharField(max_length=32), allow_empty=False,
+                                    max_length=MAX_NUMBERS)
+
+
+class BulkRoleSerializer(BulkMemberSerializer):
+    role = serializers.ChoiceField(choices=Member.RoleChoices.choices)
@@ -0,0 +1,111 @@
+"""
+Moving a team to another shard while it stays online.
+
+TeamMover copies the team's members to the target shard while they are
+still read and written on the source one. Then it blocks writes to the team
+only for the final pass, which copies what changed during the first one,
+points the team at the target and deletes the members from the source.
+Members keep their ids, which are unique across shards, see
+MemberManager.allocate_ids().
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from instawork.db import immediate_atomic
+from members import cache as member_cache
+from members.models import Member, MemberCounter, Team
+
+
+class TeamMoveError(Exception):
+    pass
+
+
+class TeamMover:
+
+    def __init__(self, team, target, batch_size=1000):
+        if target not in settings.DATABASE_SHARDS:
+            raise TeamMoveError(f'"{target}" is not one of the shards: {", ".join(settings.DATABASE_SHARDS)}.')
+        self.team = team
+        self.source = team.shard
+        self.target = target
+        self.batch_size = batch_size
+
+    def members(self, using):
+        return Member._base_manager.using(using).filter(team=self.team)
+
+    def move(self):
+        """Move the members of the team to the target shard and return how many were moved."""
+        if self.source == self.target:
+            return 0
+        self.check_relations()
+        teams = Team.objects.using(DEFAULT_DB_ALIAS).filter(pk=self.team.pk)
+        try:
+            self.copy()
+            teams.update(moving=True)
+            # Wait for the writers that saw the team before it was marked
+            # moving, the later ones turn away, see
+            # TeamManager.check_writable().
+            with immediate_atomic(using=self.source):
+                pass
+            pks = self.copy()
+        except BaseException:
+            teams.update(moving=False)
+            self.delete_members(self.target, self.members(self.target).values_list('pk', flat=True))
+            raise
+        teams.update(shard=self.target, moving=False)
+        self.team.shard, self.team.moving = self.target, False
+
+        count = self.members(self.target).filter(is_superuser=False, deleted_at__isnull=True).count()
+        MemberCounter.objects.db_manager(self.target).increment(MemberCounter.TEAM_MEMBERS, count)
+        MemberCounter.objects.db_manager(self.source).increment(MemberCounter.TEAM_MEMBERS, -count)
+        self.delete_members(self.source, pks)
+        member_cache.invalidate_members(pks, using=self.source)
+        return len(pks)
+
+    def check_relations(self):
+        # Groups and permissions live on `default`, a member elsewhere can't refer to them.
+        for field in Member._meta.many_to_many:
+            through = field.remote_field.through._base_manager.using(self.source)
+            if through.filter(**{f'{field.m2m_field_name()}__team': self.team}).exists():
+                raise TeamMoveError(f'Members of {self.team} have {field.verbose_name}, which stay on "default".')
+
+    def copy(self):
+        """
+        Make the team's rows on the target the same as on the source, a batch
+        of ids at a time, and return the ids of the members copied.
+        """
+        fields = Member._meta.concrete_fields
+        source, target = self.members(self.source).order_by('pk'), self.members(self.target)
+        pks, last = [], 0
+        while True:
+            batch = list(source.filter(pk__gt=last)[:self.batch_size])
+            end = batch[-1].pk if len(batch) == self.batch_size else None
+            copies = target.filter(pk__gt=last) if end is None else target.filter(pk__gt=last, pk__lte=end)
+            copies = {member.pk: self.values(member, fields) for member in copies}
+            changed = [member for member in batch if copies.get(member.pk) != self.values(member, fields)]
+            with transaction.atomic(using=self.target):
+                self.delete_members(self.target, {*copies} - {member.pk for member in batch}
+                                    | {member.pk for member in changed} & {*copies})
+                self.insert(changed, fields)
+            pks.extend(member.pk for member in batch)
+            if end is None:
+                return pks
+            last = end
+
+    @staticmethod
+    def values(member, fields):
+        return [getattr(member, field.attname) for field in fields]
+
+    def insert(self, members, fields):
+        """Insert the rows as they are: bulk_create() would set updated_at to now."""
+        batch_size = max(connections[self.target].ops.bulk_batch_size(fields, members), 1)
+        queryset = Member._base_manager.using(self.target)
+        for start in range(0, len(members), batch_size):
+            queryset._insert(members[start:start + batch_size], fields=fields, raw=True, using=self.target)
+
+    def delete_members(self, using, pks):
+        """Delete the member rows `pks` from `using` in batches, without the work of deleting members."""
+        pks = list(pks)
+        for start in range(0, len(pks), self.batch_size):
+            with transaction.atomic(using=using):
+                Member.all_objects.db_manager(using)._delete_rows(pks[start:start + self.batch_size])
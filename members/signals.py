@@ -0,0 +1,56 @@
+from members import cache as member_cache
+from members.models import MemberCounter, MemberTombstone, OutboxEvent
+
+
+def _is_team_member(instance):
+    # Don't trigger a query for a deferred field; None means "unknown".
+    if not {'is_superuser', 'deleted_at'} <= instance.__dict__.keys():
+        return None
+    return not instance.is_superuser and instance.deleted_at is None
+
+
+def _is_soft_deleted(instance):
+    # Soft-deleted members were already reported deleted by soft_delete().
+    return instance.__dict__.get('deleted_at') is not None
+
+
+def remember_team_membership(sender, instance, **kwargs):
+    instance._was_team_member = _is_team_member(instance) if instance.pk is not None else False
+
+
+def count_saved_member(sender, instance, created, using, **kwargs):
+    is_team_member = _is_team_member(instance)
+    was_team_member = False if created else instance._was_team_member
+    if None not in (is_team_member, was_team_member) and is_team_member != was_team_member:
+        MemberCounter.objects.db_manager(using).increment(MemberCounter.TEAM_MEMBERS,
+                                                          1 if is_team_member else -1)
+    instance._was_team_member = is_team_member
+
+
+def count_deleted_member(sender, instance, using, **kwargs):
+    if instance._was_team_member:
+        MemberCounter.objects.db_manager(using).increment(MemberCounter.TEAM_MEMBERS, -1)
+
+
+def invalidate_member_cache(sender, instance, using, **kwargs):
+    member_cache.invalidate_members([instance.pk], using=using)
+
+
+def record_saved_member(sender, instance, created, update_fields, using, **kwargs):
+    if update_fields is not None and not update_fields & set(OutboxEvent.MEMBER_FIELDS):
+        # e.g. the last_login update on every login.
+        return
+    OutboxEvent.objects.db_manager(using).record(
+        OutboxEvent.Types.created if created else OutboxEvent.Types.updated, [instance])
+
+
+def record_deleted_member(sender, instance, using, **kwargs):
+    if _is_soft_deleted(instance):
+        return
+    OutboxEvent.objects.db_manager(using).record_deleted([instance.pk])
+
+
+def record_member_tombstone(sender, instance, using, **kwargs):
+    if _is_soft_deleted(instance):
+        return
+    MemberTombstone.objects.db_manager(using).record([instance.pk])
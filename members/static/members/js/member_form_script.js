@@ -5,13 +5,14 @@ $(document).ready(function () {
 
     $('#delete-confirmation').on('click', function (event) {
         let deleteUrl = $(this).attr('href');
+        let successUrl = $(this).data('success-url') || '/';
         $.ajax(deleteUrl, {
             type: 'DELETE',
             headers: {
                 'X-CSRFToken': $('input[name=csrfmiddlewaretoken]').val()
             },
             success: function (data, status, xhr) {   // success callback function
-                window.location = '/';
+                window.location = successUrl;
             },
             error: function (jqXhr, textStatus, errorMessage) { // error callback
             }
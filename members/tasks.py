@@ -0,0 +1,58 @@
+"""
+Member side effects, run by the background workers instead of the views,
+see jobs.
+"""
+from django.core.mail import EmailMessage
+from django.db import DEFAULT_DB_ALIAS
+from django.template.loader import render_to_string
+
+from jobs.email import send_messages
+from jobs.models import Job
+from jobs.registry import task
+from members.models import Member
+
+EMAIL_BATCH_SIZE = 50
+
+
+def queue_welcome_emails(members):
+    _enqueue('members.welcome_email', members)
+
+
+def queue_role_changed_emails(members):
+    _enqueue('members.role_changed_email', members)
+
+
+def _enqueue(task, members):
+    """Queue the jobs on the shard of their members, in the transaction that wrote them."""
+    payloads = {}
+    for member in members:
+        payloads.setdefault(member._state.db or DEFAULT_DB_ALIAS, []).append(_payload(member))
+    for using, shard_payloads in payloads.items():
+        Job.objects.db_manager(using).enqueue(task, shard_payloads)
+
+
+def _payload(member):
+    return {'member_id': member.pk, 'shard': member._state.db or DEFAULT_DB_ALIAS}
+
+
+@task('members.welcome_email', batch_size=EMAIL_BATCH_SIZE)
+def send_welcome_emails(payloads):
+    _send_emails(payloads, 'Welcome to the team', 'members/emails/welcome.txt')
+
+
+@task('members.role_changed_email', batch_size=EMAIL_BATCH_SIZE)
+def send_role_changed_emails(payloads):
+    _send_emails(payloads, 'Your role has changed', 'members/emails/role_changed.txt')
+
+
+def _send_emails(payloads, subject, template_name):
+    """Email the members of the payloads that still exist, over one connection."""
+    pks = {}
+    for payload in payloads:
+        pks.setdefault(payload['shard'], []).append(payload['member_id'])
+    messages = [
+        EmailMessage(subject, render_to_string(template_name, {'member': member}), to=[member.email])
+        for shard, shard_pks in pks.items()
+        for member in Member.objects.using(shard).filter(pk__in=shard_pks).order_by('pk')
+    ]
+    send_messages(messages)
@@ -0,0 +1,72 @@
+import asyncio
+from http import HTTPStatus
+from unittest import mock
+
+from django.test import AsyncClient
+from django.urls import reverse
+
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+class AsyncMemberViewsTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient()
+        self.member1 = Member.objects.create_user(password='password', **self.member1_data)
+        self.member2 = Member.objects.create_user(password='password', **self.member2_data)
+
+    async def test_list(self):
+        response = await self.async_client.get(reverse('members:async_list'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual([row['email'] for row in response.json()['results']],
+                         [self.member2.email, self.member1.email])
+        self.assertIsNone(response.json()['next'])
+
+    async def test_runs_on_the_event_loop(self):
+        # Every middleware is async capable, so Django awaits the view in the request's task instead of
+        # running the middleware in a thread that hands the view back to the loop as a task of its own.
+        tasks = []
+
+        def link(request, cursor):
+            tasks.append(asyncio.current_task())
+
+        with mock.patch('members.async_views._link', link):
+            response = await self.async_client.get(reverse('members:async_list'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(tasks, [asyncio.current_task()] * 2)
+
+    async def test_list_matches_sync_api(self):
+        response = await self.async_client.get(reverse('members:async_list'))
+        sync_response = await self.async_client.get(reverse('members:api_list'))
+        self.assertEqual(response.json(), sync_response.json())
+
+    async def test_invalid_cursor(self):
+        response = await self.async_client.get(reverse('members:async_list'), {'cursor': 'x'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    async def test_detail(self):
+        response = await self.async_client.get(reverse('members:async_detail', args=[self.member1.id]))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['phone'], self.member1.phone)
+        response = await self.async_client.get(reverse('members:async_detail', args=[999999]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    async def test_method_not_allowed(self):
+        response = await self.async_client.post(reverse('members:async_detail', args=[self.member1.id]))
+        self.assertEqual(response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
+
+    def test_delete_permissions(self):
+        url = reverse('members:async_delete', args=[self.member2.id])
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.FORBIDDEN)
+        self.client.force_login(self.member1)
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.FORBIDDEN)
+        self.assertTrue(Member.objects.filter(pk=self.member2.id).exists())
+
+    def test_delete_with_admin_user(self):
+        self.client.force_login(self.member2)
+        response = self.client.delete(reverse('members:async_delete', args=[self.member1.id]))
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Member.objects.filter(pk=self.member1.id).exists())
+        self.assertEqual(Member.objects.count_team_members(), 1)
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+from django.contrib.admin.models import LogEntry, ADDITION
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.test import override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+class BulkMemberAPIViewTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.regular = Member.objects.create_user(password='password', **self.member1_data)
+        self.admin = Member.objects.create_user(password='password', **self.member2_data)
+        self.members = [Member.objects.create(email=f'member{i}@gmail.com', phone=f'111-222-{i:04}')
+                        for i in range(20)]
+        self.ids = [member.id for member in self.members]
+
+    def test_bulk_delete_requires_admin(self):
+        url = reverse('members:bulk_delete')
+        response = self.client.post(url, {'ids': self.ids}, content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        self.client.force_login(self.regular)
+        response = self.client.post(url, {'ids': self.ids}, content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        self.assertEqual(Member.objects.filter(pk__in=self.ids).count(), 20)
+
+    @override_settings(MEMBERS_SOFT_DELETE=False)
+    def test_bulk_delete(self):
+        group = Group.objects.create(name='team')
+        group.user_set.add(*self.members)
+        LogEntry.objects.create(user=self.members[0], content_type=ContentType.objects.get_for_model(Member),
+                                action_flag=ADDITION, object_repr='member')
+        self.client.force_login(self.admin)
+
+        response = self.client.post(reverse('members:bulk_delete'), {'ids': self.ids[:10] + [999999]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        results = response.json()['results']
+        self.assertEqual(results[0], {'id': self.ids[0], 'status': 'deleted'})
+        self.assertEqual(results[-1], {'id': 999999, 'status': 'not_found'})
+        self.assertFalse(Member.objects.filter(pk__in=self.ids[:10]).exists())
+        self.assertEqual(group.user_set.count(), 10)
+        self.assertFalse(LogEntry.objects.exists())
+        self.assertEqual(Member.objects.count_team_members(), 12)
+
+    @override_settings(MEMBERS_SOFT_DELETE=False)
+    def test_bulk_delete_statement_count_is_bounded(self):
+        self.client.force_login(self.admin)
+        url = reverse('members:bulk_delete')
+        # user, transaction, lookup, groups, user_permissions, admin log, members, counter, outbox,
+        # tombstones, commit.
+        with self.assertNumQueries(11):
+            self.client.post(url, {'ids': self.ids[:2]}, content_type='application/json')
+        # The session and the user are cached by now.
+        with self.assertNumQueries(10):
+            self.client.post(url, {'ids': self.ids[2:]}, content_type='application/json')
+        self.assertEqual(Member.objects.count_team_members(), 2)
+
+    def test_bulk_role(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('members:bulk_role'), {'ids': self.ids[:5] + [999999], 'role': 'Admin'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['results'][-1], {'id': 999999, 'status': 'not_found'})
+        self.assertEqual(Member.objects.filter(role=Member.RoleChoices.admin).count(), 6)
+        # The members whose role changed get an email.
+        self.assertEqual(Job.objects.filter(task='members.role_changed_email').count(), 5)
+
+        response = self.client.get(reverse('members:list'))
+        self.assertContains(response, '(admin)', count=6)
+
+    def test_invalid_payload(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('members:bulk_role'), {'ids': [], 'role': 'Owner'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(set(response.json()), {'ids', 'role'})
@@ -0,0 +1,83 @@
+import time
+from http import HTTPStatus
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from members import cache as member_cache
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+class CachedAuthTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = Member.objects.get(email='admin')
+        self.member = Member.objects.create_user(password='password', **self.member1_data)
+        self.other = Member.objects.create(**self.member2_data)
+
+    def test_authenticated_request_without_queries(self):
+        self.client.force_login(self.admin)
+        url = reverse('members:cache_stats')
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+
+        self.client.force_login(self.member)
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(reverse('members:delete', args=[self.other.pk]))
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        # Only the view's transaction, no session or member lookup.
+        self.assertFalse([query for query in queries if 'SAVEPOINT' not in query['sql']])
+
+    def test_saved_member_is_reloaded(self):
+        self.client.force_login(self.member)
+        url = reverse('members:delete', args=[self.other.pk])
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.FORBIDDEN)
+
+        self.member.role = Member.RoleChoices.admin
+        self.member.save()
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.NO_CONTENT)
+
+    def test_bulk_role_change_is_reloaded(self):
+        self.client.force_login(self.member)
+        url = reverse('members:delete', args=[self.other.pk])
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.FORBIDDEN)
+
+        Member.objects.bulk_update_role([self.member.pk], Member.RoleChoices.admin)
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.NO_CONTENT)
+
+    def test_change_by_another_process_expires(self):
+        self.client.force_login(self.member)
+        url = reverse('members:delete', args=[self.other.pk])
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.FORBIDDEN)
+
+        # Like a write from another worker, whose invalidation doesn't reach this process's cache.
+        Member.objects.filter(pk=self.member.pk).update(role=Member.RoleChoices.admin)
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.FORBIDDEN)
+        later = time.time() + settings.MEMBERS_USER_CACHE_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later):
+            self.assertEqual(self.client.delete(url).status_code, HTTPStatus.NO_CONTENT)
+
+    def test_password_change_logs_out(self):
+        self.client.force_login(self.member)
+        url = reverse('members:delete', args=[self.other.pk])
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.FORBIDDEN)
+
+        self.member.set_password('new password')
+        self.member.save()
+        self.assertEqual(self.client.delete(url).status_code, HTTPStatus.FORBIDDEN)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_sessions_fall_back_to_database(self):
+        self.client.force_login(self.admin)
+        self.assertTrue(Session.objects.filter(session_key=self.client.session.session_key).exists())
+        member_cache.get_user_cache().clear()
+        response = self.client.get(reverse('members:cache_stats'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+class ConditionalGetTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member = Member.objects.create(**self.member1_data)
+
+    def assertNotModified(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        return response
+
+    def test_list(self):
+        url = reverse('members:list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+        # The validators are read in one query, nothing is rendered.
+        with self.assertNumQueries(1), self.assertTemplateNotUsed('members/member_list.html'):
+            not_modified = self.assertNotModified(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        self.assertEqual(not_modified['Cache-Control'], 'public, no-cache')
+        self.assertNotModified(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        # Each page and search has its own URL, so they share the validators.
+        self.assertNotModified(url + '?q=stacy', HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_list_changes(self):
+        url = reverse('members:list')
+        etags = [self.client.get(url)['ETag']]
+        Member.objects.create(**self.member2_data)
+        etags.append(self.client.get(url)['ETag'])
+        Member.objects.bulk_update_role([self.member.pk], Member.RoleChoices.admin)
+        etags.append(self.client.get(url)['ETag'])
+        Member.objects.bulk_delete([self.member.pk])
+        etags.append(self.client.get(url)['ETag'])
+        self.assertEqual(len(set(etags)), 4)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'You have 1 team members.')
+
+    def test_edit(self):
+        url = reverse('members:edit', args=[self.member.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertNotIn('Last-Modified', response)
+
+        # The member's updated_at.
+        with self.assertNumQueries(1):
+            self.assertNotModified(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.member.first_name = 'anderson'
+        self.member.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(response, 'anderson')
+
+        # The delete button depends on the user.
+        self.client.force_login(Member.objects.create(**self.member2_data))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, HTTPStatus.OK)
+
+    def test_unknown_member(self):
+        response = self.client.get(reverse('members:edit', args=[999999]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,56 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+class ExportMembersViewTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member1 = Member.objects.create(**self.member1_data)
+        self.member2 = Member.objects.create(**self.member2_data)
+
+    def test_export_csv(self):
+        response = self.client.get(reverse('members:export', args=['csv']))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('members.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['email'] for row in rows], [self.member1.email, self.member2.email])
+        self.assertEqual(rows[1]['role'], Member.RoleChoices.admin)
+        self.assertEqual(rows[0]['date_joined'], self.member1.date_joined.isoformat())
+
+    def test_export_jsonl(self):
+        response = self.client.get(reverse('members:export', args=['jsonl']))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows[0]['id'], self.member1.id)
+        self.assertEqual(rows[1]['phone'], self.member2.phone)
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse('members:export', args=['xml']))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_export_members_command(self):
+        out = StringIO()
+        call_command('export_members', format='jsonl', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'members.csv')
+        call_command('export_members', output=path, chunk_size=1)
+        with open(path) as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 2)
@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+
+from members.importer import Checkpoint
+from members.models import ImportCheckpoint, Member, MemberManager
+from members.tests.test_member_base import MemberTestCase
+
+
+class ImportMembersCommandTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def read_errors(self, path):
+        with open(f'{path}.errors.jsonl') as f:
+            return [json.loads(line) for line in f]
+
+    def import_members(self, path, **options):
+        out = StringIO()
+        call_command('import_members', path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_import_csv(self):
+        path = self.write('members.csv', 'first_name,last_name,email,phone,role\n'
+                                         'stacy,bale,stacyBale@gmail.com,111-111-1111,Regular\n'
+                                         'Jack,Namin,JackNamin@gmail.com,222-222-2222,Admin\n'
+                                         'no,role,noRole@gmail.com,333-333-3333,\n')
+        output = self.import_members(path)
+        self.assertIn('Imported 3 members, rejected 0 rows.', output)
+        self.assertEqual(Member.objects.count_team_members(), 3)
+        self.assertTrue(Member.objects.get(email='JackNamin@gmail.com').is_admin)
+        self.assertEqual(Member.objects.get(email='noRole@gmail.com').role, Member.RoleChoices.regular)
+        self.assertEqual(self.read_errors(path), [])
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_import_jsonl_rejections(self):
+        Member.objects.create(**self.member1_data)
+        rows = [
+            self.member1_data,
+            dict(self.member2_data, phone='1112223344'),
+            dict(self.member2_data, email='invalid_email'),
+            self.member2_data,
+            dict(self.member2_data, email='other@gmail.com'),
+        ]
+        path = self.write('members.jsonl', '\n'.join(json.dumps(row) for row in rows) + '\n[]\n')
+        output = self.import_members(path, batch_size=2, chunk_size=1)
+        self.assertIn('Imported 1 members, rejected 5 rows.', output)
+        self.assertTrue(Member.objects.filter(email=self.member2_data['email']).exists())
+
+        errors = {error['line']: error['errors'] for error in self.read_errors(path)}
+        self.assertEqual(sorted(errors), [1, 2, 3, 5, 6])
+        self.assertEqual(errors[1], {'email': ['User with this Email address already exists.'],
+                                     'phone': ['User with this Phone already exists.']})
+        self.assertEqual(errors[2], {'phone': ['Phone number must be formatted as ###-###-####.']})
+        self.assertEqual(errors[3], {'email': ['Enter a valid email address.']})
+        self.assertEqual(errors[5], {'phone': ['User with this Phone already exists.']})
+        self.assertIn('__all__', errors[6])
+
+    def test_one_lookup_per_batch(self):
+        path = self.write('members.jsonl', '\n'.join(
+            json.dumps({'email': f'member{i}@gmail.com', 'phone': f'111-222-{i:04}'}) for i in range(30)))
+        # Per batch: savepoint, collision lookup, insert, counter update, outbox insert, checkpoint, release,
+        # plus creating the checkpoint and clearing it before and after.
+        with self.assertNumQueries(7 * 3 + 3):
+            self.import_members(path, batch_size=10)
+        self.assertEqual(Member.objects.count_team_members(), 30)
+
+    def test_resume(self):
+        path = self.write('members.csv', 'email,phone\n'
+                                         'first@gmail.com,111-111-1111\n'
+                                         'second@gmail.com,222-222-2222\n')
+        Checkpoint(os.path.abspath(path)).advance(line=2, imported=1, rejected=0)
+        output = self.import_members(path, resume=True)
+        self.assertIn('Imported 2 members, rejected 0 rows.', output)
+        self.assertFalse(Member.objects.filter(email='first@gmail.com').exists())
+        self.assertTrue(Member.objects.filter(email='second@gmail.com').exists())
+
+    def test_resume_after_crash(self):
+        path = self.write('members.jsonl', '\n'.join(
+            json.dumps({'email': f'member{i}@gmail.com', 'phone': f'111-222-{i:04}'}) for i in range(6)))
+        bulk_create = MemberManager.bulk_create
+        calls = []
+
+        def crash_in_second_batch(manager, objs, *args, **kwargs):
+            calls.append(objs)
+            objs = bulk_create(manager, objs, *args, **kwargs)
+            if len(calls) == 2:
+                raise RuntimeError('Crashed.')
+            return objs
+
+        with mock.patch.object(MemberManager, 'bulk_create', crash_in_second_batch):
+            with self.assertRaisesMessage(RuntimeError, 'Crashed.'):
+                self.import_members(path, batch_size=2)
+        # The checkpoint was rolled back with the second batch.
+        self.assertEqual(Checkpoint(os.path.abspath(path)).load(), {'line': 2, 'imported': 2, 'rejected': 0})
+        self.assertEqual(Member.objects.count_team_members(), 2)
+
+        output = self.import_members(path, batch_size=2, resume=True)
+        self.assertIn('Imported 6 members, rejected 0 rows.', output)
+        self.assertEqual(Member.objects.count_team_members(), 6)
+        self.assertEqual(self.read_errors(path), [])
+        self.assertFalse(ImportCheckpoint.objects.exists())
@@ -1,6 +1,9 @@
+from django.conf import settings
+from django.core.cache import caches
 from django.db import IntegrityError
 from django.test import TestCase, Client
 
+from members import cache as member_cache
 from members.models import Member
 
 
@@ -11,6 +14,10 @@ class MemberTestCase(TestCase):
 
     def setUp(self):
         self.client = Client()
+        member_cache.get_cache().clear()
+        member_cache.get_user_cache().clear()
+        member_cache.stats.reset()
+        caches[settings.THROTTLE_CACHE_ALIAS].clear()
         self.member1_data = {
             'first_name': 'stacy',
             'last_name': 'bale',
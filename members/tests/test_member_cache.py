@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from members import cache as member_cache
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+class MemberListCacheTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('members:list')
+        self.member1 = Member.objects.create(**self.member1_data)
+        self.member2 = Member.objects.create(**self.member2_data)
+
+    def test_unchanged_list_is_served_from_cache(self):
+        self.client.get(self.url)
+        self.assertEqual(member_cache.stats.misses, 3)
+
+        # Only the team member counter is read from the database.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'You have 2 team members.')
+        self.assertContains(response, reverse('members:edit', args=[self.member1.id]))
+        self.assertEqual(member_cache.stats.hits, 1)
+
+    def test_other_parameters_share_the_entry(self):
+        self.client.get(self.url)
+        member_cache.stats.reset()
+        self.client.get(self.url, {'utm_source': 'newsletter', 'q': ' '})
+        self.assertEqual(member_cache.stats.hits, 1)
+        self.assertEqual(member_cache.stats.misses, 0)
+
+    def test_update_invalidates_only_that_card(self):
+        self.client.get(self.url)
+        self.member1.first_name = 'anderson'
+        self.member1.save()
+        member_cache.stats.reset()
+
+        response = self.client.get(self.url)
+        self.assertContains(response, 'anderson')
+        # The list page and the edited card are re-rendered, the other card is reused.
+        self.assertEqual(member_cache.stats.misses, 2)
+        self.assertEqual(member_cache.stats.hits, 1)
+
+    def test_delete_invalidates_list(self):
+        edit_url = reverse('members:edit', args=[self.member2.id])
+        self.assertContains(self.client.get(self.url), edit_url)
+        self.member2.delete()
+        self.assertNotContains(self.client.get(self.url), edit_url)
+
+    def test_eviction_counter(self):
+        cache = member_cache.LocMemCache('test-evictions', {'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2}})
+        for i in range(3):
+            cache.set(f'key{i}', i)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_cache_stats_api(self):
+        response = self.client.get(reverse('members:cache_stats'))
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+        self.client.force_login(Member.objects.get(email='admin'))
+        self.client.get(self.url)
+        response = self.client.get(reverse('members:cache_stats'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['misses'], 3)
+        self.assertIn('evictions', response.json())
@@ -0,0 +1,143 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from members.changes import ChangeFeed
+from members.models import Member, MemberTombstone
+from members.pagination import encode_cursor
+from members.tests.test_member_base import MemberTestCase
+from members.views import MemberChangesAPIView
+
+
+class MemberChangesTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.members = [Member.objects.create(email=f'member{n}@gmail.com', phone=f'111-222-000{n}')
+                        for n in range(5)]
+        self.url = reverse('members:changes')
+
+    def changes(self, since=None):
+        response = self.client.get(self.url, {'since': since} if since else {})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.json()
+
+    def sync(self, since=None):
+        changed, deleted = [], []
+        while True:
+            page = self.changes(since)
+            changed += [member['id'] for member in page['changed']]
+            deleted += page['deleted']
+            since = page['cursor']
+            if not page['has_more']:
+                return changed, deleted, since
+
+    def test_full_sync_in_pages(self):
+        with mock.patch.object(MemberChangesAPIView, 'page_size', 2):
+            page = self.changes()
+            self.assertEqual(len(page['changed']), 2)
+            self.assertTrue(page['has_more'])
+            self.assertIn('updated_at', page['changed'][0])
+            changed, deleted, _ = self.sync()
+        self.assertEqual(changed, [member.pk for member in self.members])
+        self.assertEqual(deleted, [])
+
+    def test_changes_since_cursor(self):
+        _, _, cursor = self.sync()
+        first, second, third, fourth = self.members[:4]
+        self.client.post(reverse('members:edit', args=[second.pk]), {
+            'first_name': 'anderson', 'last_name': '', 'email': second.email, 'phone': second.phone,
+            'role': Member.RoleChoices.regular,
+        })
+        Member.objects.bulk_update_role([fourth.pk], Member.RoleChoices.admin)
+        deleted_pks = [third.pk, first.pk]
+        third.delete()
+        Member.objects.bulk_delete([first.pk])
+
+        with mock.patch.object(MemberChangesAPIView, 'page_size', 1):
+            changed, deleted, cursor = self.sync(cursor)
+        self.assertEqual(changed, [second.pk, fourth.pk])
+        self.assertEqual(deleted, deleted_pks)
+
+        # With nothing new, the same position in a cursor issued again.
+        page = self.changes(cursor)
+        self.assertEqual((page['changed'], page['deleted'], page['has_more']), ([], [], False))
+        feed = ChangeFeed(Member.objects.all(), MemberTombstone.objects.all(), 10)
+        self.assertEqual(feed.decode_cursor(page['cursor'])[0], feed.decode_cursor(cursor)[0])
+
+    def test_page_queries(self):
+        _, _, cursor = self.sync()
+        self.members[0].delete()
+        # The changed members and the tombstones.
+        with self.assertNumQueries(2):
+            self.changes(cursor)
+
+    def test_updated_at(self):
+        member = self.members[0]
+        updated_at = member.updated_at
+        member.last_login = timezone.now()
+        member.save(update_fields=['last_login'])
+        member.refresh_from_db()
+        self.assertEqual(member.updated_at, updated_at)
+
+        member.first_name = 'anderson'
+        member.save(update_fields=['first_name'])
+        member.refresh_from_db()
+        self.assertGreater(member.updated_at, updated_at)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'nope'}).status_code, HTTPStatus.NOT_FOUND)
+        feed = ChangeFeed(Member.objects.all(), MemberTombstone.objects.all(), 10)
+        expired = feed.encode_cursor({'default': (timezone.now(), 1)}, timezone.now() - timedelta(days=31))
+        self.assertEqual(self.client.get(self.url, {'since': expired}).status_code, HTTPStatus.GONE)
+        # From before sharding.
+        legacy = encode_cursor(['c', (timezone.now() - timedelta(days=31)).isoformat(), 1])
+        self.assertEqual(self.client.get(self.url, {'since': legacy}).status_code, HTTPStatus.GONE)
+
+    def test_changes_older_than_retention(self):
+        Member.objects.update(updated_at=timezone.now() - timedelta(days=40))
+        with mock.patch.object(MemberChangesAPIView, 'page_size', 2):
+            changed, _, cursor = self.sync()
+        self.assertEqual(len(changed), Member.objects.exclude(is_superuser=True).count())
+        # Expiring with the pass, not with the changes.
+        self.assertEqual(self.changes(cursor)['changed'], [])
+        pk = self.members[0].pk
+        self.members[0].delete()
+        self.assertEqual(self.changes(cursor)['deleted'], [pk])
+
+    def test_prune_tombstones(self):
+        Member.objects.bulk_delete([member.pk for member in self.members[:2]])
+        MemberTombstone.objects.filter(member_id=self.members[0].pk).update(
+            deleted_at=timezone.now() - timedelta(days=31))
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Deleted 1 tombstones.', out.getvalue())
+        self.assertEqual(list(MemberTombstone.objects.values_list('member_id', flat=True)), [self.members[1].pk])
+
+
+class ChangeStampTest(TransactionTestCase):
+    """Outside of TestCase's transaction, where every write starts a deferred one."""
+
+    def test_stamped_under_write_lock(self):
+        now = timezone.now
+        locked = []
+
+        def stamp():
+            locked.append(connection.holds_write_lock)
+            return now()
+
+        member = Member.objects.create(email='member@gmail.com', phone='111-222-0000')
+        with mock.patch('django.utils.timezone.now', stamp):
+            member.first_name = 'anderson'
+            member.save()
+            Member.objects.bulk_update_role([member.pk], Member.RoleChoices.admin)
+            Member.objects.soft_delete([member.pk])
+        self.assertGreaterEqual(len(locked), 3)
+        self.assertTrue(all(locked))
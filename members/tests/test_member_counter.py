@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse_lazy
+
+from members.models import Member, MemberCounter
+from members.tests.test_member_base import MemberTestCase
+
+
+class MemberCounterTest(MemberTestCase):
+
+    def test_create_and_delete(self):
+        self.assertEqual(Member.objects.count_team_members(), 0)
+        member = Member.objects.create(**self.member1_data)
+        Member.objects.create_user(password='password', **self.member2_data)
+        self.assertEqual(Member.objects.count_team_members(), 2)
+
+        member.delete()
+        self.assertEqual(Member.objects.count_team_members(), 1)
+
+        Member.objects.all().delete()
+        self.assertEqual(Member.objects.count_team_members(), 0)
+
+    def test_update_does_not_change_count(self):
+        member = Member.objects.create(**self.member1_data)
+        member.first_name = 'anderson'
+        member.save()
+        Member.objects.get(pk=member.pk).save()
+        self.assertEqual(Member.objects.count_team_members(), 1)
+
+    def test_superuser_status_change(self):
+        member = Member.objects.create(**self.member1_data)
+        member.is_superuser = True
+        member.save()
+        self.assertEqual(Member.objects.count_team_members(), 0)
+
+        member = Member.objects.get(pk=member.pk)
+        member.is_superuser = False
+        member.save()
+        self.assertEqual(Member.objects.count_team_members(), 1)
+
+        Member.objects.get(email='admin').delete()
+        self.assertEqual(Member.objects.count_team_members(), 1)
+
+    def test_bulk_create(self):
+        Member.objects.bulk_create([Member(**self.member1_data), Member(**self.member2_data)])
+        self.assertEqual(Member.objects.count_team_members(), 2)
+
+    def test_recount_members_command(self):
+        Member.objects.create(**self.member1_data)
+        MemberCounter.objects.set_value(MemberCounter.TEAM_MEMBERS, 42)
+
+        out = StringIO()
+        call_command('recount_members', stdout=out)
+        self.assertIn('42 -> 1', out.getvalue())
+        self.assertEqual(Member.objects.count_team_members(), 1)
+
+    def test_list_page_reads_counter(self):
+        Member.objects.create(**self.member1_data)
+        MemberCounter.objects.set_value(MemberCounter.TEAM_MEMBERS, 7)
+        response = self.client.get(reverse_lazy('members:list'))
+        self.assertContains(response, 'You have 7 team members.')
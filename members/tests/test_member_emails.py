@@ -0,0 +1,44 @@
+from django.core import mail
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.tests.test_jobs import InlineExecutor
+from jobs.worker import Worker
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+class MemberEmailTest(MemberTestCase):
+
+    def run_jobs(self):
+        return Worker(executor=InlineExecutor()).run_once()
+
+    def test_welcome_email(self):
+        response = self.client.post(reverse('members:new'), self.member1_data)
+        self.assertRedirects(response, reverse('members:list'))
+        # Sent by the workers, not by the request.
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Job.objects.get().task, 'members.welcome_email')
+
+        self.assertEqual(self.run_jobs(), 1)
+        message, = mail.outbox
+        self.assertEqual(message.to, [self.member1_data['email']])
+        self.assertIn('regular', message.body)
+        self.assertFalse(Job.objects.exists())
+
+    def test_role_changed_email(self):
+        member = Member.objects.create(**self.member1_data)
+        url = reverse('members:edit', args=[member.pk])
+        self.client.post(url, dict(self.member1_data, first_name='Stace'))
+        self.assertFalse(Job.objects.exists())
+        self.client.post(url, dict(self.member1_data, role=Member.RoleChoices.admin))
+        self.assertEqual(self.run_jobs(), 1)
+        message, = mail.outbox
+        self.assertEqual(message.subject, 'Your role has changed')
+        self.assertIn('admin', message.body)
+
+    def test_deleted_member(self):
+        self.client.post(reverse('members:new'), self.member1_data)
+        Member.objects.filter(email=self.member1_data['email']).delete()
+        self.assertEqual(self.run_jobs(), 1)
+        self.assertEqual(len(mail.outbox), 0)
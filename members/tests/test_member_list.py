@@ -1,9 +1,11 @@
 from http import HTTPStatus
+from unittest import mock
 
 from django.urls import reverse_lazy, reverse
 
 from members.models import Member
 from members.tests.test_member_base import MemberTestCase
+from members.views import MemberListView
 
 
 class MemberListViewTest(MemberTestCase):
@@ -39,3 +41,35 @@ class MemberListViewTest(MemberTestCase):
         response = self.client.get(self.url)
         self.assertContains(response, 'You have 1 team members.')
         self.assertNotContains(response, reverse('members:edit', args=[member.id]))
+
+    @mock.patch.object(MemberListView, 'paginate_by', 2)
+    def test_keyset_pagination(self):
+        for i in range(5):
+            Member.objects.create(email=f'member{i}@gmail.com', phone=f'111-222-000{i}')
+        expected = list(Member.objects.order_by('-date_joined', '-id').exclude(is_superuser=True))
+
+        response = self.client.get(self.url)
+        self.assertContains(response, 'You have 5 team members.')
+        page = response.context_data['page_obj']
+        self.assertEqual(list(response.context_data['members']), expected[:2])
+        self.assertFalse(page.has_previous())
+
+        response = self.client.get(self.url, {'cursor': page.next_cursor})
+        page = response.context_data['page_obj']
+        self.assertEqual(list(response.context_data['members']), expected[2:4])
+
+        response = self.client.get(self.url, {'cursor': page.next_cursor})
+        last_page = response.context_data['page_obj']
+        self.assertEqual(list(response.context_data['members']), expected[4:])
+        self.assertFalse(last_page.has_next())
+
+        response = self.client.get(self.url, {'cursor': last_page.previous_cursor})
+        self.assertEqual(list(response.context_data['members']), expected[2:4])
+
+        response = self.client.get(self.url, {'cursor': response.context_data['page_obj'].previous_cursor})
+        self.assertEqual(list(response.context_data['members']), expected[:2])
+        self.assertFalse(response.context_data['page_obj'].has_previous())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,113 @@
+import io
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from unittest import skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from members import cache as member_cache
+from members.models import Member
+from members.pictures import picture_storage, thumbnail_names
+from members.tests.test_member_base import MemberTestCase
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def png(color='red', size=(300, 200)):
+    content = io.BytesIO()
+    Image.new('RGB', size, color).save(content, 'PNG')
+    return SimpleUploadedFile('picture.PNG', content.getvalue(), content_type='image/png')
+
+
+class MemberPictureTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = Path(media_root.name)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.member1 = Member.objects.create(**self.member1_data)
+        self.member2 = Member.objects.create(**self.member2_data)
+
+    def test_content_addressed(self):
+        for member in (self.member1, self.member2):
+            member.picture = SimpleUploadedFile('me.jpg', b'same picture')
+            member.save()
+        self.assertEqual(self.member1.picture.name, self.member2.picture.name)
+        self.assertRegex(self.member1.picture.name, r'^pictures/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(len(list(self.media_root.rglob('*.jpg'))), 1)
+
+    def test_card_shows_thumbnails_when_ready(self):
+        self.member1.picture = SimpleUploadedFile('me.jpg', b'picture')
+        self.member1.save()
+        response = self.client.get(reverse('members:list'))
+        self.assertContains(response, 'default_profile_picture.png', count=2)
+
+        Member.objects.filter(pk=self.member1.pk).update(thumbnails_at=timezone.now())
+        member_cache.invalidate_members([self.member1.pk])
+        self.member1.refresh_from_db()
+        card = self.member1.thumbnail_urls
+        response = self.client.get(reverse('members:list'))
+        self.assertContains(response, 'default_profile_picture.png', count=1)
+        self.assertContains(response, f'srcset="{card["webp"]}, {card["webp_2x"]} 2x"')
+        self.assertContains(response, f'src="{card["jpg"]}"')
+
+        # A new picture shows the default again until its thumbnails are made.
+        self.member1.picture = SimpleUploadedFile('me.jpg', b'another picture')
+        self.member1.save()
+        self.member1.refresh_from_db()
+        self.assertIsNone(self.member1.thumbnails_at)
+
+    def test_serve_picture(self):
+        name = picture_storage.save('thumbnails/me.webp', SimpleUploadedFile('me.webp', b'thumbnail'))
+        url = reverse('members:picture', args=[name])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(b''.join(response.streaming_content), b'thumbnail')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+                         HTTPStatus.NOT_MODIFIED)
+        for name in ('../db.sqlite3', thumbnail_names(name)[0][0]):
+            self.assertEqual(self.client.get(reverse('members:picture', args=[name])).status_code,
+                             HTTPStatus.NOT_FOUND)
+
+    @skipUnless(Image, 'Pillow is not installed')
+    def test_upload_and_thumbnails(self):
+        from members.thumbnails import ThumbnailWorker
+
+        data = dict(self.member1_data, picture=png())
+        response = self.client.post(reverse('members:edit', args=[self.member1.pk]), data)
+        self.assertRedirects(response, reverse('members:list'))
+        self.member1.refresh_from_db()
+        self.assertTrue(self.member1.picture)
+        self.assertIsNone(self.member1.thumbnail_urls)
+        self.member2.picture = self.member1.picture.name
+        self.member2.save()
+
+        worker = ThumbnailWorker(executor=ProcessPoolExecutor(max_workers=1))
+        self.addCleanup(worker.executor.shutdown)
+        self.assertEqual(worker.run_once(), 2)
+        self.assertEqual(worker.run_once(), 0)
+        for name, size, _ in thumbnail_names(self.member1.picture.name):
+            with Image.open(picture_storage.path(name)) as thumbnail:
+                self.assertEqual(thumbnail.size, (size, size))
+        self.member1.refresh_from_db()
+        self.assertIsNotNone(self.member1.thumbnail_urls)
+
+    @skipUnless(Image, 'Pillow is not installed')
+    def test_invalid_upload(self):
+        data = dict(self.member1_data, picture=SimpleUploadedFile('me.png', b'not an image'))
+        response = self.client.post(reverse('members:edit', args=[self.member1.pk]), data)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('picture', response.context['form'].errors)
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import reverse
+
+from members.models import Member
+from members.search import ensure_search_triggers, match_expression, search_members
+from members.tests.test_member_base import MemberTestCase
+
+
+class MemberSearchTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member1 = Member.objects.create(**self.member1_data)
+        self.member2 = Member.objects.create(**self.member2_data)
+        self.member3 = Member.objects.create(first_name='Stacey', last_name='Namin', email='sn@yahoo.com',
+                                             phone='333-333-3333')
+        self.members = Member.objects.exclude(is_superuser=True)
+
+    def search(self, query):
+        return list(search_members(self.members, query))
+
+    def test_match_expression(self):
+        self.assertEqual(match_expression('stacy ba'), '"stacy"* "ba"*')
+        self.assertEqual(match_expression('"OR (x'), '"OR"* "x"*')
+        self.assertEqual(match_expression('  '), '')
+
+    def test_prefix_search(self):
+        self.assertCountEqual(self.search('stac'), [self.member1, self.member3])
+        self.assertEqual(self.search('stacy'), [self.member1])
+        self.assertEqual(self.search('namin st'), [self.member3])
+        self.assertEqual(self.search('yahoo'), [self.member3])
+        self.assertEqual(self.search('222'), [self.member2])
+        self.assertEqual(self.search('nobody'), [])
+        self.assertEqual(self.search(''), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.member1.last_name = 'Anderson'
+        self.member1.save()
+        self.assertEqual(self.search('anders'), [self.member1])
+        self.assertEqual(self.search('bale'), [])
+
+        self.member1.delete()
+        self.assertEqual(self.search('anders'), [])
+
+    def test_missing_triggers_are_recreated(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER members_member_fts_insert')
+        member = Member.objects.create(first_name='Unindexed', email='u@gmail.com', phone='444-444-4444')
+        self.assertEqual(self.search('unindexed'), [])
+
+        ensure_search_triggers(connection)
+        self.assertEqual(self.search('unindexed'), [member])
+
+    def test_list_page_search(self):
+        response = self.client.get(reverse('members:list'), {'q': 'namin'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(set(response.context_data['members']), {self.member2, self.member3})
+        self.assertNotContains(response, reverse('members:edit', args=[self.member1.id]))
+        self.assertContains(response, 'value="namin"')
+
+    def test_search_api(self):
+        response = self.client.get(reverse('members:search'), {'q': 'sta'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual({row['email'] for row in response.json()['results']},
+                         {self.member1.email, self.member3.email})
+        self.assertIsNone(response.json()['next'])
+
+    def test_search_api_pagination(self):
+        for i in range(60):
+            Member.objects.create(first_name='Bulk', email=f'bulk{i}@gmail.com', phone=f'555-000-{i:04}')
+        response = self.client.get(reverse('members:search'), {'q': 'bulk'})
+        self.assertEqual(len(response.json()['results']), 50)
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(len(response.json()['results']), 10)
+        self.assertIsNotNone(response.json()['previous'])
+
+    def test_admin_search(self):
+        request = RequestFactory().get('/')
+        queryset, may_have_duplicates = site._registry[Member].get_search_results(request, self.members, 'namin')
+        self.assertEqual(set(queryset), {self.member2, self.member3})
+        self.assertFalse(may_have_duplicates)
+
+        self.client.force_login(Member.objects.get(email='admin'))
+        response = self.client.get(reverse('admin:members_member_changelist'), {'q': 'namin'})
+        self.assertEqual(list(response.context_data['cl'].result_list), [self.member2, self.member3])
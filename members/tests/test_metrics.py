@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, override_settings
+from django.urls import resolve, reverse
+
+from instawork.metrics import (CONTENT_TYPE, DB_DURATION, N_PLUS_ONE, QUERIES, REQUEST_DURATION, TEMPLATE_DURATION,
+                               Histogram, RequestMetrics, normalize_sql, registry)
+from instawork.metrics.middleware import MetricsMiddleware
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+class MetricsTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        registry.clear()
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('members:list'))
+        self.client.get(reverse('members:list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE)
+        content = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', content)
+        self.assertIn('http_request_duration_seconds_count{view="members:list",method="GET"} 2', content)
+        self.assertIn('http_request_duration_seconds_bucket{view="members:list",method="GET",le="+Inf"} 2', content)
+        self.assertIn('http_requests_total{view="members:list",method="GET",status="200"} 2', content)
+
+    def test_request_breakdown(self):
+        member = Member.objects.create(**self.member1_data)
+        self.client.get(reverse('members:edit', args=[member.pk]))
+        self.assertEqual(REQUEST_DURATION.get_count('members:edit', 'GET'), 1)
+        self.assertEqual(TEMPLATE_DURATION.get_count('members:edit'), 1)
+        self.assertEqual(QUERIES.get_count('members:edit'), 1)
+
+        self.client.get('/no-such-page/')
+        self.assertEqual(REQUEST_DURATION.get_count('<unresolved>', 'GET'), 1)
+
+    async def test_request_breakdown_under_asgi(self):
+        # The queries run on the threads of sync_to_async, with connections of their own.
+        response = await AsyncClient().get(reverse('members:async_list'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(QUERIES.get_count('members:async_list'), 1)
+        self.assertGreater(QUERIES.get_sum('members:async_list'), 0)
+        self.assertGreater(DB_DURATION.get_sum('members:async_list'), 0)
+
+    @override_settings(METRICS_N_PLUS_ONE_THRESHOLD=3)
+    def test_n_plus_one(self):
+        members = [Member.objects.create(email=f'member{n}@gmail.com', phone=f'111-222-000{n}') for n in range(3)]
+
+        def get_response(request):
+            for member in members:
+                Member.objects.get(pk=member.pk)
+            return HttpResponse()
+        middleware = MetricsMiddleware(get_response)
+        request = RequestFactory().get('/')
+        request.resolver_match = resolve(reverse('members:list'))
+
+        with self.assertLogs('instawork.metrics', 'WARNING') as logs:
+            middleware(request)
+            middleware(request)
+        self.assertEqual(N_PLUS_ONE.get('members:list'), 2)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('Possible N+1 queries in members:list: 3 x SELECT', logs.output[0])
+
+        self.client.get(reverse('members:list'))
+        self.assertEqual(N_PLUS_ONE.get('members:list'), 2)
+
+    @override_settings(METRICS_SLOW_REQUEST_SECONDS=0)
+    def test_slow_request_log(self):
+        with self.assertLogs('instawork.metrics.slow', 'WARNING') as logs:
+            self.client.get(reverse('members:list'), {'q': 'stacy@gmail.com'})
+        self.assertIn('Slow request GET /members/ (members:list)', logs.output[0])
+        self.assertNotIn('stacy', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(METRICS_SLOW_REQUEST_SECONDS=0)
+    def test_slow_request_log_leaves_out_parameters(self):
+        with self.assertLogs('instawork.metrics.slow', 'WARNING') as logs:
+            self.client.post(reverse('members:new'), self.member1_data)
+        self.assertIn('INSERT INTO "members_member"', logs.output[0])
+        self.assertNotIn(self.member1_data['email'], logs.output[0])
+        self.assertNotIn(self.member1_data['phone'], logs.output[0])
+
+    def test_detect_repeated_statement(self):
+        metrics = RequestMetrics()
+        execute = lambda sql, params, many, context: None
+        for pk in range(12):
+            metrics(execute, 'SELECT * FROM members_member WHERE id = %s', [pk], False, {})
+        metrics(execute, 'SELECT * FROM members_member WHERE id IN (%s, %s)', [1, 2], False, {})
+        self.assertEqual(metrics.queries, 13)
+        self.assertEqual(metrics.most_repeated(), ('SELECT * FROM members_member WHERE id = %s', 12))
+        self.assertEqual(normalize_sql('WHERE id IN (%s, %s, %s)'), normalize_sql('WHERE id IN (%s, %s)'))
+        self.assertEqual(normalize_sql('VALUES (%s, %s), (%s, %s)'), 'VALUES (%s, ...), ...')
+        self.assertEqual(normalize_sql('VALUES (%s), (%s), (%s)'), 'VALUES (%s), ...')
+
+    def test_histogram(self):
+        histogram = Histogram('test_seconds', 'Test.', ['view'], buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value, 'a')
+        self.assertEqual(histogram.render(), [
+            '# HELP test_seconds Test.',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="a",le="0.1"} 2',
+            'test_seconds_bucket{view="a",le="1"} 3',
+            'test_seconds_bucket{view="a",le="+Inf"} 4',
+            'test_seconds_sum{view="a"} 2.65',
+            'test_seconds_count{view="a"} 4',
+        ])
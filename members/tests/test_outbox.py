@@ -0,0 +1,204 @@
+import json
+import threading
+from datetime import timedelta
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from members.models import DeadLetter, Member, OutboxEvent, WebhookCursor
+from members.outbox import OutboxWorker
+from members.tests.test_member_base import MemberTestCase
+
+
+class StubWebhook(ThreadingHTTPServer):
+    """A local webhook endpoint recording the batches it receives."""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubWebhookHandler)
+        self.batches = []
+        self.connections = set()
+        self.statuses = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/hook'
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubWebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.connections.add(self.client_address)
+        status = self.server.statuses.pop(0) if self.server.statuses else HTTPStatus.OK
+        if status == HTTPStatus.OK:
+            self.server.batches.append(body['events'])
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class OutboxTestCase(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Drop the event of the admin created on migrate.
+        OutboxEvent.objects.all().delete()
+
+
+class OutboxEventTest(OutboxTestCase):
+
+    def events(self):
+        return list(OutboxEvent.objects.order_by('id').values_list('type', 'member_id'))
+
+    def test_view_writes(self):
+        self.client.post(reverse('members:new'), self.member1_data)
+        member = Member.objects.get(email=self.member1_data['email'])
+        self.client.post(reverse('members:edit', args=[member.pk]), dict(self.member1_data, first_name='anderson'))
+        self.client.force_login(Member.objects.create(**self.member2_data))
+        self.client.delete(reverse('members:delete', args=[member.pk]))
+        self.assertEqual([event for event in self.events() if event[1] == member.pk], [
+            (OutboxEvent.Types.created, member.pk),
+            (OutboxEvent.Types.updated, member.pk),
+            (OutboxEvent.Types.deleted, member.pk),
+        ])
+        event = OutboxEvent.objects.filter(type=OutboxEvent.Types.updated).get()
+        self.assertEqual(event.payload['first_name'], 'anderson')
+        self.assertEqual(event.payload['date_joined'], member.date_joined.isoformat()[:23] + 'Z')
+
+    def test_manager_writes(self):
+        members = Member.objects.bulk_create([Member(email=f'member{n}@gmail.com', phone=f'111-222-000{n}')
+                                              for n in range(3)])
+        pks = [member.pk for member in members]
+        Member.objects.bulk_update_role(pks[:2], Member.RoleChoices.admin)
+        Member.objects.bulk_delete(pks[1:])
+        self.assertEqual(self.events(), [
+            *[(OutboxEvent.Types.created, pk) for pk in pks],
+            *[(OutboxEvent.Types.updated, pk) for pk in pks[:2]],
+            *[(OutboxEvent.Types.deleted, pk) for pk in pks[1:]],
+        ])
+        self.assertEqual(OutboxEvent.objects.filter(type=OutboxEvent.Types.updated).first().payload['role'],
+                         Member.RoleChoices.admin)
+
+    def test_rolled_back_write_has_no_event(self):
+        Member.objects.create(**self.member1_data)
+        self.client.post(reverse('members:new'), dict(self.member2_data, phone=self.member1_data['phone']))
+        self.assertEqual(len(self.events()), 1)
+
+    def test_last_login_update_has_no_event(self):
+        member = Member.objects.create_user(password='password', **self.member1_data)
+        self.client.login(email=member.email, password='password')
+        self.assertEqual(len(self.events()), 1)
+
+
+class OutboxWorkerTest(OutboxTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.webhook = StubWebhook()
+        self.addCleanup(self.webhook.stop)
+
+    def worker(self, **kwargs):
+        worker = OutboxWorker(endpoints=[self.webhook.url], **kwargs)
+        self.addCleanup(worker.session.close)
+        return worker
+
+    def create_members(self, count):
+        return Member.objects.bulk_create([Member(email=f'member{n}@gmail.com', phone=f'111-222-{n:04}')
+                                           for n in range(count)])
+
+    def test_deliver_in_ordered_batches(self):
+        self.create_members(5)
+        worker = self.worker(batch_size=2)
+        self.assertEqual([worker.run_once() for _ in range(4)], [2, 2, 1, 0])
+        ids = [event['id'] for batch in self.webhook.batches for event in batch]
+        self.assertEqual(ids, list(OutboxEvent.objects.order_by('id').values_list('id', flat=True)))
+        self.assertEqual([len(batch) for batch in self.webhook.batches], [2, 2, 1])
+        self.assertEqual(self.webhook.batches[0][0]['type'], 'member.created')
+        self.assertEqual(self.webhook.batches[0][0]['data']['email'], 'member0@gmail.com')
+        # One pooled connection for all the batches.
+        self.assertEqual(len(self.webhook.connections), 1)
+
+    def test_retry_with_backoff(self):
+        self.create_members(1)
+        self.webhook.statuses = [HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.SERVICE_UNAVAILABLE]
+        worker = self.worker(backoff=10)
+        with self.assertLogs('members.outbox', 'WARNING'):
+            self.assertEqual(worker.run_once(), 0)
+        cursor = WebhookCursor.objects.get()
+        self.assertEqual((cursor.attempts, cursor.last_error), (1, 'HTTP 503'))
+        self.assertAlmostEqual((cursor.next_attempt_at - timezone.now()).total_seconds(), 10, delta=2)
+        # Not due yet.
+        self.assertEqual(worker.run_once(), 0)
+
+        WebhookCursor.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs('members.outbox', 'WARNING'):
+            worker.run_once()
+        cursor.refresh_from_db()
+        self.assertAlmostEqual((cursor.next_attempt_at - timezone.now()).total_seconds(), 20, delta=2)
+
+        WebhookCursor.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(worker.run_once(), 1)
+        cursor.refresh_from_db()
+        self.assertEqual((cursor.attempts, cursor.next_attempt_at), (0, None))
+
+    def test_dead_letter_after_max_attempts(self):
+        self.create_members(3)
+        self.webhook.statuses = [HTTPStatus.INTERNAL_SERVER_ERROR] * 2
+        worker = self.worker(batch_size=2, max_attempts=2, backoff=0)
+        with self.assertLogs('members.outbox', 'WARNING'):
+            worker.run_once()
+            worker.run_once()
+        self.assertEqual(DeadLetter.objects.count(), 2)
+        dead_letter = DeadLetter.objects.order_by('event_id').first()
+        self.assertEqual((dead_letter.endpoint, dead_letter.error, dead_letter.attempts),
+                         (self.webhook.url, 'HTTP 500', 2))
+        # The endpoint moves on to the next events.
+        self.assertEqual(worker.run_once(), 1)
+        self.assertEqual(self.webhook.batches[0][0]['id'], OutboxEvent.objects.order_by('id').last().id)
+
+    def test_rejected_batch_is_dead_lettered_right_away(self):
+        self.create_members(1)
+        self.webhook.statuses = [HTTPStatus.BAD_REQUEST]
+        with self.assertLogs('members.outbox', 'ERROR'):
+            self.worker().run_once()
+        self.assertEqual(DeadLetter.objects.count(), 1)
+
+    def test_unreachable_endpoint(self):
+        self.create_members(1)
+        self.webhook.stop()
+        with self.assertLogs('members.outbox', 'WARNING'):
+            self.assertEqual(self.worker().run_once(), 0)
+        self.assertEqual(WebhookCursor.objects.get().attempts, 1)
+
+    def test_prune_delivered_events(self):
+        self.create_members(2)
+        OutboxEvent.objects.update(created_at=timezone.now() - timedelta(days=8))
+        self.create_members(0)
+        worker = self.worker(batch_size=1, retention=timedelta(days=7))
+        worker.run_once()
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+        worker.run_once()
+        self.assertEqual(OutboxEvent.objects.count(), 0)
+
+    def test_command(self):
+        self.create_members(2)
+        out = StringIO()
+        with override_settings(OUTBOX_WEBHOOKS=[self.webhook.url]):
+            call_command('run_outbox_worker', once=True, stdout=out)
+        self.assertIn('Delivered 2 events.', out.getvalue())
+        self.assertEqual(len(self.webhook.batches), 1)
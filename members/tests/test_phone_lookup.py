@@ -0,0 +1,72 @@
+import importlib
+from http import HTTPStatus
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.db import connection
+from django.urls import reverse
+
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+from utils import normalize_phone
+
+backfill = importlib.import_module('members.migrations.0010_member_phone_normalized')
+
+
+class PhoneLookupTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member = Member.objects.create(**self.member1_data)
+
+    def test_normalize_phone(self):
+        for value in ('111-111-1111', '1111111111', '11111111111', '+11111111111', '+1 (111) 111-1111'):
+            self.assertEqual(normalize_phone(value), '+11111111111', value)
+        for value in ('', None, '111-1111', '+44 111 111 1111', '+1111111111'):
+            self.assertIsNone(normalize_phone(value), value)
+
+    def test_normalized_on_save(self):
+        self.assertEqual(self.member.phone_normalized, '+11111111111')
+        self.member.phone = '333-333-3333'
+        self.member.save(update_fields=['phone'])
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.phone_normalized, '+13333333333')
+
+        Member.objects.bulk_create([Member(email='member@gmail.com', phone='444-444-4444')])
+        self.assertTrue(Member.objects.filter(phone_normalized='+14444444444').exists())
+
+    def test_by_phone(self):
+        for number in ('+11111111111', '1111111111', '111-111-1111'):
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse('members:by_phone', args=[number]))
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertEqual(response.json()['id'], self.member.pk)
+        for number in ('+12222222222', 'nope'):
+            response = self.client.get(reverse('members:by_phone', args=[number]))
+            self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_lookup(self):
+        member2 = Member.objects.create(**self.member2_data)
+        numbers = ['+12222222222', 'nope', '1111111111', '+19999999999'] + [f'555{n:07}' for n in range(2000)]
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('members:by_phone_lookup'), {'numbers': numbers},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        results = response.json()['results']
+        self.assertEqual(len(results), len(numbers))
+        self.assertEqual([result['number'] for result in results[:4]], numbers[:4])
+        self.assertEqual([result['member'] and result['member']['id'] for result in results[:4]],
+                         [member2.pk, None, self.member.pk, None])
+
+        response = self.client.post(reverse('members:by_phone_lookup'), {'numbers': []},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_backfill(self):
+        Member.objects.create(**self.member2_data)
+        Member.objects.update(phone_normalized=None)
+        backfill.CHUNK_SIZE = 1
+        self.addCleanup(setattr, backfill, 'CHUNK_SIZE', 1000)
+        backfill.backfill_phone_normalized(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(set(Member.objects.exclude(is_superuser=True).values_list('phone_normalized', flat=True)),
+                         {'+11111111111', '+12222222222'})
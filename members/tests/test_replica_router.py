@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+from django.contrib.sessions.models import Session
+from django.db import router
+from django.test import override_settings
+from django.urls import reverse, reverse_lazy
+
+from instawork.db.middleware import ReplicaMiddleware
+from instawork.db.routers import use_primary
+from members.models import Member, MemberCounter
+from members.tests.test_member_base import MemberTestCase
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_STICKY_SECONDS=7)
+class ReplicaRouterTest(MemberTestCase):
+    def test_reads_go_to_replicas(self):
+        self.assertEqual(Member.objects.all().db, 'replica1')
+        self.assertEqual(MemberCounter.objects.all().db, 'replica1')
+        self.assertEqual(Session.objects.all().db, 'default')
+        self.assertEqual(router.db_for_write(Member), 'default')
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(Member.objects.all().db, 'default')
+        with use_primary(False) as state:
+            self.assertEqual(Member.objects.all().db, 'replica1')
+            Member.objects.create(**self.member1_data)
+            self.assertTrue(state['wrote'])
+            self.assertEqual(Member.objects.all().db, 'default')
+        self.assertEqual(Member.objects.all().db, 'replica1')
+
+    def test_nested_write_reaches_outer_block(self):
+        with use_primary(False) as state:
+            with use_primary():
+                Member.objects.create(**self.member1_data)
+            self.assertTrue(state['wrote'])
+            self.assertEqual(Member.objects.all().db, 'default')
+
+    def test_write_sticks_to_primary(self):
+        response = self.client.post(reverse('members:new'), self.member1_data)
+        self.assertRedirects(response, reverse_lazy('members:list'), fetch_redirect_response=False)
+        cookie = response.cookies[ReplicaMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], 7)
+
+        response = self.client.get(reverse('members:list'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual([member._state.db for member in response.context_data['members']], ['default'])
+        self.assertNotIn(ReplicaMiddleware.cookie_name, response.cookies)
+
+    def test_edit_page_reads_primary(self):
+        member = Member.objects.create(**self.member1_data)
+        response = self.client.get(reverse('members:edit', args=[member.pk]))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context_data['member']._state.db, 'default')
+
+
+class NoReplicaTest(MemberTestCase):
+    def test_primary_only(self):
+        self.assertEqual(Member.objects.all().db, 'default')
+        response = self.client.post(reverse('members:new'), self.member1_data)
+        self.assertRedirects(response, reverse_lazy('members:list'))
+        self.assertNotIn(ReplicaMiddleware.cookie_name, response.cookies)
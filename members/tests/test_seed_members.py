@@ -0,0 +1,40 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+from members.models import Member
+from members.seeding import format_phone, next_number
+from members.tests.test_member_base import MemberTestCase
+
+
+class SeedMembersTest(MemberTestCase):
+
+    def seed(self, count, **options):
+        out = StringIO()
+        call_command('seed_members', count=count, stdout=out, **options)
+        return out.getvalue()
+
+    def test_format_phone(self):
+        self.assertEqual(format_phone(0), '000-000-0000')
+        self.assertEqual(format_phone(1234567890), '123-456-7890')
+        self.assertEqual(format_phone(10 ** 10 - 1), '999-999-9999')
+
+    def test_seed(self):
+        Member.objects.create(**self.member1_data)
+        self.assertEqual(next_number(), 1111111112)
+
+        self.assertIn('Seeded 25 members.', self.seed(25, batch_size=10, seed=1))
+        self.seed(5)
+        self.assertEqual(Member.objects.count_team_members(), 31)
+        members = Member.objects.exclude(is_superuser=True)
+        self.assertEqual(members.values('email').distinct().count(), 31)
+        self.assertEqual(members.values('phone').distinct().count(), 31)
+        for member in members.exclude(email=self.member1_data['email']):
+            member.full_clean(exclude=['password'])
+        self.assertEqual(next_number(), 1111111142)
+
+    def test_out_of_phone_numbers(self):
+        Member.objects.create(**dict(self.member1_data, phone='999-999-9998'))
+        self.seed(1)
+        with self.assertRaises(CommandError):
+            self.seed(1)
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.urls import reverse
+
+from members.models import Member, MemberTombstone, OutboxEvent
+from members.tests.test_member_base import MemberTestCase
+
+
+class SoftDeleteTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = Member.objects.create_user(password='password', **self.member2_data)
+        self.members = [Member.objects.create_user(email=f'member{n}@gmail.com', phone=f'111-222-000{n}',
+                                                   password='password')
+                        for n in range(5)]
+        self.group = Group.objects.create(name='team')
+        self.group.user_set.add(*self.members)
+        self.client.force_login(self.admin)
+
+    def test_delete(self):
+        member = self.members[0]
+        # user, transaction, get_object, lookup, soft delete, counter, outbox, tombstone, commit.
+        with self.assertNumQueries(9):
+            response = self.client.delete(reverse('members:delete', args=[member.pk]))
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+
+        self.assertFalse(Member.objects.filter(pk=member.pk).exists())
+        self.assertEqual(Member.objects.count_team_members(), 5)
+        self.assertTrue(MemberTombstone.objects.filter(member_id=member.pk).exists())
+        self.assertTrue(OutboxEvent.objects.filter(member_id=member.pk, type=OutboxEvent.Types.deleted).exists())
+        # The row and its relations stay until they are purged.
+        deleted = Member.all_objects.get(pk=member.pk)
+        self.assertIsNotNone(deleted.deleted_at)
+        self.assertFalse(deleted.is_active)
+        self.assertEqual(self.group.user_set.count(), 5)
+
+        self.assertEqual(self.client.get(reverse('members:edit', args=[member.pk])).status_code,
+                         HTTPStatus.NOT_FOUND)
+        self.assertEqual(self.client.delete(reverse('members:delete', args=[member.pk])).status_code,
+                         HTTPStatus.NOT_FOUND)
+        self.assertNotContains(self.client.get(reverse('members:list')), member.email)
+        self.assertFalse(self.client.login(email=member.email, password='password'))
+
+    def test_bulk_and_async_delete(self):
+        response = self.client.post(reverse('members:bulk_delete'), {'ids': [self.members[0].pk, 999999]},
+                                    content_type='application/json')
+        self.assertEqual([result['status'] for result in response.json()['results']], ['deleted', 'not_found'])
+        response = self.client.delete(reverse('members:async_delete', args=[self.members[1].pk]))
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertEqual(set(Member.all_objects.filter(deleted_at__isnull=False).values_list('pk', flat=True)),
+                         {self.members[0].pk, self.members[1].pk})
+        self.assertEqual(Member.objects.count_team_members(), 4)
+
+    def test_email_and_phone_stay_taken(self):
+        member = self.members[0]
+        Member.objects.soft_delete([member.pk])
+        response = self.client.post(reverse('members:new'), {
+            'first_name': 'stacy', 'last_name': 'bale', 'email': member.email, 'phone': member.phone,
+            'role': Member.RoleChoices.regular,
+        })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(set(response.context['form'].errors), {'email', 'phone'})
+
+    def test_purge(self):
+        pks = [member.pk for member in self.members[:3]]
+        Member.objects.soft_delete(pks)
+        tombstones = MemberTombstone.objects.count()
+        events = OutboxEvent.objects.count()
+
+        out = StringIO()
+        call_command('purge_deleted_members', batch_size=2, stdout=out)
+        self.assertIn('Purged 3 members.', out.getvalue())
+        self.assertFalse(Member.all_objects.filter(pk__in=pks).exists())
+        self.assertEqual(self.group.user_set.count(), 2)
+        # Already counted and reported by soft_delete().
+        self.assertEqual(Member.objects.count_team_members(), 3)
+        self.assertEqual(MemberTombstone.objects.count(), tombstones)
+        self.assertEqual(OutboxEvent.objects.count(), events)
+
+        call_command('purge_deleted_members', stdout=out)
+        self.assertIn('Purged 0 members.', out.getvalue())
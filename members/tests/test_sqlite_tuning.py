@@ -0,0 +1,73 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from benchmarks import sqlite_writers
+from instawork.db import immediate_atomic
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+
+@skipUnless(settings.SQLITE_TUNING, 'INSTAWORK_SQLITE_TUNING=0')
+class SQLitePragmasTest(MemberTestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+        self.assertEqual(self.pragma('temp_store'), 2)
+
+
+@skipUnless(settings.SQLITE_TUNING, 'INSTAWORK_SQLITE_TUNING=0')
+class ImmediateTransactionTest(TransactionTestCase):
+    def capture_begins(self):
+        begins = []
+
+        def record(execute, sql, params, many, context):
+            if sql.startswith('BEGIN'):
+                begins.append(sql)
+            return execute(sql, params, many, context)
+        return begins, connection.execute_wrapper(record)
+
+    def test_immediate_atomic(self):
+        begins, wrapper = self.capture_begins()
+        with wrapper, immediate_atomic():
+            Member.objects.count()
+        self.assertEqual(begins, ['BEGIN IMMEDIATE'])
+        self.assertFalse(connection.begin_immediate)
+
+    def test_nested_atomic_stays_deferred(self):
+        begins, wrapper = self.capture_begins()
+        with wrapper:
+            with immediate_atomic():
+                with immediate_atomic():
+                    Member.objects.count()
+            with immediate_atomic():
+                pass
+            Member.objects.create_user('stacyBale@gmail.com', 'password', phone='111-111-1111')
+        self.assertEqual(begins, ['BEGIN IMMEDIATE', 'BEGIN IMMEDIATE', 'BEGIN'])
+
+    def test_write_views_begin_immediate(self):
+        self.client.force_login(Member.objects.get(email='admin'))
+        data = {'first_name': 'stacy', 'last_name': 'bale', 'phone': '111-111-1111',
+                'email': 'stacyBale@gmail.com', 'role': Member.RoleChoices.regular}
+        begins, wrapper = self.capture_begins()
+        with wrapper:
+            response = self.client.post(reverse('members:new'), data)
+        self.assertRedirects(response, reverse('members:list'))
+        self.assertEqual(begins, ['BEGIN IMMEDIATE'])
+
+
+class ConcurrentWritersTest(MemberTestCase):
+    def test_no_locked_writers(self):
+        summary = sqlite_writers.run(writers=4, operations=5, tuned=True)
+        self.assertEqual(summary['completed'], 20)
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual(summary['locked'], 0)
@@ -0,0 +1,87 @@
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from wsgiref.util import setup_testing_defaults
+
+from instawork.assets.server import IMMUTABLE_CACHE_CONTROL, StaticFilesApplication
+
+CSS = 'members/css/base.css'
+STORAGE = 'instawork.assets.storage.CompressedManifestStaticFilesStorage'
+
+
+def django_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'django']
+
+
+class StaticAssetsTest(SimpleTestCase):
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = Path(root.name)
+        settings = override_settings(STATIC_ROOT=self.root, STATICFILES_STORAGE=STORAGE)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.hashed = json.loads((self.root / 'staticfiles.json').read_text())['paths'][CSS]
+        self.app = StaticFilesApplication(django_app, root=self.root, prefix='static/')
+
+    def request(self, path, method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method}
+        environ.update((f'HTTP_{name.upper()}', value) for name, value in headers.items())
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, response_headers):
+            response.update(response_headers, status=int(status.split()[0]))
+
+        body = self.app(environ, start_response)
+        try:
+            return response, b''.join(body)
+        finally:
+            getattr(body, 'close', lambda: None)()
+
+    def test_collectstatic(self):
+        self.assertNotEqual(self.hashed, CSS)
+        content = (self.root / self.hashed).read_bytes()
+        self.assertEqual(gzip.decompress((self.root / f'{self.hashed}.gz').read_bytes()), content)
+        # Images are compressed already.
+        self.assertFalse(list(self.root.rglob('*.png.gz')))
+        self.assertEqual(Template('{% load static %}{% static "' + CSS + '" %}').render(Context()),
+                         f'/static/{self.hashed}')
+
+    def test_serve(self):
+        url = f'/static/{self.hashed}'
+        content = (self.root / self.hashed).read_bytes()
+        response, body = self.request(url, accept_encoding='gzip, deflate')
+        self.assertEqual(response['status'], 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(body), content)
+
+        for accept_encoding in ('', 'identity', 'gzip;q=0'):
+            response, body = self.request(url, accept_encoding=accept_encoding)
+            self.assertNotIn('Content-Encoding', response)
+            self.assertEqual(body, content)
+
+        response, body = self.request(url, if_none_match=response['ETag'])
+        self.assertEqual((response['status'], body), (304, b''))
+        response, body = self.request(url, method='HEAD')
+        self.assertEqual((response['status'], body), (200, b''))
+
+        # The unhashed originals may change, so they are revalidated.
+        response, _ = self.request(f'/static/{CSS}')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_other_requests(self):
+        self.assertEqual(self.request('/static/members/nope.css')[0]['status'], 404)
+        self.assertEqual(self.request('/members/')[1], b'django')
+        self.assertEqual(self.request(f'/static/{self.hashed}', method='POST')[1], b'django')
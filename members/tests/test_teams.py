@@ -0,0 +1,319 @@
+import os
+import tempfile
+from collections import Counter
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from instawork.db.routers import use_shard
+from instawork.db.sharding import HashRing, get_shard
+from jobs.models import Job
+from jobs.tests.test_jobs import InlineExecutor
+from jobs.worker import Worker
+from members.models import MAX_SHARDS, Member, MemberCounter, OutboxEvent, Team, TeamMoving, WebhookCursor
+from members.outbox import OutboxWorker
+from members.tests.test_member_base import MemberTestCase
+from members.tests.test_outbox import StubWebhook
+
+SHARD = 'shard1'
+SHARDS = [DEFAULT_DB_ALIAS, SHARD]
+
+
+class HashRingTest(SimpleTestCase):
+
+    def test_spread_and_stability(self):
+        keys = [f'team {n}' for n in range(3000)]
+        ring = HashRing(['a', 'b', 'c'])
+        placement = {key: ring.get_node(key) for key in keys}
+        self.assertEqual(placement, {key: HashRing(['c', 'b', 'a']).get_node(key) for key in keys})
+        for count in Counter(placement.values()).values():
+            self.assertAlmostEqual(count / len(keys), 1 / 3, delta=0.1)
+
+        # A new node takes about its share of the keys, from every node, and moves nothing else.
+        grown = HashRing(['a', 'b', 'c', 'd'])
+        moved = [key for key in keys if grown.get_node(key) != placement[key]]
+        self.assertAlmostEqual(len(moved) / len(keys), 1 / 4, delta=0.1)
+        self.assertEqual({grown.get_node(key) for key in moved}, {'d'})
+
+    @override_settings(DATABASE_SHARDS=SHARDS)
+    def test_routing(self):
+        self.assertEqual(router.db_for_write(Member), DEFAULT_DB_ALIAS)
+        with use_shard(SHARD):
+            self.assertEqual(Member.objects.all().db, SHARD)
+            self.assertEqual(MemberCounter.objects.all().db, SHARD)
+            self.assertEqual(router.db_for_write(Member), SHARD)
+            self.assertEqual(Team.objects.all().db, DEFAULT_DB_ALIAS)
+        member = Member(pk=1)
+        member._state.db = SHARD
+        self.assertEqual(router.db_for_write(Member, instance=member), SHARD)
+
+
+class TeamTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.team = Team.objects.create(name='Rockets')
+        self.other_team = Team.objects.create(name='Comets')
+        self.member1 = Member.objects.create(team=self.team, **self.member1_data)
+        self.member2 = Member.objects.create(team=self.other_team, **self.member2_data)
+
+    def test_shard(self):
+        self.assertEqual(self.team.shard, DEFAULT_DB_ALIAS)
+        with override_settings(DATABASE_SHARDS=SHARDS):
+            team = Team.objects.create(name='Planets')
+            self.assertEqual(team.shard, get_shard('Planets'))
+
+    def test_list(self):
+        response = self.client.get(reverse('members:team_list', args=[self.team.pk]))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context_data['members']), [self.member1])
+        self.assertEqual(response.context_data['member_count'], 1)
+        self.assertContains(response, reverse('members:team_edit', args=[self.team.pk, self.member1.pk]))
+        self.assertContains(response, reverse('members:team_new', args=[self.team.pk]))
+
+        response = self.client.get(reverse('members:team_list', args=[self.other_team.pk]))
+        self.assertEqual(list(response.context_data['members']), [self.member2])
+        self.assertEqual(self.client.get(reverse('members:team_list', args=[0])).status_code, HTTPStatus.NOT_FOUND)
+
+    def test_create_and_edit(self):
+        data = dict(self.member1_data, email='new@gmail.com', phone='333-333-3333')
+        response = self.client.post(reverse('members:team_new', args=[self.team.pk]), data)
+        self.assertRedirects(response, reverse('members:team_list', args=[self.team.pk]))
+        self.assertEqual(Member.objects.get(email='new@gmail.com').team, self.team)
+
+        url = reverse('members:team_edit', args=[self.team.pk, self.member1.pk])
+        response = self.client.post(url, dict(self.member1_data, first_name='Stace'))
+        self.assertRedirects(response, reverse('members:team_list', args=[self.team.pk]))
+        self.member1.refresh_from_db()
+        self.assertEqual(self.member1.first_name, 'Stace')
+
+        url = reverse('members:team_edit', args=[self.team.pk, self.member2.pk])
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.NOT_FOUND)
+
+    def test_delete(self):
+        self.client.force_login(Member.objects.create_user(
+            email='boss@gmail.com', phone='444-444-4444', password='password', role=Member.RoleChoices.admin))
+        response = self.client.delete(reverse('members:team_delete', args=[self.team.pk, self.member2.pk]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.client.delete(reverse('members:team_delete', args=[self.team.pk, self.member1.pk]))
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Member.objects.filter(pk=self.member1.pk).exists())
+
+    def test_writes_wait_for_move(self):
+        Team.objects.filter(pk=self.team.pk).update(moving=True)
+        url = reverse('members:team_edit', args=[self.team.pk, self.member1.pk])
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+        response = self.client.post(url, dict(self.member1_data, first_name='Stace'))
+        self.assertEqual(response.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response)
+        self.member1.refresh_from_db()
+        self.assertEqual(self.member1.first_name, 'stacy')
+
+    @override_settings(DATABASE_SHARDS=SHARDS)
+    def test_ids_unique_across_shards(self):
+        highest = Member.all_objects.order_by('-pk').values_list('pk', flat=True).first()
+        member = Member.objects.create(email='new@gmail.com', phone='333-333-3333')
+        members = Member.objects.bulk_create([Member(email=f'{n}@gmail.com', phone=f'333-333-000{n}')
+                                              for n in range(3)])
+        pks = [member.pk, *(member.pk for member in members)]
+        self.assertGreater(min(pks), highest)
+        self.assertEqual(len(set(pks)), 4)
+        self.assertEqual({pk % MAX_SHARDS for pk in pks}, {SHARDS.index(DEFAULT_DB_ALIAS)})
+
+
+class ShardMixin:
+    """A real second shard, outside the test transactions, emptied after every test."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.settings[SHARD] = dict(connections.settings[DEFAULT_DB_ALIAS],
+                                           NAME=os.path.join(cls.directory.name, 'shard1.sqlite3'))
+        call_command('migrate', database=SHARD, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[SHARD].close()
+        del connections[SHARD]
+        del connections.settings[SHARD]
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def tearDown(self):
+        call_command('flush', database=SHARD, interactive=False, verbosity=0)
+        super().tearDown()
+
+
+@override_settings(DATABASE_SHARDS=SHARDS)
+class RebalanceTeamTest(ShardMixin, MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.team = Team.objects.create(name='Rockets', shard=DEFAULT_DB_ALIAS)
+        self.members = Member.objects.bulk_create([
+            Member(team=self.team, email=f'{n}@gmail.com', phone=f'333-333-000{n}') for n in range(5)])
+        self.member1 = Member.objects.create(**self.member1_data)
+
+    def rebalance(self, *args):
+        stdout = StringIO()
+        call_command('rebalance_team', self.team.pk, '--to', SHARD, '--batch-size', '2', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_rebalance(self):
+        rows = list(Member.objects.filter(team=self.team).order_by('pk').values())
+        self.assertIn('Moved 5 members', self.rebalance())
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.shard, SHARD)
+        self.assertFalse(self.team.moving)
+
+        # Same ids and columns, updated_at included, on the shard only.
+        self.assertEqual(list(Member.objects.using(SHARD).filter(team=self.team).order_by('pk').values()), rows)
+        self.assertFalse(Member.all_objects.filter(team=self.team).exists())
+        self.assertEqual(list(Member.objects.exclude(is_superuser=True)), [self.member1])
+        self.assertEqual(MemberCounter.objects.get_value(MemberCounter.TEAM_MEMBERS), 1)
+        self.assertEqual(MemberCounter.objects.db_manager(SHARD).get_value(MemberCounter.TEAM_MEMBERS), 5)
+
+        response = self.client.get(reverse('members:team_list', args=[self.team.pk]))
+        self.assertEqual({member.pk for member in response.context_data['members']},
+                         {member.pk for member in self.members})
+        self.assertEqual(response.context_data['member_count'], 5)
+
+        # New members of the team go to the shard, with ids no other shard hands out.
+        data = dict(self.member2_data, email='new@gmail.com')
+        response = self.client.post(reverse('members:team_new', args=[self.team.pk]), data)
+        self.assertRedirects(response, reverse('members:team_list', args=[self.team.pk]))
+        member = Member.objects.using(SHARD).get(email='new@gmail.com')
+        self.assertEqual(member.pk % MAX_SHARDS, SHARDS.index(SHARD))
+
+        url = reverse('members:team_edit', args=[self.team.pk, member.pk])
+        response = self.client.post(url, dict(data, first_name='Jacky'))
+        self.assertRedirects(response, reverse('members:team_list', args=[self.team.pk]))
+        member.refresh_from_db()
+        self.assertEqual(member.first_name, 'Jacky')
+
+    def test_refuses_members_with_groups(self):
+        Group.objects.create(name='staff').user_set.add(self.members[0])
+        with self.assertRaisesMessage(CommandError, 'groups'):
+            self.rebalance()
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.shard, DEFAULT_DB_ALIAS)
+        self.assertFalse(Member.objects.using(SHARD).exists())
+
+    def test_unknown_shard(self):
+        with self.assertRaisesMessage(CommandError, 'not one of the shards'):
+            call_command('rebalance_team', self.team.pk, '--to', 'shard9')
+
+
+@override_settings(DATABASE_SHARDS=SHARDS)
+class ShardedTeamTest(ShardMixin, MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.team = Team.objects.create(name='Rockets', shard=SHARD)
+        self.member1 = Member.objects.create(**self.member1_data)
+        self.client.force_login(Member.objects.create_user(
+            email='boss@gmail.com', phone='444-444-4444', password='password', role=Member.RoleChoices.admin))
+        for using in SHARDS:
+            OutboxEvent.objects.using(using).all().delete()
+
+    def test_changes_and_webhooks_of_every_shard(self):
+        url = reverse('members:changes')
+        cursor = self.client.get(url).json()['cursor']
+        data = dict(self.member2_data, email='new@gmail.com')
+        self.client.post(reverse('members:team_new', args=[self.team.pk]), data)
+        member = Member.objects.using(SHARD).get(email='new@gmail.com')
+        self.client.post(reverse('members:edit', args=[self.member1.pk]), dict(self.member1_data, first_name='Stace'))
+
+        changes = self.client.get(url, {'since': cursor}).json()
+        self.assertEqual(sorted(change['id'] for change in changes['changed']), sorted([self.member1.pk, member.pk]))
+        cursor = changes['cursor']
+        response = self.client.delete(reverse('members:team_delete', args=[self.team.pk, member.pk]))
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        changes = self.client.get(url, {'since': cursor}).json()
+        self.assertEqual((changes['changed'], changes['deleted']), ([], [member.pk]))
+
+        webhook = StubWebhook()
+        self.addCleanup(webhook.stop)
+        worker = OutboxWorker(endpoints=[webhook.url])
+        self.addCleanup(worker.session.close)
+        self.assertEqual(worker.run_once(), 3)
+        self.assertEqual(worker.run_once(), 0)
+        events = [(event['type'], event['member_id']) for batch in webhook.batches for event in batch]
+        self.assertEqual(sorted(events), sorted([
+            ('member.updated', self.member1.pk), ('member.created', member.pk), ('member.deleted', member.pk)]))
+        self.assertTrue(WebhookCursor.objects.using(SHARD).filter(endpoint=webhook.url).exists())
+
+    def test_jobs_of_every_shard(self):
+        data = dict(self.member2_data, email='new@gmail.com')
+        self.client.post(reverse('members:team_new', args=[self.team.pk]), data)
+        member = Member.objects.using(SHARD).get(email='new@gmail.com')
+        self.client.post(reverse('members:team_edit', args=[self.team.pk, member.pk]),
+                         dict(data, role=Member.RoleChoices.regular))
+        # Queued in the shard's transactions, along with the member.
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(sorted(Job.objects.using(SHARD).values_list('task', flat=True)),
+                         ['members.role_changed_email', 'members.welcome_email'])
+
+        self.assertEqual(Worker(executor=InlineExecutor()).run_once(), 2)
+        self.assertEqual([message.to for message in mail.outbox], [[member.email]] * 2)
+        self.assertFalse(Job.objects.using(SHARD).exists())
+
+    def test_team_less_endpoints_cover_every_shard(self):
+        member = Member.objects.db_manager(SHARD).create(
+            team=self.team, first_name='rocket', email='rocket@gmail.com', phone='555-555-5555')
+        ids = [self.member1.pk, member.pk]
+
+        response = self.client.get(reverse('members:list'))
+        self.assertContains(response, 'rocket@gmail.com')
+        self.assertContains(response, 'stacyBale@gmail.com')
+        self.assertContains(self.client.get(reverse('members:list'), {'q': 'rocket'}), 'rocket@gmail.com')
+        self.assertIn(member.pk, [row['id'] for row in self.client.get(reverse('members:api_list')).json()['results']])
+        results = self.client.get(reverse('members:search'), {'q': 'rocket'}).json()['results']
+        self.assertEqual([row['id'] for row in results], [member.pk])
+        self.assertEqual(self.client.get(reverse('members:by_phone', args=['5555555555'])).json()['id'], member.pk)
+        response = self.client.post(reverse('members:by_phone_lookup'), {'numbers': ['555-555-5555']},
+                                    content_type='application/json')
+        self.assertEqual(response.json()['results'][0]['member']['id'], member.pk)
+        export = b''.join(self.client.get(reverse('members:export', args=['csv'])).streaming_content).decode()
+        self.assertIn('rocket@gmail.com', export)
+
+        response = self.client.post(reverse('members:bulk_role'), {'ids': ids, 'role': 'Admin'},
+                                    content_type='application/json')
+        self.assertEqual([row['status'] for row in response.json()['results']], ['updated', 'updated'])
+        self.assertEqual(Member.objects.using(SHARD).get(pk=member.pk).role, Member.RoleChoices.admin)
+        self.assertEqual(Job.objects.using(SHARD).get().task, 'members.role_changed_email')
+        response = self.client.post(reverse('members:bulk_delete'), {'ids': ids}, content_type='application/json')
+        self.assertEqual([row['status'] for row in response.json()['results']], ['deleted', 'deleted'])
+        self.assertFalse(Member.objects.using(SHARD).filter(pk=member.pk).exists())
+
+    def test_writes_refused_in_the_write_path(self):
+        team = Team.objects.create(name='Comets', shard=DEFAULT_DB_ALIAS, moving=True)
+        Member.objects.filter(pk=self.member1.pk).update(team=team)
+        self.member1.refresh_from_db()
+
+        response = self.client.post(reverse('members:edit', args=[self.member1.pk]),
+                                    dict(self.member1_data, first_name='Stace'))
+        self.assertEqual(response.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response)
+        response = self.client.post(reverse('members:bulk_role'), {'ids': [self.member1.pk], 'role': 'Admin'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        with self.assertRaises(TeamMoving), transaction.atomic():
+            Member.objects.soft_delete([self.member1.pk])
+        self.member1.refresh_from_db()
+        self.assertEqual((self.member1.first_name, self.member1.role), ('stacy', Member.RoleChoices.regular))
+
+        # Moved: what is left on the old shard isn't the team's any more.
+        Team.objects.filter(pk=team.pk).update(shard=SHARD, moving=False)
+        self.member1.first_name = 'Stace'
+        with self.assertRaises(TeamMoving), transaction.atomic():
+            self.member1.save()
+        self.assertEqual(Member.objects.db_manager(SHARD).bulk_create([
+            Member(team=team, email='new@gmail.com', phone='555-555-5555')])[0].team, team)
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from http import HTTPStatus
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.settings import api_settings
+
+from instawork.throttling import TokenBucketThrottle
+from instawork.throttling.middleware import WriteConcurrencyMiddleware
+from members.models import Member
+from members.tests.test_member_base import MemberTestCase
+
+RATES = {'writes': '3/min', 'ip_writes': '5/min'}
+
+
+@override_settings(REST_FRAMEWORK=dict(api_settings.user_settings, DEFAULT_THROTTLE_RATES=RATES))
+class ThrottleTest(MemberTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        timer = mock.patch.object(TokenBucketThrottle, 'timer', lambda throttle: self.now)
+        timer.start()
+        self.addCleanup(timer.stop)
+        self.members = [Member.objects.create(email=f'member{n}@gmail.com', phone=f'111-222-{n:04}')
+                        for n in range(6)]
+
+    def edit(self, member, **extra):
+        return self.client.post(reverse('members:edit', args=[member.pk]),
+                                {'email': member.email, 'phone': member.phone, 'role': member.role}, **extra)
+
+    def test_pages(self):
+        for member in self.members[:3]:
+            self.assertEqual(self.edit(member).status_code, HTTPStatus.FOUND)
+        response = self.edit(self.members[3])
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '20')
+        # Reads aren't throttled.
+        self.assertEqual(self.client.get(reverse('members:list')).status_code, HTTPStatus.OK)
+
+        # A token comes back every 20 seconds.
+        self.now += 20
+        self.assertEqual(self.edit(self.members[3]).status_code, HTTPStatus.FOUND)
+        self.assertEqual(self.edit(self.members[4]).status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+        # Other clients have their own buckets.
+        self.assertEqual(self.edit(self.members[4], REMOTE_ADDR='10.0.0.2').status_code, HTTPStatus.FOUND)
+
+    def test_api_shares_the_budget(self):
+        admin = Member.objects.create_user(email='boss@gmail.com', phone='444-444-4444', password='password',
+                                           role=Member.RoleChoices.admin)
+        self.client.force_login(admin)
+        self.assertEqual(self.edit(self.members[0]).status_code, HTTPStatus.FOUND)
+        for member in self.members[1:3]:
+            response = self.client.delete(reverse('members:delete', args=[member.pk]))
+            self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        response = self.client.delete(reverse('members:delete', args=[self.members[3].pk]))
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertTrue(Member.objects.filter(pk=self.members[3].pk).exists())
+
+        # Logging in as someone else doesn't get around the limit per address,
+        # which the refused delete counted against too.
+        self.client.force_login(self.members[5])
+        self.assertEqual(self.edit(self.members[4]).status_code, HTTPStatus.FOUND)
+        self.assertEqual(self.edit(self.members[4]).status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+    def test_lookups_are_not_writes(self):
+        url = reverse('members:by_phone_lookup')
+        for _ in range(4):
+            response = self.client.post(url, {'numbers': [self.members[0].phone]}, content_type='application/json')
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(self.edit(self.members[0]).status_code, HTTPStatus.FOUND)
+
+
+@override_settings(WRITE_CONCURRENCY=1, WRITE_QUEUE_SIZE=1, WRITE_QUEUE_TIMEOUT=0.1, WRITE_RETRY_AFTER=3)
+class WriteConcurrencyTest(SimpleTestCase):
+
+    def setUp(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.middleware = WriteConcurrencyMiddleware(self.view)
+        self.factory = RequestFactory()
+
+    def view(self, request):
+        if request.path == '/slow/':
+            self.started.set()
+            self.release.wait(5)
+        return HttpResponse('ok')
+
+    def test_shedding(self):
+        slow = threading.Thread(target=self.middleware, args=[self.factory.post('/slow/')])
+        slow.start()
+        self.addCleanup(slow.join)
+        self.addCleanup(self.release.set)
+        self.started.wait(5)
+
+        # The writer slot is taken: a write waits for it, then gives up.
+        response = self.middleware(self.factory.post('/'))
+        self.assertEqual(response.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '3')
+        # Reads go through.
+        self.assertEqual(self.middleware(self.factory.get('/')).status_code, HTTPStatus.OK)
+
+        # With the queue full too, writes are refused without waiting.
+        self.middleware.waiting = 1
+        with mock.patch.object(self.middleware.slots, 'acquire', wraps=self.middleware.slots.acquire) as acquire:
+            self.assertEqual(self.middleware(self.factory.post('/')).status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        acquire.assert_called_once_with(blocking=False)
+        self.middleware.waiting = 0
+
+        # So do the views that aren't throttled as writes.
+        response = self.middleware(self.factory.post(reverse('members:by_phone_lookup')))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        self.release.set()
+        slow.join()
+        self.assertEqual(self.middleware(self.factory.post('/')).status_code, HTTPStatus.OK)
+
+    async def test_shedding_under_asgi(self):
+        async def view(request):
+            return HttpResponse('ok')
+
+        middleware = WriteConcurrencyMiddleware(view)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        middleware.slots.acquire()
+        response = await middleware(self.factory.post('/'))
+        self.assertEqual(response.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        self.assertEqual(middleware.waiting, 0)
+        self.assertEqual((await middleware(self.factory.get('/'))).status_code, HTTPStatus.OK)
+
+        middleware.slots.release()
+        self.assertEqual((await middleware(self.factory.post('/'))).status_code, HTTPStatus.OK)
@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy, reverse
 from django_webtest import WebTestMixin
 
@@ -48,6 +50,63 @@ class UpdateMemberViewTest(WebTestMixin, MemberTestCase):
         self.assertRedirects(response, reverse_lazy('members:list'))
         self.assert_new_member(**self.member1_data)
 
+    def post_edit(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('members:edit', args=[self.member1.id]), data=data)
+        return response, [query['sql'] for query in queries if 'members_member"' in query['sql']]
+
+    def test_update_writes_changed_columns(self):
+        self.member1_data['first_name'] = 'anderson'
+        response, queries = self.post_edit(self.member1_data)
+        self.assertRedirects(response, reverse_lazy('members:list'))
+        # get_object and the update, no unique checks as neither email nor phone changed.
+        self.assertEqual(len(queries), 2)
+        update = queries[1]
+        self.assertTrue(update.startswith('UPDATE'))
+        self.assertIn('"first_name"', update)
+        self.assertIn('"updated_at"', update)
+        self.assertNotIn('"password"', update)
+        self.assertNotIn('"email"', update)
+        self.assert_new_member(**self.member1_data)
+
+    def test_unchanged_form_skips_write(self):
+        updated_at = self.member1.updated_at
+        response, queries = self.post_edit(self.member1_data)
+        self.assertRedirects(response, reverse_lazy('members:list'))
+        self.assertEqual(len(queries), 1)
+        self.member1.refresh_from_db()
+        self.assertEqual(self.member1.updated_at, updated_at)
+
+    def test_unique_checks_in_one_query(self):
+        self.member1_data.update({'email': self.member2.email, 'phone': self.member2.phone})
+        response, queries = self.post_edit(self.member1_data)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(set(response.context['form'].errors), {'email', 'phone'})
+        self.assertEqual(len(queries), 2)
+
+        self.member1_data['email'] = 'newEmail@gmail.com'
+        response, _ = self.post_edit(self.member1_data)
+        self.assertEqual(set(response.context['form'].errors), {'phone'})
+
+    def test_dirty_fields(self):
+        member = Member.objects.get(pk=self.member1.id)
+        self.assertEqual(member.get_dirty_fields(), set())
+        member.first_name = 'anderson'
+        member.set_password('password')
+        self.assertEqual(member.get_dirty_fields(), {'first_name', 'password'})
+        member.save()
+        self.assertEqual(member.get_dirty_fields(), set())
+
+    def test_partial_save_keeps_other_fields_dirty(self):
+        member = Member.objects.get(pk=self.member1.id)
+        member.first_name = 'anderson'
+        member.last_name = 'cooper'
+        member.save(update_fields=['first_name'])
+        self.assertEqual(member.get_dirty_fields(), {'last_name'})
+        member.save()
+        member.refresh_from_db()
+        self.assertEqual((member.first_name, member.last_name), ('anderson', 'cooper'))
+
     def assert_new_member(self, **kwargs):
         member = Member.objects.get(pk=self.member1.id)
         self.assertEqual(member.phone, kwargs['phone'])
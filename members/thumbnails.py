@@ -0,0 +1,111 @@
+"""
+Thumbnails of the profile pictures, made off the request path.
+
+ThumbnailWorker finds the members whose picture has no thumbnails yet and
+renders them in a pool of processes, so that resizing neither blocks the
+uploads nor is limited to one core by the GIL. Until a member's thumbnails
+are ready their card shows the default picture.
+"""
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from instawork.db import lock_for_write
+from instawork.db.routers import use_primary
+from members import cache as member_cache
+from members.models import Member, Team, TeamMoving
+from members.pictures import picture_storage, thumbnail_names
+
+logger = logging.getLogger(__name__)
+
+
+def render_thumbnails(source, targets):
+    """
+    Write the `(path, size, Pillow format)` thumbnails of the image file
+    `source`, cropped to squares. Runs in the pool, so it only touches files.
+    """
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        for path, size, image_format in targets:
+            thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            if image_format == 'JPEG' and thumbnail.mode != 'RGB':
+                thumbnail = thumbnail.convert('RGB')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Readers never see a partial file.
+            partial = f'{path}.{os.getpid()}.tmp'
+            thumbnail.save(partial, image_format, quality=85)
+            os.replace(partial, path)
+
+
+class ThumbnailWorker:
+    """Make the thumbnails of the members of every shard, or of `using` only."""
+
+    def __init__(self, executor=None, processes=None, batch_size=100, using=None):
+        self.executor = executor or ProcessPoolExecutor(max_workers=processes)
+        self.batch_size = batch_size
+        self.databases = settings.DATABASE_SHARDS if using is None else [using]
+
+    def run(self, interval=1.0, iterations=None):
+        """Make thumbnails until interrupted, waiting `interval` seconds whenever idle."""
+        try:
+            while iterations is None or iterations > 0:
+                if not self.run_once():
+                    time.sleep(interval)
+                if iterations is not None:
+                    iterations -= 1
+        finally:
+            self.executor.shutdown()
+
+    def run_once(self):
+        """Make the thumbnails of a batch of pictures per shard and return the number of members updated."""
+        with use_primary():
+            return sum(self.make_thumbnails(using) for using in self.databases)
+
+    def make_thumbnails(self, using=DEFAULT_DB_ALIAS):
+        pending = (Member.all_objects.using(using).filter(thumbnails_at__isnull=True).exclude(picture='')
+                   .order_by('pk').values_list('pk', 'picture', 'team')[:self.batch_size])
+        pictures, teams = {}, {}
+        for pk, picture, team in pending:
+            pictures.setdefault(picture, []).append(pk)
+            teams.setdefault(picture, set()).add(team)
+
+        futures = {picture: self.submit(picture) for picture in pictures}
+        updated = 0
+        for picture, future in futures.items():
+            members = Member.all_objects.using(using).filter(pk__in=pictures[picture], picture=picture)
+            try:
+                if future is not None:
+                    future.result()
+            except Exception:
+                logger.exception('Making the thumbnails of %s failed, dropping the picture.', picture)
+                failed = True
+            else:
+                failed = False
+            try:
+                with transaction.atomic(using=using):
+                    Team.objects.check_writable(teams[picture], using)
+                    if failed:
+                        updated += members.update(picture='')
+                    else:
+                        lock_for_write(Member, using)
+                        now = timezone.now()
+                        updated += members.update(thumbnails_at=now, updated_at=now)
+            except TeamMoving:
+                # Made again once the members are on their team's new shard.
+                continue
+            member_cache.invalidate_members(pictures[picture], using=using)
+        return updated
+
+    def submit(self, picture):
+        """Start rendering the thumbnails of `picture`, unless a member with the same picture had them made."""
+        targets = [(picture_storage.path(name), size, image_format)
+                   for name, size, image_format in thumbnail_names(picture)]
+        if all(os.path.exists(path) for path, _, _ in targets):
+            return None
+        return self.executor.submit(render_thumbnails, picture_storage.path(picture), targets)
@@ -1,6 +1,11 @@
 from django.urls import path
 
-from members.views import MemberListView, UpdateMemberView, CreateMemberView, DeleteMemberAPIView
+from members import async_views
+from members.views import MemberListView, UpdateMemberView, CreateMemberView, DeleteMemberAPIView, \
+    ExportMembersView, MemberCacheStatsAPIView, MemberSearchAPIView, BulkDeleteMemberAPIView, \
+    BulkRoleMemberAPIView, MemberListAPIView, MemberDetailAPIView, MemberChangesAPIView, \
+    MemberByPhoneAPIView, PhoneLookupAPIView, PictureView, TeamMemberListView, TeamCreateMemberView, \
+    TeamUpdateMemberView, TeamDeleteMemberAPIView
 
 app_name = 'members'
 
@@ -9,4 +14,22 @@ urlpatterns = [
     path('new', CreateMemberView.as_view(), name='new'),
     path('<int:pk>/edit/', UpdateMemberView.as_view(), name='edit'),
     path('<int:pk>/delete/', DeleteMemberAPIView.as_view(), name='delete'),
+    path('teams/<int:team>/', TeamMemberListView.as_view(), name='team_list'),
+    path('teams/<int:team>/new', TeamCreateMemberView.as_view(), name='team_new'),
+    path('teams/<int:team>/<int:pk>/edit/', TeamUpdateMemberView.as_view(), name='team_edit'),
+    path('teams/<int:team>/<int:pk>/delete/', TeamDeleteMemberAPIView.as_view(), name='team_delete'),
+    path('api/', MemberListAPIView.as_view(), name='api_list'),
+    path('api/<int:pk>/', MemberDetailAPIView.as_view(), name='api_detail'),
+    path('changes/', MemberChangesAPIView.as_view(), name='changes'),
+    path('by-phone/', PhoneLookupAPIView.as_view(), name='by_phone_lookup'),
+    path('by-phone/<str:number>', MemberByPhoneAPIView.as_view(), name='by_phone'),
+    path('async/', async_views.member_list, name='async_list'),
+    path('async/<int:pk>/', async_views.member_detail, name='async_detail'),
+    path('async/<int:pk>/delete/', async_views.member_delete, name='async_delete'),
+    path('bulk-delete/', BulkDeleteMemberAPIView.as_view(), name='bulk_delete'),
+    path('bulk-role/', BulkRoleMemberAPIView.as_view(), name='bulk_role'),
+    path('export.<str:export_format>', ExportMembersView.as_view(), name='export'),
+    path('search/', MemberSearchAPIView.as_view(), name='search'),
+    path('pictures/<path:name>', PictureView.as_view(), name='picture'),
+    path('cache-stats/', MemberCacheStatsAPIView.as_view(), name='cache_stats'),
 ]
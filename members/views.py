@@ -1,33 +1,462 @@
 # Create your views here.
-from django.urls import reverse_lazy
-from django.views.generic import ListView, UpdateView, CreateView
-from rest_framework.generics import DestroyAPIView
+import hashlib
+from calendar import timegm
+from http import HTTPStatus
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, urlencode
+from django.views.generic import ListView, UpdateView, CreateView, View
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.generics import DestroyAPIView, GenericAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from instawork.db import ImmediateTransactionMixin, PrimaryDatabaseMixin, immediate_atomic
+from instawork.db.routers import read_databases, use_shard
+from members import cache as member_cache
+from members.changes import ChangeFeed, CursorExpired
+from members.exporter import CONTENT_TYPES, SERIALIZERS, export_rows
 from members.forms import AddMemberForm
-from members.models import Member
-from members.permissions import DeleteMemberPermission
+from members.models import Member, MemberTombstone, Team, TeamMoving
+from members.pagination import KeysetPaginator, InvalidCursor, OffsetPaginator, CursorPagination, \
+    KeysetCursorPagination
+from members.permissions import DeleteMemberPermission, ChangeMemberRolePermission
+from members.pictures import NAME_RE, picture_storage
+from members.search import search_members
+from members.tasks import queue_role_changed_emails, queue_welcome_emails
+from members.serializers import MemberSerializer, BulkMemberSerializer, BulkRoleSerializer, MemberChangeSerializer, \
+    PhoneLookupSerializer
+from utils import normalize_phone
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET and HEAD requests whose If-None-Match or If-Modified-Since
+    still match with 304 Not Modified before the view loads or renders
+    anything, and send the validators and `cache_control` with every
+    response.
+    """
+    cache_control = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag = self.get_etag()
+        etag = etag and f'W/"{hashlib.md5(etag.encode()).hexdigest()}"'
+        last_modified = self.get_last_modified()
+        last_modified = last_modified and timegm(last_modified.utctimetuple())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+            if etag:
+                response.headers.setdefault('ETag', etag)
+            if last_modified:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+            patch_cache_control(response, **self.cache_control)
+        return response
+
+    def get_etag(self):
+        """A string that changes whenever the response would, or None."""
+        return None
+
+    def get_last_modified(self):
+        return None
+
+
+class TeamMoveMixin:
+    """
+    Answer 503 Service Unavailable when a write is refused because
+    rebalance_team is moving the team of a member written, see
+    TeamManager.check_writable(). Goes before the mixins that open the
+    transaction, so that it is rolled back first.
+    """
+    retry_after = 5
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except TeamMoving as e:
+            response = HttpResponse(str(e), status=HTTPStatus.SERVICE_UNAVAILABLE, content_type='text/plain')
+            response['Retry-After'] = self.retry_after
+            return response
+
 
+class TeamMixin:
+    """
+    Scope a view to the team in the `team` URL argument: its queryset holds
+    the team's members only, read and written on the team's shard.
+    """
+    team_url_kwarg = 'team'
 
-class MemberListView(ListView):
+    def dispatch(self, request, *args, **kwargs):
+        # From the primary: a replica may lag behind a move.
+        self.team = get_object_or_404(Team.objects.using(DEFAULT_DB_ALIAS), pk=kwargs[self.team_url_kwarg])
+        with use_shard(self.team.shard):
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(team=self.team)
+
+    def get_success_url(self):
+        return reverse('members:team_list', args=[self.team.pk])
+
+
+class MemberListView(ConditionalGetMixin, ListView):
     template_name = 'members/member_list.html'
     context_object_name = 'members'
-    queryset = Member.objects.order_by('-date_joined').exclude(is_superuser=True)
+    queryset = Member.objects.exclude(is_superuser=True)
+    paginate_by = 50
+    paginator_class = KeysetPaginator
+    cursor_kwarg = 'cursor'
+    search_kwarg = 'q'
+    fragment_template_name = 'members/_member_list.html'
+    # The page is the same for everyone: shared caches may keep it, but have
+    # to revalidate it (a 304 from here) before serving it again.
+    cache_control = {'public': True, 'no_cache': True}
+    # Set by TeamMixin.
+    team = None
+
+    def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        # Only what the fragment depends on, so that other query parameters don't multiply the entries.
+        key = member_cache.list_key(urlencode({
+            'team': self.team.pk if self.team else '',
+            'cursor': request.GET.get(self.cursor_kwarg, ''),
+            'q': self.get_search_query(),
+        }))
+        context = {'view': self, 'member_count': self.get_member_count(), 'member_list': member_cache.get_fragment(key)}
+        if context['member_list'] is None:
+            context = self.get_context_data(**context)
+            context['member_list'] = render_to_string(self.fragment_template_name, {
+                'cards': member_cache.render_cards(context['members']),
+                'is_paginated': context['is_paginated'],
+                'page_obj': context['page_obj'],
+                'search_query': self.get_search_query(),
+            })
+            member_cache.set_fragment(key, context['member_list'])
+        context['search_query'] = self.get_search_query()
+        return self.render_to_response(context)
+
+    def get_search_query(self):
+        return self.request.GET.get(self.search_kwarg, '').strip()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_search_query():
+            queryset = search_members(queryset, self.get_search_query())
+        return queryset
+
+    def get_databases(self):
+        """Where to read the members from: the team's shard, or else every shard."""
+        return None if self.team else read_databases(Member)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        if self.get_search_query():
+            # Search results are ordered by rank, which can't be used as a keyset.
+            return OffsetPaginator(queryset, per_page, databases=self.get_databases())
+        return self.paginator_class(queryset, per_page, databases=self.get_databases())
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
 
+    def get_team_summary(self):
+        if not hasattr(self, '_team_summary'):
+            if self.team:
+                self._team_summary = Member.objects.get_team_summary(self.team)
+            else:
+                summaries = [Member.objects.db_manager(db).get_team_summary() for db in self.get_databases()]
+                self._team_summary = (sum(count for count, _ in summaries),
+                                      max(filter(None, (last_modified for _, last_modified in summaries)),
+                                          default=None))
+        return self._team_summary
 
-class CreateMemberView(CreateView):
+    def get_member_count(self):
+        return self.get_team_summary()[0]
+
+    def get_last_modified(self):
+        return self.get_team_summary()[1]
+
+    def get_etag(self):
+        count, last_modified = self.get_team_summary()
+        return f'{count}:{last_modified and last_modified.isoformat()}'
+
+
+class CreateMemberView(TeamMoveMixin, PrimaryDatabaseMixin, ImmediateTransactionMixin, CreateView):
     model = Member
     template_name = 'members/add_member.html'
     form_class = AddMemberForm
     success_url = reverse_lazy('members:list')
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        queue_welcome_emails([self.object])
+        return response
 
-class UpdateMemberView(UpdateView):
-    model = Member
+
+class UpdateMemberView(TeamMoveMixin, PrimaryDatabaseMixin, ImmediateTransactionMixin, ConditionalGetMixin,
+                       UpdateView):
+    queryset = Member.objects.all()
     template_name = 'members/edit_member.html'
     form_class = AddMemberForm
     success_url = reverse_lazy('members:list')
+    # The form holds a CSRF token and the delete button depends on the user.
+    cache_control = {'private': True, 'no_cache': True}
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if 'role' in form.changed_data:
+            queue_role_changed_emails([self.object])
+        return response
 
+    def get_etag(self):
+        updated_at = self.get_queryset().filter(pk=self.kwargs['pk']).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None
+        user = self.request.user
+        deletable = user.is_authenticated and user.is_admin
+        # The CSRF secret of the form, set on the response if it's new.
+        get_token(self.request)
+        return f'{updated_at.isoformat()}:{user.pk}:{deletable}:{self.request.META["CSRF_COOKIE"]}'
 
-class DeleteMemberAPIView(DestroyAPIView):
+
+class DeleteMemberAPIView(TeamMoveMixin, PrimaryDatabaseMixin, ImmediateTransactionMixin, DestroyAPIView):
     permission_classes = [DeleteMemberPermission]
     queryset = Member.objects.all()
+
+    def perform_destroy(self, instance):
+        Member.objects.delete_members([instance.pk])
+
+
+class TeamMemberListView(TeamMixin, MemberListView):
+    pass
+
+
+class TeamCreateMemberView(TeamMixin, CreateMemberView):
+
+    def form_valid(self, form):
+        form.instance.team = self.team
+        return super().form_valid(form)
+
+
+class TeamUpdateMemberView(TeamMixin, UpdateMemberView):
+    pass
+
+
+class TeamDeleteMemberAPIView(TeamMixin, DeleteMemberAPIView):
+    pass
+
+
+class MemberListAPIView(ListAPIView):
+    serializer_class = MemberSerializer
+    pagination_class = KeysetCursorPagination
+    queryset = Member.objects.exclude(is_superuser=True)
+
+    def get_databases(self):
+        return read_databases(Member)
+
+
+class MemberDetailAPIView(RetrieveAPIView):
+    serializer_class = MemberSerializer
+    queryset = Member.objects.exclude(is_superuser=True)
+
+
+class MemberByPhoneAPIView(RetrieveAPIView):
+    """The member with a phone number in any common form, e.g. E.164 or digits only."""
+    serializer_class = MemberSerializer
+    queryset = Member.objects.exclude(is_superuser=True)
+
+    def get_object(self):
+        number = normalize_phone(self.kwargs['number'])
+        member = None
+        if number:
+            members = (self.get_queryset().using(db).filter(phone_normalized=number).first()
+                       for db in read_databases(Member))
+            member = next(filter(None, members), None)
+        if member is None:
+            raise NotFound('No member matches the given phone number.')
+        self.check_object_permissions(self.request, member)
+        return member
+
+
+class PhoneLookupAPIView(GenericAPIView):
+    """
+    Resolve up to PhoneLookupSerializer.MAX_NUMBERS phone numbers with one
+    query: `{"results": [{"number": ..., "member": {...} or null}]}` in
+    request order.
+    """
+    # A read, POSTed to fit thousands of numbers: the members are as public
+    # as the ones the member API lists, and it isn't throttled as a write.
+    permission_classes = [AllowAny]
+    write_throttled = False
+    serializer_class = PhoneLookupSerializer
+    queryset = Member.objects.exclude(is_superuser=True)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        numbers = serializer.validated_data['numbers']
+        normalized = {number: normalize_phone(number) for number in numbers}
+        members = [member for db in read_databases(Member) for member in
+                   self.get_queryset().using(db).filter(phone_normalized__in=set(normalized.values()) - {None})]
+        found = dict(zip((member.phone_normalized for member in members), MemberSerializer(members, many=True).data))
+        return Response({'results': [
+            {'number': number, 'member': found.get(normalized[number])} for number in numbers
+        ]})
+
+
+class CursorGone(APIException):
+    status_code = HTTPStatus.GONE
+    default_code = 'cursor_expired'
+
+
+class MemberChangesAPIView(GenericAPIView):
+    """
+    The members saved and deleted since the `since` cursor:
+    `{"changed": [...], "deleted": [ids], "cursor": ..., "has_more": ...}`.
+    Clients store `cursor` and pass it back as `since`, all members first
+    being returned as changes when it's left out. Covers every shard.
+    """
+    serializer_class = MemberChangeSerializer
+    queryset = Member.objects.exclude(is_superuser=True)
+    page_size = 500
+
+    def get(self, request):
+        feed = ChangeFeed(self.get_queryset(), MemberTombstone.objects.all(), self.page_size,
+                          databases=settings.DATABASE_SHARDS)
+        try:
+            page = feed.page(request.query_params.get('since'))
+        except CursorExpired as e:
+            raise CursorGone(str(e))
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+        return Response({
+            'changed': self.get_serializer(page.changed, many=True).data,
+            'deleted': page.deleted,
+            'cursor': page.cursor or request.query_params.get('since'),
+            'has_more': page.has_more,
+        })
+
+
+class BulkMemberAPIView(TeamMoveMixin, GenericAPIView):
+    """
+    Apply an action to a list of member ids with a bounded number of queries
+    per shard, reporting `{"results": [{"id": ..., "status": ...}]}` in
+    request order. Each shard is written in its own transaction, until every
+    id is found.
+    """
+    # The name of the MemberManager method applied to the ids, which gets the
+    # rest of the validated data as keyword arguments and returns the ids found.
+    bulk_action = None
+    success_status = None
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        done = self.perform_bulk_action(ids, serializer.validated_data)
+        return Response({'results': [
+            {'id': pk, 'status': self.success_status if pk in done else 'not_found'} for pk in ids
+        ]})
+
+    def perform_bulk_action(self, ids, data):
+        done = set()
+        for using in settings.DATABASE_SHARDS:
+            missing = [pk for pk in ids if pk not in done]
+            if not missing:
+                break
+            with immediate_atomic(using=using):
+                done |= self.perform_shard_action(Member.objects.db_manager(using), missing, data)
+        return done
+
+    def perform_shard_action(self, manager, ids, data):
+        """Apply the action to the members `ids` that `manager`'s database holds and return the ids found."""
+        if self.bulk_action is None:
+            raise ImproperlyConfigured(f'{self.__class__.__name__} is missing a bulk_action.')
+        options = {name: value for name, value in data.items() if name != 'ids'}
+        return getattr(manager, self.bulk_action)(ids, **options)
+
+
+class BulkDeleteMemberAPIView(BulkMemberAPIView):
+    permission_classes = [DeleteMemberPermission]
+    serializer_class = BulkMemberSerializer
+    bulk_action = 'delete_members'
+    success_status = 'deleted'
+
+
+class BulkRoleMemberAPIView(BulkMemberAPIView):
+    permission_classes = [ChangeMemberRolePermission]
+    serializer_class = BulkRoleSerializer
+    bulk_action = 'bulk_update_role'
+    success_status = 'updated'
+
+    def perform_shard_action(self, manager, ids, data):
+        changed = list(manager.filter(pk__in=ids).exclude(role=data['role']).only('pk'))
+        found = super().perform_shard_action(manager, ids, data)
+        queue_role_changed_emails(changed)
+        return found
+
+
+class ExportMembersView(View):
+    chunk_size = 2000
+
+    def get(self, request, export_format):
+        if export_format not in SERIALIZERS:
+            raise Http404(f'Unsupported export format "{export_format}".')
+        lines = SERIALIZERS[export_format](export_rows(chunk_size=self.chunk_size))
+        response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="members.{export_format}"'
+        return response
+
+
+class PictureView(ConditionalGetMixin, View):
+    """
+    The profile pictures and their thumbnails. Their names are hashes of their
+    content, so clients keep them for a year without revalidating.
+    """
+    cache_control = {'public': True, 'max_age': 60 * 60 * 24 * 365, 'immutable': True}
+
+    def get_etag(self):
+        return self.kwargs['name']
+
+    def get(self, request, name):
+        if not NAME_RE.fullmatch(name):
+            raise Http404('No such picture.')
+        try:
+            file = picture_storage.open(name)
+        except FileNotFoundError:
+            raise Http404('No such picture.')
+        return FileResponse(file)
+
+
+class MemberCacheStatsAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(member_cache.stats.as_dict())
+
+
+class MemberSearchAPIView(ListAPIView):
+    serializer_class = MemberSerializer
+    pagination_class = CursorPagination
+    queryset = Member.objects.exclude(is_superuser=True)
+
+    def get_databases(self):
+        return read_databases(Member)
+
+    def get_queryset(self):
+        return search_members(super().get_queryset(), self.request.query_params.get('q', ''))
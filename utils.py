@@ -1,4 +1,25 @@
+import re
+
 from django.core.validators import RegexValidator
 
 phone_number_regex = RegexValidator(regex=r'^\d{3}[-]\d{3}[-]\d{4}$',
                                     message='Phone number must be formatted as ###-###-####.')
+
+PHONE_COUNTRY_CODE = '1'
+NON_DIGITS_RE = re.compile(r'\D')
+
+
+def normalize_phone(value):
+    """
+    Return `value` as an E.164 number, e.g. `+15551234567` for
+    `555-123-4567`, `(555) 123 4567`, `15551234567` or `+1 555 123 4567`,
+    or None if it isn't a phone number of PHONE_COUNTRY_CODE.
+    """
+    if not value:
+        return None
+    digits = NON_DIGITS_RE.sub('', value)
+    if len(digits) == 10 + len(PHONE_COUNTRY_CODE) and digits.startswith(PHONE_COUNTRY_CODE):
+        digits = digits[len(PHONE_COUNTRY_CODE):]
+    elif value.lstrip().startswith('+') or len(digits) != 10:
+        return None
+    return f'+{PHONE_COUNTRY_CODE}{digits}'